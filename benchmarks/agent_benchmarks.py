@@ -0,0 +1,36 @@
+from src.agents.agent import Agent, RandomAgent, CommunistAgent, CapitalistAgent, ExpectimaxAgent
+
+from src.environment.game_state import GamePhase
+
+from benchmarks.benchmark import Benchmark
+from benchmarks.workloads import Workloads
+
+class AgentBenchmarks:
+    """Each rule-based agent's select_action (i.e. its draft, attack or fortify strategy) per phase, over the decisions of recorded games.
+    Strategies remember their chosen plan, battle or fortify for the rest of it, so only the decisions making that choice are timed: the first deployment of each draft, and each choice of battle or fortify."""
+    @classmethod
+    def get_benchmarks(cls, quick: bool = False) -> list[Benchmark]:
+        repeats = 5 if quick else 20
+        Agent.reset_player_ids()
+        agents = [RandomAgent(), CommunistAgent(), CapitalistAgent(), ExpectimaxAgent()]
+
+        benchmarks = []
+        for map_name in ["mini", "classic"]:
+            risk_map = Workloads.get_maps()[map_name]
+            trajectory = Workloads.get_trajectory(map_name, quick)
+            decisions_by_phase = {game_phase: [] for game_phase in GamePhase}
+            for step_i, (game_state, action_list, _) in enumerate(trajectory):
+                is_first_deployment = game_state.current_phase == GamePhase.DRAFT and (step_i == 0 or trajectory[step_i - 1][0].current_phase != GamePhase.DRAFT)
+                if is_first_deployment or action_list.battle_from_actions or action_list.fortify_from_actions:
+                    decisions_by_phase[game_state.current_phase].append((action_list, game_state))
+
+            for game_phase, decisions in decisions_by_phase.items():
+                for agent in agents:
+                    benchmarks.append(Benchmark(
+                        f"select_action.{map_name}.{game_phase.name.lower()}.{type(agent).__name__}",
+                        lambda agent=agent, decisions=decisions, risk_map=risk_map: [agent.select_action(action_list, game_state, risk_map) for action_list, game_state in decisions],
+                        len(decisions),
+                        repeats=repeats
+                    ))
+
+        return benchmarks
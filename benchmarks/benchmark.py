@@ -0,0 +1,138 @@
+import datetime
+import gc
+import json
+import platform
+import random
+import subprocess
+import time
+
+from typing import Callable
+
+import numpy as np
+
+from tabulate import tabulate
+
+class Benchmark:
+    """A seeded workload of num_operations operations, timed as a whole with perf_counter_ns over several repeats (after some warmup runs), and reported per operation."""
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[], object],
+        num_operations: int = 1,
+        setup: Callable[[], object] = None,
+        seed: int = 0,
+        repeats: int = 20,
+        warmup: int = 2
+    ):
+        assert num_operations >= 1, "A benchmark must time at least one operation"
+        assert repeats >= 1, "A benchmark must be repeated at least once"
+
+        self.name = name # "<group>.<workload>", e.g. "apply.classic.DeployAction"
+        self.run = run
+        self.num_operations = num_operations
+        self.setup = setup # untimed, called before every repeat (after seeding), e.g. to reset an environment
+        self.seed = seed # the global random module is reseeded with it before every repeat, so every repeat does identical work
+        self.repeats = repeats
+        self.warmup = warmup
+
+    def measure(self) -> dict:
+        """Run the benchmark, and return the mean, median and p95 (plus min and max) time per operation across its repeats, in nanoseconds."""
+        operation_times = []
+        gc_was_enabled = gc.isenabled()
+        try:
+            for repeat in range(self.warmup + self.repeats):
+                random.seed(self.seed)
+                if self.setup is not None:
+                    self.setup()
+                gc.collect()
+                gc.disable() # a collection landing in one repeat but not another would dominate its timing
+
+                start_ns = time.perf_counter_ns()
+                self.run()
+                elapsed_ns = time.perf_counter_ns() - start_ns
+
+                if gc_was_enabled:
+                    gc.enable()
+                if repeat >= self.warmup:
+                    operation_times.append(elapsed_ns / self.num_operations)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        operation_times = np.array(operation_times)
+        return {
+            "operations": self.num_operations,
+            "repeats": self.repeats,
+            "mean_ns": float(operation_times.mean()),
+            "median_ns": float(np.median(operation_times)),
+            "p95_ns": float(np.percentile(operation_times, 95)),
+            "min_ns": float(operation_times.min()),
+            "max_ns": float(operation_times.max())
+        }
+
+class BenchmarkRunner:
+    """Runs benchmarks into JSON-serialisable results, and compares the results of two runs (e.g. of two commits)."""
+    @classmethod
+    def run_benchmarks(cls, benchmarks: list[Benchmark], name_filter: str = None) -> dict:
+        """Measure every benchmark whose name contains name_filter (all if None), and return {"metadata": ..., "results": {name: timings}}."""
+        results = {}
+        for benchmark in benchmarks:
+            if name_filter is not None and name_filter not in benchmark.name:
+                continue
+
+            results[benchmark.name] = benchmark.measure()
+            print(f"{benchmark.name}: median {cls.format_time(results[benchmark.name]['median_ns'])}, p95 {cls.format_time(results[benchmark.name]['p95_ns'])} per operation")
+
+        return {"metadata": cls.get_metadata(), "results": results}
+
+    @classmethod
+    def get_metadata(cls) -> dict:
+        try:
+            commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None # not run from a git checkout
+
+        return {
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds")
+        }
+
+    @classmethod
+    def save_results(cls, results: dict, path: str):
+        with open(path, "w") as results_file:
+            json.dump(results, results_file, indent=4)
+
+    @classmethod
+    def load_results(cls, path: str) -> dict:
+        with open(path, "r") as results_file:
+            return json.load(results_file)
+
+    @classmethod
+    def compare_results(cls, baseline_results: dict, current_results: dict) -> list[list]:
+        """Return list of [name, baseline median, current median, current/baseline median ratio] for each benchmark in both results, slowest regressions first."""
+        rows = [
+            [name, baseline_results["results"][name]["median_ns"], timings["median_ns"], timings["median_ns"] / baseline_results["results"][name]["median_ns"]]
+            for name, timings in current_results["results"].items() if name in baseline_results["results"]
+        ]
+
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+    @classmethod
+    def summarise_comparison(cls, baseline_results: dict, current_results: dict) -> str:
+        rows = [
+            [name, cls.format_time(baseline_median_ns), cls.format_time(current_median_ns), f"{ratio:.2f}x"]
+            for name, baseline_median_ns, current_median_ns, ratio in cls.compare_results(baseline_results, current_results)
+        ]
+        headers = ["Benchmark", f"Baseline median ({(baseline_results['metadata']['commit'] or 'unknown')[:8]})", f"Current median ({(current_results['metadata']['commit'] or 'unknown')[:8]})", "Ratio"]
+
+        return tabulate(rows, headers=headers, tablefmt="grid")
+
+    @classmethod
+    def format_time(cls, time_ns: float) -> str:
+        for unit, scale in [("s", 1e9), ("ms", 1e6), ("us", 1e3)]:
+            if time_ns >= scale:
+                return f"{time_ns / scale:.2f}{unit}"
+
+        return f"{time_ns:.0f}ns"
@@ -0,0 +1,39 @@
+import random
+
+from src.environment.actions import battle_simulator
+
+from src.utils.blitz_battle_simulator import BlitzBattleSimulator
+
+from benchmarks.benchmark import Benchmark
+
+class BlitzBenchmarks:
+    """BlitzBattleSimulator loading per matrix dimension, and battle sampling and win probability lookups inside and beyond the matrix."""
+    @classmethod
+    def get_benchmarks(cls, quick: bool = False) -> list[Benchmark]:
+        benchmarks = [
+            Benchmark(f"blitz.load.{dimension}", lambda dimension=dimension: BlitzBattleSimulator(dimension), repeats=3 if quick or dimension == 100 else 10, warmup=1)
+            for dimension in ([10, 50] if quick else [10, 20, 30, 40, 50, 100])
+        ]
+
+        simulator = battle_simulator # the engine's own (100-dimensional) simulator
+        rng = random.Random(0)
+        battles = {
+            "small": [(rng.randint(2, 10), rng.randint(1, 10)) for _ in range(1000)],
+            "large": [(rng.randint(2, 100), rng.randint(1, 100)) for _ in range(1000)],
+            "extrapolated": [(rng.randint(101, 400), rng.randint(1, 400)) for _ in range(1000)] # beyond the matrix, so scaled down and back up
+        }
+        for battle_size, battle_troops in battles.items():
+            benchmarks.append(Benchmark(
+                f"blitz.simulate_battle.{battle_size}",
+                lambda battle_troops=battle_troops: [simulator.simulate_battle(attacker_troops, defender_troops) for attacker_troops, defender_troops in battle_troops],
+                len(battle_troops),
+                repeats=5 if quick else 20
+            ))
+            benchmarks.append(Benchmark(
+                f"blitz.get_win_probability.{battle_size}",
+                lambda battle_troops=battle_troops: [simulator.get_win_probability(attacker_troops, defender_troops) for attacker_troops, defender_troops in battle_troops],
+                len(battle_troops),
+                repeats=5 if quick else 20
+            ))
+
+        return benchmarks
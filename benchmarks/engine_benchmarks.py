@@ -0,0 +1,38 @@
+from src.environment.actions import ActionList
+from src.environment.game_state import GamePhase
+
+from benchmarks.benchmark import Benchmark
+from benchmarks.workloads import Workloads
+
+class EngineBenchmarks:
+    """GameState.copy, Action.apply per action type and ActionList.get_action_list per phase, over the states of recorded games."""
+    @classmethod
+    def get_benchmarks(cls, quick: bool = False) -> list[Benchmark]:
+        repeats = 5 if quick else 20
+        benchmarks = []
+        for map_name, risk_map in Workloads.get_maps().items():
+            trajectory = Workloads.get_trajectory(map_name, quick)
+            game_states = [game_state for game_state, _, _ in trajectory]
+            benchmarks.append(Benchmark(f"copy.{map_name}", lambda game_states=game_states: [game_state.copy() for game_state in game_states], len(game_states), repeats=repeats))
+
+            steps_by_action_type = {}
+            for game_state, _, selected_action in trajectory:
+                steps_by_action_type.setdefault(type(selected_action).get_name(), []).append((game_state, selected_action))
+            for action_type_name, steps in sorted(steps_by_action_type.items()):
+                benchmarks.append(Benchmark(
+                    f"apply.{map_name}.{action_type_name}",
+                    lambda steps=steps, risk_map=risk_map: [selected_action.apply(game_state, risk_map) for game_state, selected_action in steps],
+                    len(steps),
+                    repeats=repeats
+                ))
+
+            for game_phase in GamePhase:
+                phase_states = [game_state for game_state in game_states if game_state.current_phase == game_phase]
+                benchmarks.append(Benchmark(
+                    f"action_list.{map_name}.{game_phase.name.lower()}",
+                    lambda phase_states=phase_states, risk_map=risk_map: [ActionList.get_action_list(game_state, risk_map) for game_state in phase_states],
+                    len(phase_states),
+                    repeats=repeats
+                ))
+
+        return benchmarks
@@ -0,0 +1,23 @@
+from src.observers.observer_manager import ObserverManager
+
+from src.runners.game_runner import GameRunner
+
+from benchmarks.benchmark import Benchmark
+from benchmarks.workloads import Workloads
+
+class GameBenchmarks:
+    """Full seeded games between rule-based agents (without observers) on the mini, classic and k-clique maps, timed per game."""
+    @classmethod
+    def get_benchmarks(cls, quick: bool = False) -> list[Benchmark]:
+        benchmarks = []
+        for map_name, risk_map in Workloads.get_maps().items():
+            num_games = 1 if quick or map_name != "mini" else 5
+
+            def play_games(risk_map=risk_map, num_games=num_games):
+                for _ in range(num_games):
+                    agents = Workloads.create_agents()
+                    GameRunner(risk_map, agents, ObserverManager(risk_map, agents, []), max_episode_length=5000).run_episode()
+
+            benchmarks.append(Benchmark(f"game.{map_name}", play_games, num_games, repeats=3 if quick else 10, warmup=1))
+
+        return benchmarks
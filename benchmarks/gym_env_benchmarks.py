@@ -0,0 +1,57 @@
+import numpy as np
+
+from src.train.gym_environment import RiskGymEnvironment
+
+from benchmarks.benchmark import Benchmark
+from benchmarks.workloads import Workloads
+
+class GymEnvBenchmarks:
+    """RiskGymEnvironment step (including the opponents' turns it fast-forwards), action_masks and encode_observation, replaying a recorded sequence of random valid RL actions."""
+    @classmethod
+    def get_benchmarks(cls, quick: bool = False) -> list[Benchmark]:
+        num_steps, repeats = (200, 5) if quick else (1000, 20)
+        benchmarks = []
+        for map_name in ["mini", "classic"]:
+            gym_environment = RiskGymEnvironment(Workloads.get_maps()[map_name], num_players=3)
+            actions, game_states = cls.record_episode(gym_environment, num_steps)
+            inspected_environment = RiskGymEnvironment(Workloads.get_maps()[map_name], num_players=3) # separate, as resetting gym_environment resets its game state in place
+
+            def step(gym_environment=gym_environment, actions=actions):
+                for action in actions:
+                    gym_environment.step(action)
+
+            def action_masks(gym_environment=inspected_environment, game_states=game_states):
+                for game_state in game_states:
+                    gym_environment.game_state = game_state
+                    gym_environment.action_masks()
+
+            def encode_observation(gym_environment=inspected_environment, game_states=game_states):
+                for game_state in game_states:
+                    gym_environment.game_state = game_state
+                    gym_environment.encode_observation()
+
+            benchmarks += [
+                Benchmark(f"gym_env.step.{map_name}", step, len(actions), setup=lambda gym_environment=gym_environment: gym_environment.reset(seed=0), repeats=repeats),
+                Benchmark(f"gym_env.action_masks.{map_name}", action_masks, len(game_states), repeats=repeats),
+                Benchmark(f"gym_env.encode_observation.{map_name}", encode_observation, len(game_states), repeats=repeats)
+            ]
+
+        return benchmarks
+
+    @classmethod
+    def record_episode(cls, gym_environment: RiskGymEnvironment, num_steps: int) -> tuple[list[int], list]:
+        """Return the seeded random valid actions of up to num_steps steps of an episode from reset(seed=0), and the game state each was taken in.
+        Replaying the actions after another reset(seed=0) revisits the same game states, as the opponents draw from the reseeded global random module."""
+        gym_environment.reset(seed=0)
+        action_rng = np.random.default_rng(0)
+
+        actions, game_states = [], []
+        for _ in range(num_steps):
+            action = int(action_rng.choice(np.flatnonzero(gym_environment.action_masks())))
+            actions.append(action)
+            game_states.append(gym_environment.game_state)
+            _, _, terminated, truncated, _ = gym_environment.step(action)
+            if terminated or truncated:
+                break
+
+        return actions, game_states
@@ -0,0 +1,63 @@
+import argparse
+
+from benchmarks.agent_benchmarks import AgentBenchmarks
+from benchmarks.benchmark import Benchmark, BenchmarkRunner
+from benchmarks.blitz_benchmarks import BlitzBenchmarks
+from benchmarks.engine_benchmarks import EngineBenchmarks
+from benchmarks.game_benchmarks import GameBenchmarks
+from benchmarks.gym_env_benchmarks import GymEnvBenchmarks
+
+BENCHMARK_GROUPS = {
+    "engine": EngineBenchmarks,
+    "agents": AgentBenchmarks,
+    "blitz": BlitzBenchmarks,
+    "gym_env": GymEnvBenchmarks,
+    "games": GameBenchmarks
+}
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the microbenchmark suite, and save its mean, median and p95 timings as JSON for comparison between commits.")
+    parser.add_argument(
+        "--groups",
+        nargs="+",
+        choices=list(BENCHMARK_GROUPS),
+        default=list(BENCHMARK_GROUPS),
+        help="Benchmark groups to run (default: all)"
+    )
+    parser.add_argument(
+        "--filter",
+        type=str,
+        default=None,
+        help="Only run benchmarks whose name contains this string, e.g. 'apply.classic'"
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Run smaller workloads with fewer repeats, for a fast smoke check rather than a stable comparison"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="benchmark_results.json",
+        help="Path of the JSON results file to write"
+    )
+    parser.add_argument(
+        "--compare",
+        type=str,
+        default=None,
+        help="Path of a previous JSON results file (e.g. of another commit) to compare the median timings against"
+    )
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    benchmarks: list[Benchmark] = []
+    for group in args.groups:
+        benchmarks += BENCHMARK_GROUPS[group].get_benchmarks(args.quick)
+
+    results = BenchmarkRunner.run_benchmarks(benchmarks, args.filter)
+    BenchmarkRunner.save_results(results, args.output)
+    print(f"\nSaved {len(results['results'])} benchmark results to {args.output}")
+
+    if args.compare is not None:
+        print(BenchmarkRunner.summarise_comparison(BenchmarkRunner.load_results(args.compare), results))
@@ -0,0 +1,55 @@
+import random
+
+from src.agents.agent import Agent, RandomAgent, CommunistAgent, CapitalistAgent
+
+from src.environment.actions import Action, ActionList
+from src.environment.environment import RiskEnvironment
+from src.environment.game_state import GameState
+from src.environment.map import RiskMap
+
+from src.utils.k_clique_generator import KCliqueGenerator
+
+class Workloads:
+    """Seeded maps and recorded game trajectories shared by the benchmarks, so that every run (and every commit) times the same work."""
+    maps: dict[str, RiskMap] = {} # key=map name, memoised on first use
+    trajectories: dict[tuple[str, bool], list[tuple[GameState, ActionList, Action]]] = {} # key=(map name, quick), memoised on first use
+
+    @classmethod
+    def get_maps(cls) -> dict[str, RiskMap]:
+        """Return the mini and classic maps, plus a seeded 30-clique map of density 0.5, keyed by name."""
+        if not cls.maps:
+            random.seed(0) # k-clique maps are generated from the global random module
+            cls.maps = {
+                "mini": RiskMap.from_json("maps/mini.json"),
+                "classic": RiskMap.from_json("maps/classic.json"),
+                "k_clique": RiskMap.from_json(json_data=KCliqueGenerator.generate(k=30, density=0.5))
+            }
+
+        return cls.maps
+
+    @classmethod
+    def create_agents(cls) -> list[Agent]:
+        Agent.reset_player_ids()
+        return [RandomAgent(), CommunistAgent(), CapitalistAgent()]
+
+    @classmethod
+    def get_trajectory(cls, map_name: str, quick: bool = False) -> list[tuple[GameState, ActionList, Action]]:
+        """Return the (game state, action list, selected action) of every step of a seeded game between rule-based agents on the given map (truncated sooner if quick)."""
+        if (map_name, quick) not in cls.trajectories:
+            risk_map = cls.get_maps()[map_name]
+            agents = cls.create_agents()
+            environment = RiskEnvironment(risk_map, len(agents))
+            random.seed(0)
+            environment.reset()
+
+            trajectory = []
+            is_terminal_state = False
+            while not is_terminal_state and len(trajectory) < (500 if quick else 3000):
+                game_state = environment.current_state # never mutated, as every step applies its action to a copy
+                action_list = environment.get_action_list()
+                selected_action = agents[game_state.current_player].select_action(action_list, game_state, risk_map)
+                trajectory.append((game_state, action_list, selected_action))
+                _, is_terminal_state = environment.step(selected_action)
+            cls.trajectories[(map_name, quick)] = trajectory
+
+        return cls.trajectories[(map_name, quick)]
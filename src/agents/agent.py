@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 
-from src.agents.draft_strategy import DraftStrategy, RandomDraftStrategy, MinimumDraftStrategy, MaximumDraftStrategy
-from src.agents.attack_strategy import AttackStrategy, WeightedRandomAttackStrategy, SafeAttackStrategy
+from src.agents.draft_strategy import DraftStrategy, RandomDraftStrategy, MinimumDraftStrategy, MaximumDraftStrategy, ExpectimaxDraftStrategy
+from src.agents.attack_strategy import AttackStrategy, WeightedRandomAttackStrategy, SafeAttackStrategy, ExpectimaxAttackStrategy
 from src.agents.fortify_strategy import FortifyStrategy, RandomFortifyStrategy, MinimumFortifyStrategy, MaximumFortifyStrategy
 
 from src.environment.actions import TransferMethod, Action, ActionList
@@ -10,6 +10,7 @@ from src.environment.map import RiskMap
 
 class Agent(ABC):
     player_id: int = 0
+    batched_inference: bool = False # agents setting this implement get_action_probabilities and select_action_from_probabilities, so that the decisions of concurrent games can be evaluated together
 
     def __init__(self, draft_strategy: DraftStrategy, attack_strategy: AttackStrategy, fortify_strategy: FortifyStrategy):
         Agent.player_id += 1
@@ -33,6 +34,10 @@ class Agent(ABC):
         elif game_state.current_phase == GamePhase.FORTIFY:
             return self.fortify_strategy.select_action(valid_actions, game_state, risk_map)
     
+    def is_reproducible(self) -> bool:
+        """Return True if the agent's decisions depend only on its settings and the global random module, so that seeded simulations of it can be cached."""
+        return True
+
     def get_name(self) -> str:
         """Return the name of the agent for logging and visualisation purposes."""
         if type(self).player_id == 1:
@@ -87,3 +92,16 @@ class CapitalistAgent(Agent):
     @classmethod
     def get_colour(cls) -> str:
         return "yellow"
+
+class ExpectimaxAgent(Agent):
+    """Looks one turn ahead, deploying to and attacking along the chain of battles with the greatest expected value according to the blitz win probabilities."""
+    def __init__(self, min_win_probability: float = 0.6, max_chain_length: int = 3):
+        super().__init__(
+            ExpectimaxDraftStrategy(min_win_probability, max_chain_length),
+            ExpectimaxAttackStrategy(min_win_probability, max_chain_length),
+            MinimumFortifyStrategy()
+        )
+    
+    @classmethod
+    def get_colour(cls) -> str:
+        return "purple"
@@ -0,0 +1,82 @@
+import numpy as np
+
+from src.environment.actions import battle_simulator
+from src.environment.game_state import GameState
+from src.environment.map import RiskMap
+
+class AttackChainScorer:
+    """Scores every attack chain available to the current player this turn by its expected value, i.e. the sum over each captured territory of P(capturing it) x its value.
+    A chain starts at an owned territory, and after each capture moves ALL troops into the captured territory to continue attacking from there.
+    The first battle of every chain is scored at once over all border pairs using the blitz win probability and expected survivor tables, continuations are memoised per chain state."""
+    @classmethod
+    def get_battle_tables(cls, attacker_troops: np.ndarray, defender_troops: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return the win probabilities and expected survivors for each (attacker_troops, defender_troops) pair, falling back to the (extrapolating) simulator for pairs outside the tables."""
+        dimension = battle_simulator.dimension
+        win_probabilities = battle_simulator.get_win_probability_table()[np.minimum(attacker_troops, dimension), np.minimum(defender_troops, dimension)]
+        expected_survivors = battle_simulator.get_expected_survivors_table()[np.minimum(attacker_troops, dimension), np.minimum(defender_troops, dimension)]
+
+        for index in zip(*np.nonzero((attacker_troops > dimension) | (defender_troops > dimension))):
+            win_probabilities[index] = battle_simulator.get_win_probability(int(attacker_troops[index]), int(defender_troops[index]))
+            expected_survivors[index] = battle_simulator.get_expected_survivors(int(attacker_troops[index]), int(defender_troops[index]))
+
+        return win_probabilities, expected_survivors
+
+    @classmethod
+    def get_territory_values(cls, game_state: GameState, risk_map: RiskMap) -> np.ndarray:
+        """Return the value of capturing each territory for the current player: 1, plus the continent bonus if it is the last territory of a continent the player is missing."""
+        territory_owners = np.asarray(game_state.territory_owners)
+        territory_values = np.ones(len(territory_owners))
+
+        for continent_id, territory_ids in risk_map.continent_territory_ids.items():
+            missing_territory_ids = [territory_id for territory_id in territory_ids if territory_owners[territory_id] != game_state.current_player]
+            if len(missing_territory_ids) == 1:
+                territory_values[missing_territory_ids[0]] += risk_map.continents[continent_id].bonus
+
+        return territory_values
+
+    @classmethod
+    def get_best_chain(cls, game_state: GameState, risk_map: RiskMap, min_win_probability: float, max_chain_length: int, extra_troops: int = 0) -> tuple[int, int, float]:
+        """Return the (attacker_territory_id, defender_territory_id, expected_value) of the first battle of the best attack chain, or None if no first battle is won with at least min_win_probability.
+        If extra_troops is given, every chain is scored as if those troops were first deployed to its starting territory."""
+        territory_owners = np.asarray(game_state.territory_owners)
+        territory_troops = np.asarray(game_state.territory_troops, dtype=np.int64)
+        owned = territory_owners == game_state.current_player
+
+        attacker_troops = np.where(owned, territory_troops + extra_troops, 0)
+        candidates = risk_map.adjacency_matrix & (owned & (attacker_troops >= 2))[:, None] & ~owned[None, :]
+        win_probabilities, expected_survivors = cls.get_battle_tables(np.broadcast_to(attacker_troops[:, None], candidates.shape), np.broadcast_to(territory_troops[None, :], candidates.shape))
+        candidates &= win_probabilities >= min_win_probability
+
+        if not candidates.any():
+            return None
+
+        territory_values = cls.get_territory_values(game_state, risk_map)
+        continuation_cache: dict[tuple[int, int, int, frozenset[int]], float] = {}
+
+        def get_continuation_value(territory_id: int, troops: int, remaining_chain_length: int, captured_territory_ids: frozenset[int]) -> float:
+            """Expected value of continuing the chain from a just captured territory holding the given troops, where stopping is worth 0."""
+            if remaining_chain_length == 0 or troops < 2:
+                return 0.0
+
+            cache_key = (territory_id, troops, remaining_chain_length, captured_territory_ids)
+            if cache_key not in continuation_cache:
+                best_value = 0.0
+                for border_id in risk_map.border_ids[territory_id]:
+                    if owned[border_id] or border_id in captured_territory_ids:
+                        continue
+                    win_probability = battle_simulator.get_win_probability(troops, game_state.territory_troops[border_id])
+                    if win_probability >= min_win_probability:
+                        next_troops = round(battle_simulator.get_expected_survivors(troops, game_state.territory_troops[border_id])) - 1
+                        best_value = max(best_value, win_probability * (territory_values[border_id] + get_continuation_value(border_id, next_troops, remaining_chain_length - 1, captured_territory_ids | {border_id})))
+                continuation_cache[cache_key] = best_value
+
+            return continuation_cache[cache_key]
+
+        best_chain = None
+        for attacker_territory_id, defender_territory_id in zip(*np.nonzero(candidates)): # ascending ids, so ties resolve to the lowest ids
+            next_troops = round(expected_survivors[attacker_territory_id, defender_territory_id]) - 1
+            chain_value = win_probabilities[attacker_territory_id, defender_territory_id] * (territory_values[defender_territory_id] + get_continuation_value(int(defender_territory_id), next_troops, max_chain_length - 1, frozenset([int(defender_territory_id)])))
+            if not best_chain or chain_value > best_chain[2]:
+                best_chain = (int(attacker_territory_id), int(defender_territory_id), float(chain_value))
+
+        return best_chain
@@ -2,11 +2,14 @@ import random
 
 from abc import ABC, abstractmethod
 
+from src.agents.attack_chain_scorer import AttackChainScorer
+from src.agents.candidate_scorer import CandidateScorer
 from src.agents.strategy import Strategy
 
 from src.environment.actions import TransferMethod, Action, ActionList, BattleFromAction, BattleToAction, TransferAction, SkipAction
 from src.environment.game_state import GameState
 from src.environment.map import RiskMap
+from src.environment.queries import attack_targets
 
 class AttackStrategy(Strategy, ABC):
     def __init__(self, transfer_method: TransferMethod):
@@ -45,8 +48,7 @@ class WeightedRandomAttackStrategy(AttackStrategy):
     def compute_best_battle(self, valid_actions: ActionList, game_state: GameState, risk_map: RiskMap) -> tuple[BattleFromAction, BattleToAction]:
         if random.random() < self.battle_weight:
             selected_battle_from_action = random.choice(valid_actions.battle_from_actions)
-            forwarded_game_state = selected_battle_from_action.apply(game_state, risk_map)
-            selected_battle_to_action = random.choice(BattleToAction.get_action_list(forwarded_game_state, risk_map))
+            selected_battle_to_action = BattleToAction(random.choice(attack_targets(game_state, risk_map, selected_battle_from_action.attacker_territory_id)))
 
             return (selected_battle_from_action, selected_battle_to_action)
         else:
@@ -58,17 +60,25 @@ class SafeAttackStrategy(AttackStrategy):
         super().__init__(transfer_method)
         self.disparity = disparity
 
-    def compute_best_battle(self, valid_actions: ActionList, game_state: GameState, risk_map: RiskMap) -> tuple[BattleFromAction, BattleToAction]:
-        best_battle: tuple[BattleFromAction, BattleToAction] = None
+    def compute_best_battle(self, _: ActionList, game_state: GameState, risk_map: RiskMap) -> tuple[BattleFromAction, BattleToAction]:
+        best_battle = CandidateScorer.get_best_battle(game_state, risk_map)
+
+        if best_battle and best_battle[2] >= self.disparity:
+            return (BattleFromAction(best_battle[0]), BattleToAction(best_battle[1]))
+        else:
+            return None
 
-        for battle_from_action in valid_actions.battle_from_actions:
-            forwarded_game_state = battle_from_action.apply(game_state, risk_map)
-            least_defended_territory = min(BattleToAction.get_action_list(forwarded_game_state, risk_map), key=lambda to_action: game_state.territory_troops[to_action.defender_territory_id])
+class ExpectimaxAttackStrategy(AttackStrategy):
+    """Select the first battle of the attack chain with the greatest expected value, moving all troops forward after each capture to continue the chain."""
+    def __init__(self, min_win_probability: float, max_chain_length: int):
+        super().__init__(TransferMethod.ALL)
+        self.min_win_probability = min_win_probability
+        self.max_chain_length = max_chain_length
 
-            if not best_battle or game_state.territory_troops[battle_from_action.attacker_territory_id] - game_state.territory_troops[least_defended_territory.defender_territory_id] > game_state.territory_troops[best_battle[0].attacker_territory_id] - game_state.territory_troops[best_battle[1].defender_territory_id]:
-                best_battle = (battle_from_action, least_defended_territory)
+    def compute_best_battle(self, _: ActionList, game_state: GameState, risk_map: RiskMap) -> tuple[BattleFromAction, BattleToAction]:
+        best_chain = AttackChainScorer.get_best_chain(game_state, risk_map, self.min_win_probability, self.max_chain_length)
 
-        if best_battle and game_state.territory_troops[best_battle[0].attacker_territory_id] - game_state.territory_troops[best_battle[1].defender_territory_id] >= self.disparity:
-            return best_battle
+        if best_chain:
+            return (BattleFromAction(best_chain[0]), BattleToAction(best_chain[1]))
         else:
             return None
@@ -0,0 +1,71 @@
+import numpy as np
+
+from src.environment.game_state import GameState
+from src.environment.map import RiskMap
+
+NO_CANDIDATE = np.iinfo(np.int64).min # disparity assigned to (from, to) pairs that are not a legal candidate
+
+class CandidateScorer:
+    """Scores every candidate (from, to) territory pair for the current player at once, using the map adjacency matrix and the territory troop array.
+    Ties are broken towards the lowest from territory id, then the lowest to territory id, matching the ordering of the action lists."""
+    @classmethod
+    def get_battle_disparities(cls, game_state: GameState, risk_map: RiskMap) -> np.ndarray:
+        """Return a TxT matrix of attacker_troops - defender_troops for every legal (attacker, defender) border pair, and NO_CANDIDATE elsewhere."""
+        territory_owners = np.asarray(game_state.territory_owners)
+        territory_troops = np.asarray(game_state.territory_troops, dtype=np.int64)
+        owned = territory_owners == game_state.current_player
+
+        candidates = risk_map.adjacency_matrix & (owned & (territory_troops >= 2))[:, None] & ~owned[None, :]
+
+        return np.where(candidates, territory_troops[:, None] - territory_troops[None, :], NO_CANDIDATE)
+
+    @classmethod
+    def get_fortify_disparities(cls, game_state: GameState, risk_map: RiskMap) -> np.ndarray:
+        """Return a TxT matrix of from_troops - to_troops for every legal (from, to) pair within the same friendly component, and NO_CANDIDATE elsewhere."""
+        territory_owners = np.asarray(game_state.territory_owners)
+        territory_troops = np.asarray(game_state.territory_troops, dtype=np.int64)
+        owned = territory_owners == game_state.current_player
+
+        component_labels = cls.get_friendly_component_labels(owned, risk_map)
+        candidates = (component_labels[:, None] == component_labels[None, :]) & (owned & (territory_troops >= 2))[:, None] & owned[None, :]
+        np.fill_diagonal(candidates, False)
+
+        return np.where(candidates, territory_troops[:, None] - territory_troops[None, :], NO_CANDIDATE)
+
+    @classmethod
+    def get_friendly_component_labels(cls, owned: np.ndarray, risk_map: RiskMap) -> np.ndarray:
+        """Label each owned territory with the smallest territory id in its connected friendly component, and each unowned territory with -1."""
+        num_territories = len(owned)
+        friendly_adjacency_matrix = risk_map.adjacency_matrix & owned[:, None] & owned[None, :]
+        component_labels = np.where(owned, np.arange(num_territories), num_territories)
+
+        # Propagate the minimum label across friendly borders until every component agrees on a single label
+        while True:
+            propagated_labels = np.minimum(component_labels, np.where(friendly_adjacency_matrix, component_labels[None, :], num_territories).min(axis=1))
+            if np.array_equal(propagated_labels, component_labels):
+                break
+            component_labels = propagated_labels
+
+        return np.where(owned, component_labels, -1)
+
+    @classmethod
+    def get_best_candidate(cls, disparities: np.ndarray) -> tuple[int, int, int]:
+        """Return the (from_territory_id, to_territory_id, disparity) with the greatest disparity, or None if there are no candidates."""
+        best_to_territory_ids = disparities.argmax(axis=1) # argmax returns the first (lowest id) maximum
+        best_disparities = disparities[np.arange(len(disparities)), best_to_territory_ids]
+        best_from_territory_id = int(best_disparities.argmax())
+
+        if best_disparities[best_from_territory_id] == NO_CANDIDATE:
+            return None
+
+        return (best_from_territory_id, int(best_to_territory_ids[best_from_territory_id]), int(best_disparities[best_from_territory_id]))
+
+    @classmethod
+    def get_best_battle(cls, game_state: GameState, risk_map: RiskMap) -> tuple[int, int, int]:
+        """Return the (attacker_territory_id, defender_territory_id, disparity) with the greatest troop disparity, or None if no battle is possible."""
+        return cls.get_best_candidate(cls.get_battle_disparities(game_state, risk_map))
+
+    @classmethod
+    def get_best_fortify(cls, game_state: GameState, risk_map: RiskMap) -> tuple[int, int, int]:
+        """Return the (from_territory_id, to_territory_id, disparity) with the greatest troop disparity, or None if no fortify is possible."""
+        return cls.get_best_candidate(cls.get_fortify_disparities(game_state, risk_map))
@@ -1,7 +1,9 @@
+import heapq
 import random
 
-from abc import ABC
+from abc import ABC, abstractmethod
 
+from src.agents.attack_chain_scorer import AttackChainScorer
 from src.agents.strategy import Strategy
 
 from src.environment.actions import Action, ActionList, DeployAction
@@ -11,23 +13,72 @@ from src.environment.map import RiskMap
 class DraftStrategy(Strategy, ABC):
     pass
 
+class PlannedDraftStrategy(DraftStrategy, ABC):
+    """Computes the allocation of every deployment troop once at the start of the draft phase, and then replays it one DeployAction at a time."""
+    def __init__(self):
+        self.draft_plan: list[int] = [] # territory ids still to be deployed to, in reverse order
+        self.expected_territory_owners: list[int] = None
+        self.expected_territory_troops: list[int] = None
+
+    def select_action(self, _: ActionList, game_state: GameState, risk_map: RiskMap) -> Action:
+        # Only replay the cached plan if the game state has progressed exactly as the plan expects, otherwise (re)plan from scratch
+        if len(self.draft_plan) != game_state.deployment_troops or game_state.territory_troops != self.expected_territory_troops or game_state.territory_owners != self.expected_territory_owners:
+            self.draft_plan = self.compute_draft_plan(game_state, risk_map)[::-1]
+            self.expected_territory_owners = game_state.territory_owners.copy()
+            self.expected_territory_troops = game_state.territory_troops.copy()
+
+        territory_id = self.draft_plan.pop()
+        self.expected_territory_troops[territory_id] += 1
+
+        return DeployAction(territory_id)
+
+    @abstractmethod
+    def compute_draft_plan(self, game_state: GameState, risk_map: RiskMap) -> list[int]:
+        """Return the territory id to deploy each of the remaining deployment troops to, in deployment order."""
+
 class RandomDraftStrategy(DraftStrategy):
     """Select a random deploy action."""
     def select_action(self, valid_actions: ActionList, _game_state: GameState, _risk_map: RiskMap) -> Action:
         return valid_actions.get_random_action()
     
-class MinimumDraftStrategy(DraftStrategy):
+class MinimumDraftStrategy(PlannedDraftStrategy):
     """Deploy to the territory with the fewest troops."""
-    def select_action(self, valid_actions: ActionList, game_state: GameState, _: RiskMap) -> Action:
-        return min(valid_actions.deploy_actions, key=lambda action: game_state.territory_troops[action.territory_id])
+    def compute_draft_plan(self, game_state: GameState, _: RiskMap) -> list[int]:
+        draft_plan = []
+        territory_heap = [(game_state.territory_troops[territory_id], territory_id) for territory_id in game_state.get_player_owned_territory_ids()]
+        heapq.heapify(territory_heap) # ties resolve to the lowest territory id, as min() over the deploy actions would
+
+        for _ in range(game_state.deployment_troops):
+            troop_count, territory_id = territory_heap[0]
+            draft_plan.append(territory_id)
+            heapq.heapreplace(territory_heap, (troop_count + 1, territory_id))
 
-class MaximumDraftStrategy(DraftStrategy):
+        return draft_plan
+
+class MaximumDraftStrategy(PlannedDraftStrategy):
     """Deploy to one of the top-capitals territories with the most troops."""
     def __init__(self, capitals: int):
+        super().__init__()
         self.capitals = capitals
-    
-    def select_action(self, valid_actions: ActionList, game_state: GameState, _: RiskMap) -> Action:
-        return DeployAction(random.choice(self.get_capital_territory_ids(game_state)))
+
+    def compute_draft_plan(self, game_state: GameState, _: RiskMap) -> list[int]:
+        draft_plan = []
+        territory_troops = game_state.territory_troops.copy()
+        capital_territory_ids = self.get_capital_territory_ids(game_state)
+        sorted_troop_counts = sorted((territory_troops[territory_id] for territory_id in game_state.get_player_owned_territory_ids()), reverse=True)
+
+        for _ in range(game_state.deployment_troops):
+            territory_id = random.choice(capital_territory_ids)
+            draft_plan.append(territory_id)
+
+            # Incrementing the first occurrence of a troop count keeps the counts sorted, so the threshold can be read off directly instead of re-sorting
+            sorted_troop_counts[sorted_troop_counts.index(territory_troops[territory_id])] += 1
+            territory_troops[territory_id] += 1
+            if len(sorted_troop_counts) > self.capitals:
+                threshold_troop_count = sorted_troop_counts[self.capitals - 1]
+                capital_territory_ids = [capital_territory_id for capital_territory_id in capital_territory_ids if territory_troops[capital_territory_id] >= threshold_troop_count]
+
+        return draft_plan
 
     def get_capital_territory_ids(self, game_state: GameState) -> list[int]:
         player_owned_territory_ids = game_state.get_player_owned_territory_ids()
@@ -38,6 +89,21 @@ class MaximumDraftStrategy(DraftStrategy):
             threshold_troop_count = sorted([game_state.territory_troops[territory_id] for territory_id in player_owned_territory_ids], reverse=True)[self.capitals - 1]
             return [territory_id for territory_id in player_owned_territory_ids if game_state.territory_troops[territory_id] >= threshold_troop_count]
 
+class ExpectimaxDraftStrategy(MinimumDraftStrategy):
+    """Deploy every troop to the starting territory of the attack chain with the greatest expected value, or to the territories with the fewest troops if no chain is worth attacking."""
+    def __init__(self, min_win_probability: float, max_chain_length: int):
+        super().__init__()
+        self.min_win_probability = min_win_probability
+        self.max_chain_length = max_chain_length
+
+    def compute_draft_plan(self, game_state: GameState, risk_map: RiskMap) -> list[int]:
+        best_chain = AttackChainScorer.get_best_chain(game_state, risk_map, self.min_win_probability, self.max_chain_length, extra_troops=game_state.deployment_troops)
+
+        if best_chain:
+            return [best_chain[0]] * game_state.deployment_troops
+        else:
+            return super().compute_draft_plan(game_state, risk_map)
+
 class ContinentalDraftStrategy(DraftStrategy):
     """Deploy to a territory inside a continent the player has the most current control over."""
     def select_action(self, valid_actions: ActionList, game_state: GameState, risk_map: RiskMap) -> Action:
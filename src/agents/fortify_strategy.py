@@ -2,11 +2,13 @@ import random
 
 from abc import ABC, abstractmethod
 
+from src.agents.candidate_scorer import CandidateScorer
 from src.agents.strategy import Strategy
 
 from src.environment.actions import TransferMethod, Action, ActionList, FortifyFromAction, FortifyToAction, FortifyAmountAction
 from src.environment.game_state import GameState
 from src.environment.map import RiskMap
+from src.environment.queries import fortify_targets
 
 class FortifyStrategy(Strategy, ABC):
     def __init__(self):
@@ -39,23 +41,16 @@ class RandomFortifyStrategy(FortifyStrategy):
     """Select a random fortify action."""
     def compute_best_fortify(self, valid_actions: ActionList, game_state: GameState, risk_map: RiskMap) -> tuple[FortifyFromAction, FortifyToAction, FortifyAmountAction]:
         selected_fortify_from_action = random.choice(valid_actions.fortify_from_actions)
-        forwarded_game_state = selected_fortify_from_action.apply(game_state, risk_map)
-        selected_fortify_to_action = random.choice(FortifyToAction.get_action_list(forwarded_game_state, risk_map))
+        selected_fortify_to_action = FortifyToAction(random.choice(fortify_targets(game_state, risk_map, selected_fortify_from_action.from_territory_id)))
 
         return (selected_fortify_from_action, selected_fortify_to_action, FortifyAmountAction(TransferMethod.RANDOM))
 
 class MinimumFortifyStrategy(FortifyStrategy):
-    def compute_best_fortify(self, valid_actions: ActionList, game_state: GameState, risk_map: RiskMap) -> tuple[FortifyFromAction, FortifyToAction, FortifyAmountAction]:
+    def compute_best_fortify(self, _: ActionList, game_state: GameState, risk_map: RiskMap) -> tuple[FortifyFromAction, FortifyToAction, FortifyAmountAction]:
         """Select the fortify action that splits troops from the most populous territory to the least populous territory."""
-        best_fortify_route: tuple[FortifyFromAction, FortifyToAction] = None
-
-        for fortify_from_action in valid_actions.fortify_from_actions:
-            forwarded_game_state = fortify_from_action.apply(game_state, risk_map)
-            least_fortified_territory = min(FortifyToAction.get_action_list(forwarded_game_state, risk_map), key=lambda to_action: game_state.territory_troops[to_action.to_territory_id])
-            if not best_fortify_route or game_state.territory_troops[fortify_from_action.from_territory_id] - game_state.territory_troops[least_fortified_territory.to_territory_id] > game_state.territory_troops[best_fortify_route[0].from_territory_id] - game_state.territory_troops[best_fortify_route[1].to_territory_id]:
-                best_fortify_route = (fortify_from_action, least_fortified_territory)
+        best_fortify_route = CandidateScorer.get_best_fortify(game_state, risk_map)
 
-        return (best_fortify_route[0], best_fortify_route[1], FortifyAmountAction(TransferMethod.SPLIT))
+        return (FortifyFromAction(best_fortify_route[0]), FortifyToAction(best_fortify_route[1]), FortifyAmountAction(TransferMethod.SPLIT))
 
 class MaximumFortifyStrategy(FortifyStrategy):
     """Select the fortify action that moves all troops from a capital territory to any random non-capital territory."""
@@ -68,10 +63,9 @@ class MaximumFortifyStrategy(FortifyStrategy):
         
         for fortify_from_action in valid_actions.fortify_from_actions:
             if fortify_from_action.from_territory_id in capital_territory_ids:
-                forwarded_game_state = fortify_from_action.apply(game_state, risk_map)
-                for fortify_to_action in FortifyToAction.get_action_list(forwarded_game_state, risk_map):
-                    if fortify_to_action.to_territory_id not in capital_territory_ids:
-                        possible_fortify_routes.append((fortify_from_action, fortify_to_action))
+                for to_territory_id in fortify_targets(game_state, risk_map, fortify_from_action.from_territory_id):
+                    if to_territory_id not in capital_territory_ids:
+                        possible_fortify_routes.append((fortify_from_action, FortifyToAction(to_territory_id)))
 
         if possible_fortify_routes:
             best_fortify_route = random.choice(possible_fortify_routes)
@@ -0,0 +1,252 @@
+import math
+import random
+import time
+
+from src.agents.agent import Agent
+from src.agents.draft_strategy import DraftStrategy, PlannedDraftStrategy, MinimumDraftStrategy
+from src.agents.attack_strategy import SafeAttackStrategy
+from src.agents.fortify_strategy import MinimumFortifyStrategy
+
+from src.environment.actions import TransferMethod, Action, ActionList, LazyActionList, BattleToAction, battle_simulator
+from src.environment.game_state import GameState, GamePhase
+from src.environment.map import RiskMap
+
+def get_state_key(game_state: GameState) -> tuple:
+    """Return a hashable snapshot of the game state, used to recognise a previously searched state."""
+    return (
+        game_state.current_player,
+        game_state.current_phase,
+        game_state.deployment_troops,
+        game_state.current_battle,
+        game_state.current_fortify,
+        game_state.territory_captured_this_turn,
+        tuple(game_state.active_players),
+        tuple(game_state.territory_owners),
+        tuple(game_state.territory_troops),
+        tuple(game_state.territory_card_counts)
+    )
+
+def evaluate_game_state(game_state: GameState) -> list[float]:
+    """Return a reward in [0, 1] for each player, i.e. 1 for the winner of a terminal state, otherwise their average share of territories and troops."""
+    num_players = len(game_state.active_players)
+    if game_state.is_terminal_state():
+        return [float(player_i == game_state.get_winner()) for player_i in range(num_players)]
+
+    territory_counts = [0] * num_players
+    troop_counts = [0] * num_players
+    for owner, troops in zip(game_state.territory_owners, game_state.territory_troops):
+        territory_counts[owner] += 1
+        troop_counts[owner] += troops
+    total_territories, total_troops = len(game_state.territory_owners), sum(troop_counts)
+
+    return [0.5 * territory_counts[player_i] / total_territories + 0.5 * troop_counts[player_i] / total_troops for player_i in range(num_players)]
+
+class DecisionNode:
+    """Tree node for a game state in which the searching player selects an action. The tree stops at the end of the searching player's turn."""
+    __slots__ = ("game_state", "actions", "children", "untried_action_indices", "visits", "total_rewards", "is_leaf")
+
+    def __init__(self, game_state: GameState, risk_map: RiskMap, searching_player: int):
+        self.game_state = game_state
+        self.visits = 0
+        self.total_rewards = [0.0] * len(game_state.active_players)
+        self.is_leaf = game_state.is_terminal_state() or game_state.current_player != searching_player
+        self.actions = [] if self.is_leaf else MCTSAgent.get_search_actions(ActionList.get_action_list(game_state, risk_map))
+        self.children: list[DecisionNode | ChanceNode] = [None] * len(self.actions)
+        self.untried_action_indices = list(range(len(self.actions)))
+        random.shuffle(self.untried_action_indices)
+
+class ChanceNode:
+    """Tree node for a pending BattleToAction, whose children are the sampled blitz battle outcomes."""
+    __slots__ = ("game_state", "action", "children", "visits", "total_rewards")
+
+    def __init__(self, game_state: GameState, action: BattleToAction):
+        self.game_state = game_state # state before the battle is resolved
+        self.action = action
+        self.children: dict[tuple[int, int], DecisionNode] = {} # key = (remaining_attacker_troops, remaining_defender_troops)
+        self.visits = 0
+        self.total_rewards = [0.0] * len(game_state.active_players)
+
+class RolloutAgent(Agent):
+    """Rule-based agent that plays out every seat during MCTS rollouts. Kept as its own class so it never affects the names of the agents in a game."""
+    def __init__(self, draft_strategy: DraftStrategy = None, attack_strategy: SafeAttackStrategy = None, fortify_strategy: MinimumFortifyStrategy = None):
+        super().__init__(
+            draft_strategy or MinimumDraftStrategy(),
+            attack_strategy or SafeAttackStrategy(disparity=3, transfer_method=TransferMethod.SPLIT),
+            fortify_strategy or MinimumFortifyStrategy()
+        )
+
+    @classmethod
+    def get_colour(cls) -> str:
+        return "grey"
+
+class MCTSAgent(Agent):
+    """Searches the attack/fortify action chains of its own turn with UCT. Battles are chance nodes over BlitzBattleSimulator outcomes (with progressive widening), leaves are evaluated by rule-based rollouts, and deployments are delegated to a draft strategy.
+    Rollouts dominate the search, at ~950 playouts/s on the mini map and ~440 on the classic map per core (see the README for per-map budgets)."""
+    def __init__(
+        self,
+        iterations: int = 100,
+        time_limit: float = None,
+        rollout_turns: int = 4,
+        exploration_constant: float = math.sqrt(2),
+        widening_constant: float = 1.0,
+        widening_exponent: float = 0.5,
+        rollout_agent: Agent = None,
+        draft_strategy: DraftStrategy = None
+    ):
+        assert iterations is not None or time_limit is not None, "MCTSAgent needs either an iteration or a wall-clock (time_limit, in seconds) budget"
+        super().__init__(draft_strategy or MinimumDraftStrategy(), None, None)
+
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.rollout_turns = rollout_turns
+        self.exploration_constant = exploration_constant
+        self.widening_constant = widening_constant
+        self.widening_exponent = widening_exponent
+        self.rollout_agent = rollout_agent or RolloutAgent()
+
+        # Tree reuse between the chained decisions of a turn
+        self.previous_child: DecisionNode | ChanceNode = None
+
+        # Throughput statistics
+        self.total_playouts = 0
+        self.total_search_time = 0.0
+
+    def select_action(self, valid_actions: ActionList, game_state: GameState, risk_map: RiskMap) -> Action:
+        if game_state.current_phase == GamePhase.DRAFT:
+            return self.draft_strategy.select_action(valid_actions, game_state, risk_map)
+
+        flattened_actions = valid_actions.flatten()
+        if len(flattened_actions) == 1:
+            return flattened_actions[0]
+
+        root = self.get_root(game_state, risk_map)
+        search_start_time = time.perf_counter()
+        while not any(root.children) or ((self.iterations is None or root.visits < self.iterations) and (self.time_limit is None or time.perf_counter() - search_start_time < self.time_limit)):
+            self.run_iteration(root, risk_map)
+            self.total_playouts += 1
+        self.total_search_time += time.perf_counter() - search_start_time
+
+        # Select the most visited action, i.e. the robust child
+        best_action_i = max((action_i for action_i, child in enumerate(root.children) if child), key=lambda action_i: root.children[action_i].visits)
+        self.previous_child = root.children[best_action_i]
+
+        return self.find_valid_action(flattened_actions, root.actions[best_action_i])
+
+    def get_root(self, game_state: GameState, risk_map: RiskMap) -> DecisionNode:
+        """Return the already searched node matching the given game state if one exists (i.e. the next link of a chained action), otherwise a fresh root."""
+        state_key = get_state_key(game_state)
+        candidates = []
+        if isinstance(self.previous_child, DecisionNode):
+            candidates.append(self.previous_child)
+        elif isinstance(self.previous_child, ChanceNode):
+            candidates.extend(self.previous_child.children.values())
+        self.previous_child = None
+
+        for candidate in candidates:
+            if get_state_key(candidate.game_state) == state_key and not candidate.is_leaf:
+                return candidate
+
+        return DecisionNode(game_state.copy(), risk_map, game_state.current_player)
+
+    def run_iteration(self, root: DecisionNode, risk_map: RiskMap):
+        """Perform one selection, expansion, rollout and backpropagation pass from the given root."""
+        searching_player = root.game_state.current_player
+        node = root
+        path = [root]
+
+        while True:
+            if isinstance(node, ChanceNode):
+                node, is_new_node = self.sample_outcome(node, risk_map, searching_player)
+                path.append(node)
+                if is_new_node:
+                    break
+            elif node.is_leaf:
+                break
+            elif node.untried_action_indices:
+                action_i = node.untried_action_indices.pop()
+                action = node.actions[action_i]
+                if isinstance(action, BattleToAction):
+                    child = ChanceNode(node.game_state, action)
+                else:
+                    child = DecisionNode(action.apply_in_place(node.game_state.copy(), risk_map), risk_map, searching_player)
+                node.children[action_i] = child
+                path.append(child)
+                node = child
+                if isinstance(child, DecisionNode):
+                    break
+            else:
+                node = self.select_child(node)
+                path.append(node)
+
+        rewards = self.rollout(node.game_state.copy(), risk_map)
+        for path_node in path:
+            path_node.visits += 1
+            for player_i, reward in enumerate(rewards):
+                path_node.total_rewards[player_i] += reward
+
+    def select_child(self, node: DecisionNode) -> DecisionNode | ChanceNode:
+        """Return the child maximising UCT for the player to move at the given node."""
+        player_i = node.game_state.current_player
+        log_visits = math.log(node.visits)
+
+        return max(node.children, key=lambda child: child.total_rewards[player_i] / child.visits + self.exploration_constant * math.sqrt(log_visits / child.visits))
+
+    def sample_outcome(self, node: ChanceNode, risk_map: RiskMap, searching_player: int) -> tuple[DecisionNode, bool]:
+        """Return an outcome child of the given chance node, and whether it was newly created. New outcomes are only sampled while the number of children is within the progressive widening limit."""
+        if len(node.children) < math.ceil(self.widening_constant * (node.visits + 1) ** self.widening_exponent):
+            attacker_territory_id = node.game_state.current_battle[0]
+            outcome = battle_simulator.simulate_battle(node.game_state.territory_troops[attacker_territory_id], node.game_state.territory_troops[node.action.defender_territory_id])
+            if outcome not in node.children:
+                node.children[outcome] = DecisionNode(node.action.apply_outcome_in_place(node.game_state.copy(), risk_map, *outcome), risk_map, searching_player)
+                return node.children[outcome], True
+
+            return node.children[outcome], False
+
+        # Otherwise revisit an existing outcome, in proportion to how often it has been sampled so far
+        children = list(node.children.values())
+        return random.choices(children, weights=[child.visits for child in children])[0], False
+
+    def rollout(self, game_state: GameState, risk_map: RiskMap) -> list[float]:
+        """Play the given (owned) game state forward in place with the rollout agent for a number of turns, and return the evaluated rewards."""
+        turns_remaining = self.rollout_turns
+        current_player = game_state.current_player
+
+        # Rule-based strategies cannot pick up a chained action midway, so randomly complete any chain started within the tree first
+        while game_state.current_battle[0] != -1 or game_state.current_fortify[0] != -1:
+            game_state = random.choice(self.get_search_actions(ActionList.get_action_list(game_state, risk_map))).apply_in_place(game_state, risk_map)
+
+        while not game_state.is_terminal_state():
+            if game_state.current_player != current_player:
+                current_player = game_state.current_player
+                turns_remaining -= 1
+                if turns_remaining <= 0:
+                    break
+
+            if game_state.current_phase == GamePhase.DRAFT and isinstance(self.rollout_agent.draft_strategy, PlannedDraftStrategy):
+                valid_actions = None # planned draft strategies never read the action list, so skip building one per deployed troop
+            else:
+                valid_actions = LazyActionList(game_state, risk_map) # rule-based strategies only inspect the segments of the current phase
+            game_state = self.rollout_agent.select_action(valid_actions, game_state, risk_map).apply_in_place(game_state, risk_map)
+
+        return evaluate_game_state(game_state)
+
+    def get_playouts_per_second(self) -> float:
+        """Return the average search throughput of this agent so far."""
+        return self.total_playouts / self.total_search_time if self.total_search_time > 0 else 0.0
+
+    def is_reproducible(self) -> bool:
+        return self.time_limit is None # a wall-clock budget searches further on a faster (or less loaded) machine
+
+    @classmethod
+    def get_search_actions(cls, valid_actions: ActionList) -> list[Action]:
+        """Return the valid actions to search over. RANDOM transfer methods are excluded as they only add noise to the deterministic ONE/SPLIT/ALL choices."""
+        return [action for action in valid_actions.flatten() if getattr(action, "transfer_method", None) != TransferMethod.RANDOM]
+
+    @classmethod
+    def find_valid_action(cls, valid_actions: list[Action], action: Action) -> Action:
+        """Return the action from the list of valid actions equivalent to the given searched action."""
+        return next(valid_action for valid_action in valid_actions if type(valid_action) is type(action) and vars(valid_action) == vars(action))
+
+    @classmethod
+    def get_colour(cls) -> str:
+        return "blue"
@@ -6,11 +6,10 @@ from typing import Self
 
 from src.environment.map import RiskMap
 from src.environment.game_state import GamePhase, GameState
+from src.environment.queries import TRADE_IN_VALUE, attack_targets, fortify_targets, deployment_income # TRADE_IN_VALUE is re-exported, as it was defined here before moving to queries
 
 from src.utils.blitz_battle_simulator import BlitzBattleSimulator
 
-TRADE_IN_VALUE = 10
-
 battle_simulator = BlitzBattleSimulator()
 
 class TransferMethod(Enum):
@@ -20,9 +19,14 @@ class TransferMethod(Enum):
     ALL = 3
 
 class Action(ABC):    
-    @abstractmethod
     def apply(self, game_state: GameState, risk_map: RiskMap) -> GameState:
         """Return a copy of the game state resulting from applying this action to the given game state."""
+        self.validate_action(game_state, risk_map)
+        return self.apply_in_place(game_state.copy(), risk_map)
+
+    @abstractmethod
+    def apply_in_place(self, game_state: GameState, risk_map: RiskMap) -> GameState:
+        """Apply this action directly to the given game state WITHOUT validation, and return it. Only use on game states that nothing else references (e.g. search/rollout copies)."""
     
     @abstractmethod
     def validate_action(self, game_state: GameState, risk_map: RiskMap):
@@ -54,17 +58,14 @@ class DeployAction(Action):
     def __init__(self, territory_id: int):
         self.territory_id = territory_id
     
-    def apply(self, game_state: GameState, risk_map: RiskMap) -> GameState:
-        self.validate_action(game_state, risk_map)
-        new_state = game_state.copy()
+    def apply_in_place(self, game_state: GameState, risk_map: RiskMap) -> GameState:
+        game_state.territory_troops[self.territory_id] += 1
+        game_state.deployment_troops -= 1
 
-        new_state.territory_troops[self.territory_id] += 1
-        new_state.deployment_troops -= 1
-
-        if new_state.deployment_troops == 0:
-            return SkipAction().apply(new_state, risk_map) # Skip to attack phase after deploying all troops
+        if game_state.deployment_troops == 0:
+            return SkipAction().apply_in_place(game_state, risk_map) # Skip to attack phase after deploying all troops
         else:   
-            return new_state
+            return game_state
     
     def validate_action(self, game_state: GameState, risk_map: RiskMap):
         assert game_state.current_phase == GamePhase.DRAFT, "Can only apply DeployAction during draft phase"
@@ -104,13 +105,10 @@ class BattleFromAction(Action):
     def __init__(self, attacker_territory_id: int):
         self.attacker_territory_id = attacker_territory_id
     
-    def apply(self, game_state: GameState, risk_map: RiskMap) -> GameState:
-        self.validate_action(game_state, risk_map)
-        new_state = game_state.copy()
+    def apply_in_place(self, game_state: GameState, _: RiskMap) -> GameState:
+        game_state.current_battle = (self.attacker_territory_id, -1)
 
-        new_state.current_battle = (self.attacker_territory_id, -1)
-
-        return new_state
+        return game_state
     
     def validate_action(self, game_state: GameState, risk_map: RiskMap):
         assert game_state.current_phase == GamePhase.ATTACK, "Can only apply BattleFromAction during attack phase"
@@ -157,30 +155,32 @@ class BattleToAction(Action):
     def __init__(self, defender_territory_id: int):
         self.defender_territory_id = defender_territory_id
     
-    def apply(self, game_state: GameState, risk_map: RiskMap) -> GameState:
-        self.validate_action(game_state, risk_map)
-        new_state = game_state.copy()
-
+    def apply_in_place(self, game_state: GameState, risk_map: RiskMap) -> GameState:
         attacker_territory_id = game_state.current_battle[0]
         remaining_attacker_troops, remaining_defender_troops = battle_simulator.simulate_battle(game_state.territory_troops[attacker_territory_id], game_state.territory_troops[self.defender_territory_id])
 
-        new_state.territory_troops[attacker_territory_id] = remaining_attacker_troops
-        new_state.territory_troops[self.defender_territory_id] = remaining_defender_troops
+        return self.apply_outcome_in_place(game_state, risk_map, remaining_attacker_troops, remaining_defender_troops)
+
+    def apply_outcome_in_place(self, game_state: GameState, _: RiskMap, remaining_attacker_troops: int, remaining_defender_troops: int) -> GameState:
+        """Resolve this battle in place with a predetermined outcome, rather than simulating one."""
+        attacker_territory_id = game_state.current_battle[0]
+        game_state.territory_troops[attacker_territory_id] = remaining_attacker_troops
+        game_state.territory_troops[self.defender_territory_id] = remaining_defender_troops
 
         if remaining_defender_troops == 0: # Attacker wins battle
-            previous_territory_owner = new_state.territory_owners[self.defender_territory_id]
-            new_state.territory_owners[self.defender_territory_id] = new_state.current_player
-            new_state.current_battle = (attacker_territory_id, self.defender_territory_id)
-            new_state.territory_captured_this_turn = True
-
-            if all(territory_owner != previous_territory_owner for territory_owner in new_state.territory_owners): # Defender is eliminated
-                new_state.active_players[previous_territory_owner] = False
-                new_state.territory_card_counts[new_state.current_player] += new_state.territory_card_counts[previous_territory_owner]
-                new_state.territory_card_counts[previous_territory_owner] = 0
+            previous_territory_owner = game_state.territory_owners[self.defender_territory_id]
+            game_state.territory_owners[self.defender_territory_id] = game_state.current_player
+            game_state.current_battle = (attacker_territory_id, self.defender_territory_id)
+            game_state.territory_captured_this_turn = True
+
+            if all(territory_owner != previous_territory_owner for territory_owner in game_state.territory_owners): # Defender is eliminated
+                game_state.active_players[previous_territory_owner] = False
+                game_state.territory_card_counts[game_state.current_player] += game_state.territory_card_counts[previous_territory_owner]
+                game_state.territory_card_counts[previous_territory_owner] = 0
         else: # Defender wins battle
-            new_state.current_battle = (-1, -1)
+            game_state.current_battle = (-1, -1)
 
-        return new_state
+        return game_state
     
     def validate_action(self, game_state: GameState, risk_map: RiskMap):
         assert game_state.current_phase == GamePhase.ATTACK, "Can only apply BattleToAction during attack phase"
@@ -202,12 +202,7 @@ class BattleToAction(Action):
         if game_state.current_phase != GamePhase.ATTACK or attacker_territory_id == -1 or game_state.current_battle[1] != -1:
             return []
         
-        actions = []
-        for defender_territory_id in risk_map.get_border_ids(attacker_territory_id):
-            if game_state.territory_owners[defender_territory_id] != game_state.current_player:
-                actions.append(cls(defender_territory_id))
-        
-        return actions
+        return [cls(defender_territory_id) for defender_territory_id in attack_targets(game_state, risk_map, attacker_territory_id)]
     
     @classmethod
     def get_max_actions(cls, risk_map: RiskMap) -> int:
@@ -227,10 +222,7 @@ class TransferAction(Action):
     def __init__(self, transfer_method: TransferMethod):
         self.transfer_method = transfer_method
 
-    def apply(self, game_state: GameState, _: RiskMap) -> GameState:
-        self.validate_action(game_state, _)
-        new_state = game_state.copy()
-
+    def apply_in_place(self, game_state: GameState, _: RiskMap) -> GameState:
         if self.transfer_method == TransferMethod.RANDOM:
             troops_to_transfer = random.randint(1, game_state.territory_troops[game_state.current_battle[0]] - 1)
         elif self.transfer_method == TransferMethod.ONE:
@@ -240,11 +232,11 @@ class TransferAction(Action):
         elif self.transfer_method == TransferMethod.ALL:
             troops_to_transfer = game_state.territory_troops[game_state.current_battle[0]] - 1
 
-        new_state.territory_troops[new_state.current_battle[0]] -= troops_to_transfer
-        new_state.territory_troops[new_state.current_battle[1]] += troops_to_transfer
-        new_state.current_battle = (-1, -1)
+        game_state.territory_troops[game_state.current_battle[0]] -= troops_to_transfer
+        game_state.territory_troops[game_state.current_battle[1]] += troops_to_transfer
+        game_state.current_battle = (-1, -1)
         
-        return new_state
+        return game_state
     
     def validate_action(self, game_state: GameState, risk_map: RiskMap):
         assert game_state.current_phase == GamePhase.ATTACK, "Can only apply TransferAction during attack phase"
@@ -283,13 +275,10 @@ class FortifyFromAction(Action):
     def __init__(self, from_territory_id: int):
         self.from_territory_id = from_territory_id
     
-    def apply(self, game_state: GameState, risk_map: RiskMap) -> GameState:
-        self.validate_action(game_state, risk_map)
-        new_state = game_state.copy()
+    def apply_in_place(self, game_state: GameState, _: RiskMap) -> GameState:
+        game_state.current_fortify = (self.from_territory_id, -1)
 
-        new_state.current_fortify = (self.from_territory_id, -1)
-
-        return new_state
+        return game_state
 
     def validate_action(self, game_state: GameState, risk_map: RiskMap):
         assert game_state.current_phase == GamePhase.FORTIFY, "Can only apply FortifyFromAction during fortify phase"
@@ -336,20 +325,17 @@ class FortifyToAction(Action):
     def __init__(self, to_territory_id: int,):
         self.to_territory_id = to_territory_id
     
-    def apply(self, game_state: GameState, risk_map: RiskMap) -> GameState:
-        self.validate_action(game_state, risk_map)
-        new_state = game_state.copy()
+    def apply_in_place(self, game_state: GameState, _: RiskMap) -> GameState:
+        game_state.current_fortify = (game_state.current_fortify[0], self.to_territory_id)
 
-        new_state.current_fortify = (game_state.current_fortify[0], self.to_territory_id)
-
-        return new_state
+        return game_state
     
     def validate_action(self, game_state: GameState, risk_map: RiskMap):
         assert game_state.current_phase == GamePhase.FORTIFY, "Can only apply FortifyToAction during fortify phase"
         assert game_state.current_fortify[0] != -1 and game_state.current_fortify[1] == -1, "Must apply FortifyToAction after FortifyFromAction and before FortifyAmountAction"
         assert game_state.current_fortify[0] != self.to_territory_id, "From and to territories cannot be the same"
         assert game_state.territory_owners[self.to_territory_id] == game_state.current_player, "To territory must be owned by current player"
-        assert self.to_territory_id in self.get_connected_territories(game_state, risk_map, game_state.current_fortify[0], set()), "From and to territories must be connected"
+        assert self.to_territory_id in fortify_targets(game_state, risk_map, game_state.current_fortify[0]), "From and to territories must be connected"
         assert 0 <= self.encode_action(risk_map) < self.get_max_actions(risk_map), "Encoded action index out of bounds"
     
     def encode_action(self, _: RiskMap) -> int:
@@ -364,17 +350,7 @@ class FortifyToAction(Action):
         if game_state.current_phase != GamePhase.FORTIFY or game_state.current_fortify[0] == -1 or game_state.current_fortify[1] != -1:
             return []
         
-        return [cls(to_territory_id) for to_territory_id in cls.get_connected_territories(game_state, risk_map, game_state.current_fortify[0], set()) - {game_state.current_fortify[0]}]
-
-    @classmethod
-    def get_connected_territories(cls, game_state: GameState, risk_map: RiskMap, territory_id: int, visited: set[int]) -> set[int]:
-        visited.add(territory_id)
-        connected_territories = {territory_id}
-        for border_id in risk_map.get_border_ids(territory_id):
-            if border_id not in visited and game_state.territory_owners[border_id] == game_state.current_player:
-                connected_territories |= cls.get_connected_territories(game_state, risk_map, border_id, visited)
-
-        return connected_territories
+        return [cls(to_territory_id) for to_territory_id in fortify_targets(game_state, risk_map, game_state.current_fortify[0])]
 
     @classmethod
     def get_max_actions(cls, risk_map: RiskMap) -> int:
@@ -394,10 +370,7 @@ class FortifyAmountAction(Action):
     def __init__(self, transfer_method: TransferMethod):
         self.transfer_method = transfer_method
 
-    def apply(self, game_state: GameState, risk_map: RiskMap) -> GameState:
-        self.validate_action(game_state, risk_map)
-        new_state = game_state.copy()
-
+    def apply_in_place(self, game_state: GameState, risk_map: RiskMap) -> GameState:
         if self.transfer_method == TransferMethod.RANDOM:
             troops_to_transfer = random.randint(1, game_state.territory_troops[game_state.current_fortify[0]] - 1)
         elif self.transfer_method == TransferMethod.ONE:
@@ -407,11 +380,11 @@ class FortifyAmountAction(Action):
         elif self.transfer_method == TransferMethod.ALL:
             troops_to_transfer = game_state.territory_troops[game_state.current_fortify[0]] - 1
 
-        new_state.territory_troops[new_state.current_fortify[1]] += troops_to_transfer
-        new_state.territory_troops[new_state.current_fortify[0]] -= troops_to_transfer
-        new_state.current_fortify = (-1, -1)
+        game_state.territory_troops[game_state.current_fortify[1]] += troops_to_transfer
+        game_state.territory_troops[game_state.current_fortify[0]] -= troops_to_transfer
+        game_state.current_fortify = (-1, -1)
         
-        return SkipAction().apply(new_state, risk_map) # Skip to end turn after fortifying
+        return SkipAction().apply_in_place(game_state, risk_map) # Skip to end turn after fortifying
     
     def validate_action(self, game_state: GameState, risk_map: RiskMap):
         assert game_state.current_phase == GamePhase.FORTIFY, "Can only apply FortifyAmountAction during fortify phase"
@@ -447,31 +420,27 @@ class FortifyAmountAction(Action):
         return isinstance(other, FortifyAmountAction) and self.transfer_method == other.transfer_method
 
 class SkipAction(Action):
-    def apply(self, game_state: GameState, risk_map: RiskMap) -> GameState:
-        self.validate_action(game_state, risk_map)
-        new_state = game_state.copy()
-
-        if new_state.current_phase == GamePhase.DRAFT:
-            new_state.current_phase = GamePhase.ATTACK
-        elif new_state.current_phase == GamePhase.ATTACK:
-            new_state.current_phase = GamePhase.FORTIFY
-        elif new_state.current_phase == GamePhase.FORTIFY:
+    def apply_in_place(self, game_state: GameState, risk_map: RiskMap) -> GameState:
+        if game_state.current_phase == GamePhase.DRAFT:
+            game_state.current_phase = GamePhase.ATTACK
+        elif game_state.current_phase == GamePhase.ATTACK:
+            game_state.current_phase = GamePhase.FORTIFY
+        elif game_state.current_phase == GamePhase.FORTIFY:
             # Gain a territory card if a player captured a territory this turn
-            if new_state.territory_captured_this_turn:
-                new_state.territory_card_counts[new_state.current_player] += 1
-                new_state.territory_captured_this_turn = False
+            if game_state.territory_captured_this_turn:
+                game_state.territory_card_counts[game_state.current_player] += 1
+                game_state.territory_captured_this_turn = False
             
-            new_state.current_phase = GamePhase.DRAFT
-            new_state.current_player = (new_state.current_player + 1) % len(new_state.active_players)
-            while new_state.active_players[new_state.current_player] == False:
-                new_state.current_player = (new_state.current_player + 1) % len(new_state.active_players)
+            game_state.current_phase = GamePhase.DRAFT
+            game_state.current_player = (game_state.current_player + 1) % len(game_state.active_players)
+            while game_state.active_players[game_state.current_player] == False:
+                game_state.current_player = (game_state.current_player + 1) % len(game_state.active_players)
             
             # Calculate deployment troops for next player
-            new_state.deployment_troops = max(3, len(new_state.get_player_owned_territory_ids()) // 3) + risk_map.get_player_continent_bonuses(new_state.current_player, new_state.territory_owners)
-            new_state.deployment_troops += (new_state.territory_card_counts[new_state.current_player] // 3) * TRADE_IN_VALUE
-            new_state.territory_card_counts[new_state.current_player] = new_state.territory_card_counts[new_state.current_player] % 3
+            game_state.deployment_troops = deployment_income(game_state, risk_map, game_state.current_player)
+            game_state.territory_card_counts[game_state.current_player] = game_state.territory_card_counts[game_state.current_player] % 3
 
-        return new_state
+        return game_state
     
     def validate_action(self, game_state: GameState, risk_map: RiskMap):
         if game_state.current_phase == GamePhase.DRAFT:
@@ -588,3 +557,48 @@ class ActionList:
     
     def flatten(self) -> list[Action]:
         return self.deploy_actions + self.battle_from_actions + self.battle_to_actions + self.transfer_actions + self.fortify_from_actions + self.fortify_to_actions + self.fortify_amount_actions + self.skip_actions
+
+class LazyActionList(ActionList):
+    """ActionList whose segments are only generated (once) when first accessed. Policies typically only inspect the segments of the current phase, so this skips generating the rest."""
+    def __init__(self, game_state: GameState, risk_map: RiskMap):
+        self.game_state = game_state
+        self.risk_map = risk_map
+        self.segments: dict[type[Action], list[Action]] = {}
+
+    def get_segment(self, action_class: type[Action]) -> list[Action]:
+        if action_class not in self.segments:
+            self.segments[action_class] = action_class.get_action_list(self.game_state, self.risk_map)
+
+        return self.segments[action_class]
+
+    @property
+    def deploy_actions(self) -> list[DeployAction]:
+        return self.get_segment(DeployAction)
+
+    @property
+    def battle_from_actions(self) -> list[BattleFromAction]:
+        return self.get_segment(BattleFromAction)
+
+    @property
+    def battle_to_actions(self) -> list[BattleToAction]:
+        return self.get_segment(BattleToAction)
+
+    @property
+    def transfer_actions(self) -> list[TransferAction]:
+        return self.get_segment(TransferAction)
+
+    @property
+    def fortify_from_actions(self) -> list[FortifyFromAction]:
+        return self.get_segment(FortifyFromAction)
+
+    @property
+    def fortify_to_actions(self) -> list[FortifyToAction]:
+        return self.get_segment(FortifyToAction)
+
+    @property
+    def fortify_amount_actions(self) -> list[FortifyAmountAction]:
+        return self.get_segment(FortifyAmountAction)
+
+    @property
+    def skip_actions(self) -> list[SkipAction]:
+        return self.get_segment(SkipAction)
@@ -2,6 +2,8 @@ import json
 from pathlib import Path
 from typing import Set, Dict
 
+import numpy as np
+
 class Territory:
     def __init__(self, id: int, name: str):
         self.id = id
@@ -29,6 +31,13 @@ class RiskMap:
         self.continents = continents
         self.validate()
 
+        # Precomputed indexes, in ascending territory id order so that action lists (and tie-breaks between them) are reproducible across processes
+        self.border_ids: list[list[int]] = [sorted(border.id for border in self.territories[territory_id].borders) for territory_id in range(len(self.territories))]
+        self.adjacency_matrix = np.zeros((len(self.territories), len(self.territories)), dtype=bool)
+        for territory_id, border_ids in enumerate(self.border_ids):
+            self.adjacency_matrix[territory_id, border_ids] = True
+        self.continent_territory_ids: dict[int, list[int]] = {continent_id: sorted(territory.id for territory in continent.territories) for continent_id, continent in self.continents.items()}
+
     @classmethod
     def from_json(cls, path = None, json_data = None):
         if json_data is not None:
@@ -80,14 +89,14 @@ class RiskMap:
         assert len(visited) == len(self.territories), f"The map is not connected"
     
     def get_border_ids(self, territory_id: int) -> list[int]:
-        return [border.id for border in self.territories[territory_id].borders]
+        return self.border_ids[territory_id]
     
     def get_player_continent_bonuses(self, player_id: int, territory_owners: list[int]) -> int:
         continent_bonuses = 0
 
-        for continent in self.continents.values():
-            if all(territory_owners[territory.id] == player_id for territory in continent.territories):
-                continent_bonuses += continent.bonus
+        for continent_id, continent_territory_ids in self.continent_territory_ids.items():
+            if all(territory_owners[territory_id] == player_id for territory_id in continent_territory_ids):
+                continent_bonuses += self.continents[continent_id].bonus
 
         return continent_bonuses
     
@@ -0,0 +1,69 @@
+"""Read-only "what-if" queries on a game state. These never mutate nor copy the game state, so strategies can explore their options for free."""
+
+from src.environment.game_state import GamePhase, GameState
+from src.environment.map import RiskMap
+
+TRADE_IN_VALUE = 10
+
+def attack_targets(game_state: GameState, risk_map: RiskMap, territory_id: int) -> list[int]:
+    """Return the defender territory ids that a battle from the given territory would allow, i.e. its bordering enemy territories."""
+    territory_owners = game_state.territory_owners
+    current_player = game_state.current_player
+
+    return [border_id for border_id in risk_map.border_ids[territory_id] if territory_owners[border_id] != current_player]
+
+def fortify_targets(game_state: GameState, risk_map: RiskMap, territory_id: int) -> list[int]:
+    """Return the (ascending) territory ids that a fortify from the given territory would allow, i.e. every other territory in its friendly component."""
+    territory_owners = game_state.territory_owners
+    current_player = game_state.current_player
+
+    visited = {territory_id}
+    frontier = [territory_id]
+    while frontier:
+        for border_id in risk_map.border_ids[frontier.pop()]:
+            if border_id not in visited and territory_owners[border_id] == current_player:
+                visited.add(border_id)
+                frontier.append(border_id)
+    visited.remove(territory_id)
+
+    return sorted(visited)
+
+def deployment_income(game_state: GameState, risk_map: RiskMap, player_i: int) -> int:
+    """Return the number of troops the given player would receive at the start of their draft phase, including any territory card trade-ins."""
+    owned_territory_count = sum(1 for owner in game_state.territory_owners if owner == player_i)
+
+    return max(3, owned_territory_count // 3) + \
+           risk_map.get_player_continent_bonuses(player_i, game_state.territory_owners) + \
+           (game_state.territory_card_counts[player_i] // 3) * TRADE_IN_VALUE
+
+def legal_action_count(game_state: GameState, risk_map: RiskMap) -> int:
+    """Return the number of valid actions for the given game state, equivalent to ActionList.get_action_list(game_state, risk_map).size()."""
+    territory_owners = game_state.territory_owners
+    territory_troops = game_state.territory_troops
+    current_player = game_state.current_player
+    action_count = 0
+
+    if game_state.current_phase == GamePhase.DRAFT:
+        if game_state.deployment_troops > 0:
+            action_count += sum(1 for owner in territory_owners if owner == current_player) # DeployAction
+    elif game_state.current_phase == GamePhase.ATTACK:
+        attacker_territory_id, defender_territory_id = game_state.current_battle
+        if attacker_territory_id == -1:
+            action_count += sum(1 for territory_id, owner in enumerate(territory_owners) if owner == current_player and territory_troops[territory_id] >= 2 and any(territory_owners[border_id] != current_player for border_id in risk_map.border_ids[territory_id])) # BattleFromAction
+        elif defender_territory_id == -1:
+            action_count += len(attack_targets(game_state, risk_map, attacker_territory_id)) # BattleToAction
+        else:
+            action_count += 4 # TransferAction, one per TransferMethod
+    elif game_state.current_phase == GamePhase.FORTIFY:
+        from_territory_id, to_territory_id = game_state.current_fortify
+        if from_territory_id == -1:
+            action_count += sum(1 for territory_id, owner in enumerate(territory_owners) if owner == current_player and territory_troops[territory_id] >= 2 and any(territory_owners[border_id] == current_player for border_id in risk_map.border_ids[territory_id])) # FortifyFromAction
+        elif to_territory_id == -1:
+            action_count += len(fortify_targets(game_state, risk_map, from_territory_id)) # FortifyToAction
+        else:
+            action_count += 4 # FortifyAmountAction, one per TransferMethod
+
+    if game_state.deployment_troops == 0 and game_state.current_battle == (-1, -1) and game_state.current_fortify == (-1, -1):
+        action_count += 1 # SkipAction
+
+    return action_count
@@ -1,4 +1,6 @@
+import json
 import os
+import random
 
 from collections import defaultdict
 
@@ -10,7 +12,10 @@ from src.environment.map import RiskMap
 
 from src.observers.outcome_observer import OutcomeObserver
 
+from src.runners.early_stopping import EarlyStopping
+from src.runners.results_cache import ResultsCache
 from src.runners.simulation_runner import SimulationRunner
+from src.runners.sweep_runner import SweepRunner
 
 from src.utils.k_clique_generator import KCliqueGenerator
 
@@ -20,37 +25,71 @@ class Experiment1:
         clique_size: int,
         agent_composition: list[Agent],
         num_episodes_per_simulation: int = 1000,
-        density_interval_size: float = 0.01
+        density_interval_size: float = 0.01,
+        num_workers: int = 1,
+        checkpoint_dir: str = None,
+        early_stopping: EarlyStopping = None,
+        seed: int = None,
+        results_cache: ResultsCache = None
     ):
         self.clique_size = clique_size
         self.agent_composition = agent_composition
         self.num_episodes_per_simulation = num_episodes_per_simulation
         self.density_interval_size = density_interval_size
+        self.num_workers = num_workers # worker processes the densities' simulations are distributed across
+        self.checkpoint_dir = checkpoint_dir # if given, each density's map and simulation progress are saved here, so that a rerun resumes where it stopped
+        self.early_stopping = early_stopping # if given, each density's simulation stops once its outcome is certain enough, so that episodes are spent where it is not
+        self.seed = seed # if given, the generated maps and every simulation's episodes are reproducible
+        self.results_cache = results_cache # if given (with a seed), each density's results are reused by reruns of the same experiment
 
         self.simulations: dict[float, SimulationRunner] = {} # key=density, value=SimulationRunner with that density
         self.agent_stats: dict[Agent, dict[str, list[float]]] = defaultdict(lambda: defaultdict(list)) # key=agent, value={key=metric name, value=metric value}
         self.game_length_stats: dict[str, list[float]] = defaultdict(list) # key=metric name, value=metric value
     
     def run_experiment(self):
-        density = 2 / self.clique_size
+        if self.seed is not None:
+            random.seed(self.seed)
+        sweep_runner = SweepRunner(f"{self.clique_size}-Clique density sweep", self.get_densities(), self.create_simulation_runner, num_workers=self.num_workers)
+        self.simulations = sweep_runner.run_sweep()
+        self.calculate_stats()
 
+    def get_densities(self) -> list[float]:
+        densities = []
+        density = 2 / self.clique_size
         while density <= 1:
-            os.system('cls' if os.name == 'nt' else 'clear')
-            print(f"Running simulation for {self.clique_size}-Clique with Density {density:.2f}:")
-            risk_map = RiskMap.from_json(json_data=KCliqueGenerator.generate(k=self.clique_size, density=density))
-            simulation_runner = SimulationRunner(
-                title=f"{self.clique_size}-Clique with Density {density:.2f} Simulation",
-                risk_map=risk_map,
-                agents=self.agent_composition,
-                num_episodes=self.num_episodes_per_simulation,
-                observers=[OutcomeObserver()],
-                shuffle_turn_order=True
-            )
-            simulation_runner.run_simulation()
-            self.simulations[density] = simulation_runner
+            densities.append(density)
             density = round(self.density_interval_size * (round(density / self.density_interval_size) + 1), 2)
-      
-        self.calculate_stats()
+
+        return densities
+
+    def create_simulation_runner(self, density: float) -> SimulationRunner:
+        return SimulationRunner(
+            title=f"{self.clique_size}-Clique with Density {density:.2f} Simulation",
+            risk_map=RiskMap.from_json(json_data=self.get_map_json(density)),
+            agents=self.agent_composition,
+            num_episodes=self.num_episodes_per_simulation,
+            observers=[OutcomeObserver()],
+            shuffle_turn_order=True,
+            retain_game_observations=False,
+            checkpoint_path=os.path.join(self.checkpoint_dir, f"density_{density:.2f}.pkl") if self.checkpoint_dir else None,
+            early_stopping=self.early_stopping,
+            seed=self.seed,
+            results_cache=self.results_cache
+        )
+
+    def get_map_json(self, density: float) -> dict:
+        """Generate the k-clique map of the given density, or reload the one generated for it by a previous, interrupted run."""
+        if not self.checkpoint_dir:
+            return KCliqueGenerator.generate(k=self.clique_size, density=density)
+
+        map_path = os.path.join(self.checkpoint_dir, f"density_{density:.2f}.json")
+        if not os.path.exists(map_path):
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            with open(map_path, "w") as map_file:
+                json.dump(KCliqueGenerator.generate(k=self.clique_size, density=density), map_file)
+
+        with open(map_path) as map_file:
+            return json.load(map_file)
     
     def calculate_stats(self):
         """Calculate stats for each agent and overall game stats across all simulations"""
@@ -58,10 +97,10 @@ class Experiment1:
 
         for density in densities:
             simulation_runner = self.simulations[density]
-            outcome_observers = [next(observer for observer in observer_manager.observers if isinstance(observer, OutcomeObserver)) for observer_manager in simulation_runner.game_observations]
+            outcome_reducer = simulation_runner.get_observer_reducer(OutcomeObserver)
 
             # Calculate win rate and average finish position for each agent
-            winner_distributions = OutcomeObserver.get_winner_distributions(outcome_observers)
+            winner_distributions = OutcomeObserver.get_winner_distributions(outcome_reducer)
             for row in winner_distributions:
                 agent_name = row[0]
                 win_rate = row[-2]
@@ -71,7 +110,7 @@ class Experiment1:
                 self.agent_stats[agent][f"average_finish_positions"].append(average_finish_position)
         
             # Calculate average, minimum, and maximum number of actions/turns per episode across all episodes in the simulation
-            game_length_stats = OutcomeObserver.get_game_length_statistics(outcome_observers)
+            game_length_stats = OutcomeObserver.get_game_length_statistics(outcome_reducer)
             average_actions, maximum_actions, minimum_actions = game_length_stats[0][2], game_length_stats[0][3], game_length_stats[0][4]
             average_turns, maximum_turns, minimum_turns = game_length_stats[1][2], game_length_stats[1][3], game_length_stats[1][4]
             self.game_length_stats[f"average_action_length"].append(average_actions)
@@ -146,6 +185,6 @@ class Experiment1:
 
 if __name__ == "__main__":
     CLIQUE_SIZE = 16
-    experiment = Experiment1(clique_size=CLIQUE_SIZE, agent_composition=[CommunistAgent(), CapitalistAgent(), RandomAgent(), RandomAgent()])
+    experiment = Experiment1(clique_size=CLIQUE_SIZE, agent_composition=[CommunistAgent(), CapitalistAgent(), RandomAgent(), RandomAgent()], num_workers=os.cpu_count(), checkpoint_dir=f"experiment_results/checkpoints/experiment1_{CLIQUE_SIZE}_clique")
     experiment.run_experiment()
     experiment.plot_results()
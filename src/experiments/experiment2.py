@@ -1,4 +1,6 @@
+import json
 import os
+import random
 
 from collections import defaultdict
 
@@ -10,7 +12,10 @@ from src.environment.map import RiskMap
 
 from src.observers.outcome_observer import OutcomeObserver
 
+from src.runners.early_stopping import EarlyStopping
+from src.runners.results_cache import ResultsCache
 from src.runners.simulation_runner import SimulationRunner
+from src.runners.sweep_runner import SweepRunner
 
 from src.utils.k_clique_generator import KCliqueGenerator
 
@@ -22,49 +27,73 @@ class Experiment2:
         map_size_interval: int = 1,
         map_density: float = 0.1,
         num_episodes_per_simulation: int = 1000,
+        num_workers: int = 1,
+        checkpoint_dir: str = None,
+        early_stopping: EarlyStopping = None,
+        seed: int = None,
+        results_cache: ResultsCache = None
     ):
         self.map_size_start = map_size_start
         self.map_size_end = map_size_end
         self.map_size_interval = map_size_interval
         self.map_density = map_density
         self.num_episodes_per_simulation = num_episodes_per_simulation
+        self.num_workers = num_workers # worker processes the map sizes' simulations are distributed across (largest maps first)
+        self.checkpoint_dir = checkpoint_dir # if given, each map size's map and simulation progress are saved here, so that a rerun resumes where it stopped
+        self.early_stopping = early_stopping # if given, each map size's simulation stops once its outcome is certain enough, so that episodes are spent where it is not
+        self.seed = seed # if given, the generated maps and every simulation's episodes are reproducible
+        self.results_cache = results_cache # if given (with a seed), each map size's results are reused by reruns of the same experiment
 
         self.map_sizes = list(range(self.map_size_start, self.map_size_end + 1, self.map_size_interval))
         self.simulations: dict[int, SimulationRunner] = {}
         self.stats: dict[str, list[float]] = defaultdict(list)
 
     def run_experiment(self):
-        for map_size in self.map_sizes:
-            os.system('cls' if os.name == 'nt' else 'clear')
-            print(f"Running simulation for map size {map_size}/{self.map_size_end}")
-
-            Agent.reset_player_ids()
-            risk_map = RiskMap.from_json(json_data=KCliqueGenerator.generate(k=map_size, density=self.map_density))
-            simulation_runner = SimulationRunner(
-                title=f"Random vs Random fixed order - map size {map_size}",
-                risk_map=risk_map,
-                agents=[RandomAgent(), RandomAgent()],
-                num_episodes=self.num_episodes_per_simulation,
-                observers=[OutcomeObserver()],
-                shuffle_turn_order=False,
-            )
-            simulation_runner.run_simulation()
-            self.simulations[map_size] = simulation_runner
-
+        if self.seed is not None:
+            random.seed(self.seed)
+        sweep_runner = SweepRunner("Map size sweep", self.map_sizes, self.create_simulation_runner, num_workers=self.num_workers)
+        self.simulations = sweep_runner.run_sweep()
         self.calculate_stats()
 
+    def create_simulation_runner(self, map_size: int) -> SimulationRunner:
+        Agent.reset_player_ids()
+        return SimulationRunner(
+            title=f"Random vs Random fixed order - map size {map_size}",
+            risk_map=RiskMap.from_json(json_data=self.get_map_json(map_size)),
+            agents=[RandomAgent(), RandomAgent()],
+            num_episodes=self.num_episodes_per_simulation,
+            observers=[OutcomeObserver()],
+            shuffle_turn_order=False,
+            retain_game_observations=False,
+            checkpoint_path=os.path.join(self.checkpoint_dir, f"map_size_{map_size}.pkl") if self.checkpoint_dir else None,
+            early_stopping=self.early_stopping,
+            seed=self.seed,
+            results_cache=self.results_cache
+        )
+
+    def get_map_json(self, map_size: int) -> dict:
+        """Generate the k-clique map of the given size, or reload the one generated for it by a previous, interrupted run."""
+        if not self.checkpoint_dir:
+            return KCliqueGenerator.generate(k=map_size, density=self.map_density)
+
+        map_path = os.path.join(self.checkpoint_dir, f"map_size_{map_size}.json")
+        if not os.path.exists(map_path):
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            with open(map_path, "w") as map_file:
+                json.dump(KCliqueGenerator.generate(k=map_size, density=self.map_density), map_file)
+
+        with open(map_path) as map_file:
+            return json.load(map_file)
+
     def calculate_stats(self):
         for map_size in sorted(self.simulations.keys()):
             simulation_runner = self.simulations[map_size]
-            outcome_observers = [
-                next(observer for observer in observer_manager.observers if isinstance(observer, OutcomeObserver))
-                for observer_manager in simulation_runner.game_observations
-            ]
+            outcome_reducer = simulation_runner.get_observer_reducer(OutcomeObserver)
 
-            winner_distributions = OutcomeObserver.get_winner_distributions(outcome_observers)
-            game_length_stats = OutcomeObserver.get_game_length_statistics(outcome_observers)
+            winner_distributions = OutcomeObserver.get_winner_distributions(outcome_reducer)
+            game_length_stats = OutcomeObserver.get_game_length_statistics(outcome_reducer)
 
-            player_1_name = outcome_observers[0].core_observer.player_telemetries[0].player_name
+            player_1_name = outcome_reducer.player_names[0]
             player_1_distribution = next(row for row in winner_distributions if row[0] == player_1_name)
 
             self.stats["player_1_win_rate"].append(player_1_distribution[-2])
@@ -117,6 +146,6 @@ class Experiment2:
         plt.show()
 
 if __name__ == "__main__":
-    experiment = Experiment2()
+    experiment = Experiment2(num_workers=os.cpu_count(), checkpoint_dir="experiment_results/checkpoints/experiment2")
     experiment.run_experiment()
     experiment.plot_results()
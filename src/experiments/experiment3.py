@@ -1,8 +1,6 @@
 from matplotlib import pyplot as plt
 from matplotlib.patches import Patch
 
-from collections import defaultdict
-
 from src.agents.agent import Agent
 
 from src.environment.map import RiskMap
@@ -11,6 +9,8 @@ from src.observers.battle_observer import BattleObserver
 from src.observers.deploy_observer import DeployObserver
 from src.observers.outcome_observer import OutcomeObserver
 
+from src.runners.early_stopping import EarlyStopping
+from src.runners.results_cache import ResultsCache
 from src.runners.simulation_runner import SimulationRunner
 
 from src.train.rl_agent import RLAgent
@@ -23,6 +23,11 @@ class Experiment3:
         risk_map: RiskMap,
         num_players: int,
         num_episodes: int = 10000,
+        num_concurrent_games: int = 64, # games played at once, so that the RL agent's decisions across them are evaluated in batches
+        checkpoint_path: str = None, # if given, simulation progress is saved here, so that a rerun resumes where it stopped
+        early_stopping: EarlyStopping = None, # if given, the simulation stops once the RL agent's win rate is certain enough, with num_episodes as a cap
+        seed: int = None, # if given, the RL agent's opponents and every episode are reproducible
+        results_cache: ResultsCache = None, # if given (with a seed), results are reused by reruns of the same experiment
     ):
         self.risk_map = risk_map
         self.num_players = num_players
@@ -38,7 +43,13 @@ class Experiment3:
             max_episode_length=1000, # Avoid skewing statistics with extremely long games
             observers=[OutcomeObserver(), BattleObserver(), DeployObserver()],
             enable_rl_agent_performance_test=True,
-            rl_agent_performance_test_num_players=self.num_players
+            rl_agent_performance_test_num_players=self.num_players,
+            num_concurrent_games=num_concurrent_games,
+            retain_game_observations=False, # fold each episode into running totals, rather than holding every episode's logs in memory
+            checkpoint_path=checkpoint_path,
+            early_stopping=early_stopping,
+            seed=seed,
+            results_cache=results_cache
         )
     
     def run_experiment(self):
@@ -46,46 +57,31 @@ class Experiment3:
         self.simulation_runner.summarise_simulation()
     
     def plot_rl_win_rate_graph(self, ax: plt.Axes):
-        outcome_observers = [
-            next(observer for observer in observer_manager.observers if isinstance(observer, OutcomeObserver))
-            for observer_manager in self.simulation_runner.game_observations
-        ]
-        rl_win_rate = OutcomeObserver.get_winner_distributions(outcome_observers, rl_agent_performance_test=True)[0][-2]
+        outcome_reducer = self.simulation_runner.get_observer_reducer(OutcomeObserver)
+        rl_win_rate = OutcomeObserver.get_winner_distributions(outcome_reducer, rl_agent_performance_test=True)[0][-2]
         ax.bar("RL Agent", rl_win_rate, color="darkblue")
         ax.bar("Other Agents", (100 - rl_win_rate), color="darkorange")
         ax.set_title("Win Rate (%)")
         ax.set_ylim(0, 100)
     
     def plot_rl_battle_heatmap_graph(self, ax: plt.Axes):
-        battle_observers = [
-            next(observer for observer in observer_manager.observers if isinstance(observer, BattleObserver))
-            for observer_manager in self.simulation_runner.game_observations
-        ]
-
-        rl_battle_logs = BattleObserver.get_battle_logs(battle_observers, player_name=self.rl_agent.get_name())
-        territory_battle_counts: defaultdict[int, int] = defaultdict(int)
-        for log in rl_battle_logs:
-            territory_battle_counts[log.defender_territory_id] += 1
+        battle_reducer = self.simulation_runner.get_observer_reducer(BattleObserver)
+        territory_battle_counts = battle_reducer.defender_territory_counts[self.rl_agent.get_name()]
+        total_battle_count = sum(territory_battle_counts.values())
 
         for territory_id, count in sorted(territory_battle_counts.items()):
-            ax.bar(self.risk_map.territories[territory_id].name, count / len(rl_battle_logs) * 100, color="darkgreen")
+            ax.bar(self.risk_map.territories[territory_id].name, count / total_battle_count * 100, color="darkgreen")
         
         ax.set_title("Battle Distribution (%)")
         ax.set_xlabel("Territory")
     
     def plot_rl_deploy_heatmap_graph(self, ax: plt.Axes):
-        deploy_observers = [
-            next(observer for observer in observer_manager.observers if isinstance(observer, DeployObserver))
-            for observer_manager in self.simulation_runner.game_observations
-        ]
-
-        rl_deploy_logs = DeployObserver.get_deploy_logs(deploy_observers, player_name=self.rl_agent.get_name())
-        territory_deploy_counts: defaultdict[int, int] = defaultdict(int)
-        for log in rl_deploy_logs:
-            territory_deploy_counts[log.territory_id] += 1
+        deploy_reducer = self.simulation_runner.get_observer_reducer(DeployObserver)
+        territory_deploy_counts = deploy_reducer.territory_deploy_counts[self.rl_agent.get_name()]
+        total_deploy_count = sum(territory_deploy_counts.values())
 
         for territory_id, count in sorted(territory_deploy_counts.items()):
-            ax.bar(self.risk_map.territories[territory_id].name, count / len(rl_deploy_logs) * 100, color="darkred")
+            ax.bar(self.risk_map.territories[territory_id].name, count / total_deploy_count * 100, color="darkred")
         
         ax.set_title("Deploy Distribution (%)")
         ax.set_xlabel("Territory")
@@ -93,19 +89,8 @@ class Experiment3:
     def plot_rl_battle_temporal_graph(self, ax: plt.Axes):
         MAX_TURNS = 50
         
-        battle_observers = [
-            next(observer for observer in observer_manager.observers if isinstance(observer, BattleObserver))
-            for observer_manager in self.simulation_runner.game_observations
-        ]
-        rl_battle_logs = BattleObserver.get_battle_logs(battle_observers, player_name=self.rl_agent.get_name())
-
-        battle_data_per_turn: dict[int, tuple[int, int]] = defaultdict(lambda: (0, 0)) # key=turn_number, value=(total_battle_count, total_battle_differential)
-        for log in rl_battle_logs:
-            if log.turn_number <= MAX_TURNS:
-                battle_data_per_turn[log.turn_number] = (
-                    battle_data_per_turn[log.turn_number][0] + 1,
-                    battle_data_per_turn[log.turn_number][1] + log.attacker_troops - log.defender_troops
-                )
+        battle_reducer = self.simulation_runner.get_observer_reducer(BattleObserver)
+        battle_data_per_turn = {turn: totals for turn, totals in battle_reducer.turn_battle_totals[self.rl_agent.get_name()].items() if turn <= MAX_TURNS} # key=turn_number, value=[total_battle_count, total_battle_differential]
         
         for turn in sorted(battle_data_per_turn.keys()):
             total_battle_count, total_battle_differential = battle_data_per_turn[turn]
@@ -124,7 +109,7 @@ class Experiment3:
                 bar_color = "green"
             elif average_battle_differential >= 10:
                 bar_color = "darkgreen"
-            ax.bar(turn, total_battle_count / self.num_episodes, color=bar_color, alpha=0.6)
+            ax.bar(turn, total_battle_count / self.simulation_runner.num_finished_episodes, color=bar_color, alpha=0.6)
 
         legend_bins = [
             ("Disparity < 0", "darkred"),
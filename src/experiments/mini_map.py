@@ -5,13 +5,14 @@ from src.environment.map import RiskMap
 from src.observers.battle_observer import BattleObserver
 from src.observers.outcome_observer import OutcomeObserver
 
+from src.runners.results_cache import ResultsCache
 from src.runners.simulation_runner import SimulationRunner
 
 if __name__ == "__main__":
     Agent.reset_player_ids()
     risk_map = RiskMap.from_json(path="maps/mini.json")
     agents = [CommunistAgent(disparity=0), CommunistAgent(disparity=0)]
-    simulation_runner = SimulationRunner("Communist vs Communist static player ordering", risk_map, agents, 1000, observers=[OutcomeObserver(), BattleObserver()], shuffle_turn_order=False)
+    simulation_runner = SimulationRunner("Communist vs Communist static player ordering", risk_map, agents, 1000, observers=[OutcomeObserver(), BattleObserver()], shuffle_turn_order=False, seed=0, retain_game_observations=False, results_cache=ResultsCache())
     simulation_runner.run_simulation()
     simulation_runner.summarise_simulation()
 
@@ -19,6 +20,6 @@ if __name__ == "__main__":
     Agent.reset_player_ids()
     risk_map = RiskMap.from_json(path="maps/mini.json")
     agents = [CommunistAgent(disparity=0), CommunistAgent(disparity=0)]
-    simulation_runner = SimulationRunner("Communist vs Communist shuffled player ordering", risk_map, agents, 1000, observers=[OutcomeObserver(), BattleObserver()], shuffle_turn_order=True)
+    simulation_runner = SimulationRunner("Communist vs Communist shuffled player ordering", risk_map, agents, 1000, observers=[OutcomeObserver(), BattleObserver()], shuffle_turn_order=True, seed=0, retain_game_observations=False, results_cache=ResultsCache())
     simulation_runner.run_simulation()
     simulation_runner.summarise_simulation()
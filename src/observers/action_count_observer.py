@@ -37,9 +37,8 @@ class ActionCountObserver(Observer):
         self.push_action_counts_this_turn(terminal_state.current_player)
     
     def push_action_counts_this_turn(self, current_player: int):
-        for action_type, (generated_count, executed_count) in self.action_counts_this_turn.items():
-            self.core_observer.player_telemetries[current_player].action_counts[action_type][0].append(generated_count)
-            self.core_observer.player_telemetries[current_player].action_counts[action_type][1].append(executed_count)
+        self.core_observer.player_telemetries[current_player].action_counts.append(*(count for counts in self.action_counts_this_turn.values() for count in counts))
+        for action_type in self.action_counts_this_turn:
             self.action_counts_this_turn[action_type] = [0, 0]
 
     def summarise_game(self) -> str:
@@ -71,15 +70,16 @@ class ActionCountObserver(Observer):
         ]
         rows = []
         for player_telemetry in self.core_observer.player_telemetries:
-            total_turns = len(player_telemetry.action_counts[DeployAction.get_name()][0]) # same length for all action type lists
+            total_turns = len(player_telemetry.action_counts)
+            action_totals = [int(player_telemetry.action_counts.get_column(f"{action_type}_generated").sum()) for action_type in self.action_counts_this_turn]
             row = []
             row.append(player_telemetry.player_name)
             row.append(total_turns)
-            row.append(sum(sum(counts[0]) for counts in player_telemetry.action_counts.values()))
-            row.append(sum(sum(counts[0]) for counts in player_telemetry.action_counts.values()) / total_turns if total_turns > 0 else 0)
-            for action_counts in player_telemetry.action_counts.values():
-                row.append(sum(action_counts[0]))
-                row.append(sum(action_counts[0]) / total_turns if total_turns > 0 else 0)
+            row.append(sum(action_totals))
+            row.append(sum(action_totals) / total_turns if total_turns > 0 else 0)
+            for action_total in action_totals:
+                row.append(action_total)
+                row.append(action_total / total_turns if total_turns > 0 else 0)
             rows.append(row)
         lines.append(tabulate(rows, headers=headers, tablefmt="grid", colalign=["center"]*len(headers)))
 
@@ -87,15 +87,16 @@ class ActionCountObserver(Observer):
         lines.append(f"\n---- Action Execution Counting Statistics ----")
         rows = []
         for player_telemetry in self.core_observer.player_telemetries:
-            total_turns = len(player_telemetry.action_counts[DeployAction.get_name()][1]) # same length for all action type lists
+            total_turns = len(player_telemetry.action_counts)
+            action_totals = [int(player_telemetry.action_counts.get_column(f"{action_type}_executed").sum()) for action_type in self.action_counts_this_turn]
             row = []
             row.append(player_telemetry.player_name)
             row.append(total_turns)
-            row.append(sum(sum(counts[1]) for counts in player_telemetry.action_counts.values()))
-            row.append(sum(sum(counts[1]) for counts in player_telemetry.action_counts.values()) / total_turns if total_turns > 0 else 0)
-            for action_counts in player_telemetry.action_counts.values():
-                row.append(sum(action_counts[1]))
-                row.append(sum(action_counts[1]) / total_turns if total_turns > 0 else 0)
+            row.append(sum(action_totals))
+            row.append(sum(action_totals) / total_turns if total_turns > 0 else 0)
+            for action_total in action_totals:
+                row.append(action_total)
+                row.append(action_total / total_turns if total_turns > 0 else 0)
             rows.append(row)
         lines.append(tabulate(rows, headers=headers, tablefmt="grid", colalign=["center"]*len(headers)))
         
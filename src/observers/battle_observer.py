@@ -2,35 +2,44 @@ from typing import Self
 
 from tabulate import tabulate
 
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+import numpy as np
 
 from src.environment.actions import Action, BattleFromAction, BattleToAction
 from src.environment.game_state import GameState
 from src.environment.map import Territory
 
 from src.observers.observer import Observer
-from src.observers.player_telemetry import PlayerTelemetry, BattleLog
+from src.observers.observer_reducer import ObserverReducer
+from src.observers.player_telemetry import PlayerTelemetry, ColumnarLog
 
 class BattleObserver(Observer):
     """Observer for tracking battle events for experimental analysis."""
+    action_types = (BattleFromAction, BattleToAction)
+    observes_action_lists = False
+
     def on_action_taken(self, action: Action, previous_state: GameState, current_state: GameState):
         if isinstance(action, BattleFromAction):
             self.current_battle_from_action = action
             
         if isinstance(action, BattleToAction):
-            battle_log = BattleLog(
-                turn_number=self.core_observer.turn_count,
-                attacker_player_id=previous_state.current_player,
-                attacker_territory_id=self.current_battle_from_action.attacker_territory_id,
-                attacker_troops=previous_state.territory_troops[self.current_battle_from_action.attacker_territory_id],
-                defender_player_id=previous_state.territory_owners[action.defender_territory_id],
-                defender_territory_id=action.defender_territory_id,
-                defender_troops=previous_state.territory_troops[action.defender_territory_id],
-                successful_battle=current_state.current_battle == (self.current_battle_from_action.attacker_territory_id, action.defender_territory_id)
+            attacker_player_id = previous_state.current_player
+            attacker_territory_id = self.current_battle_from_action.attacker_territory_id
+            defender_player_id = previous_state.territory_owners[action.defender_territory_id]
+            battle_record = (
+                self.core_observer.turn_count, # turn_number
+                attacker_player_id,
+                attacker_territory_id,
+                previous_state.territory_troops[attacker_territory_id], # attacker_troops
+                defender_player_id,
+                action.defender_territory_id,
+                previous_state.territory_troops[action.defender_territory_id], # defender_troops
+                current_state.current_battle == (attacker_territory_id, action.defender_territory_id) # successful_battle
             )
 
-            self.core_observer.player_telemetries[battle_log.attacker_player_id].attacks.append(battle_log)
-            self.core_observer.player_telemetries[battle_log.defender_player_id].defenses.append(battle_log)
+            self.core_observer.player_telemetries[attacker_player_id].attacks.append(*battle_record)
+            self.core_observer.player_telemetries[defender_player_id].defenses.append(*battle_record)
             self.current_battle_from_action = None
     
     def summarise_game(self) -> str:
@@ -79,37 +88,41 @@ class BattleObserver(Observer):
     
     def get_total_successful_battles(self, player_telemetry: PlayerTelemetry) -> int:
         """Return the total number of successful battles for a given player."""
-        return sum(1 for attack in player_telemetry.attacks if attack.successful_battle)
+        return int(player_telemetry.attacks.get_column("successful_battle").sum())
 
     def get_battle_win_rate(self, player_telemetry: PlayerTelemetry) -> float:
         """Calculate the battle win rate for a given player."""
-        return self.get_total_successful_battles(player_telemetry) / len(player_telemetry.attacks) if player_telemetry.attacks else 0.0
+        return self.get_total_successful_battles(player_telemetry) / len(player_telemetry.attacks) if len(player_telemetry.attacks) else 0.0
 
     def get_average_battles_per_turn(self, player_telemetry: PlayerTelemetry) -> float:
         """Calculate the average number of battles initiated per turn for a given player."""
         return len(player_telemetry.attacks) / self.core_observer.get_player_turn_count(player_telemetry) if self.core_observer.get_player_turn_count(player_telemetry) > 0 else 0.0
     
     def get_total_battle_differential(self, player_telemetry: PlayerTelemetry) -> int:
-        return sum(attack.attacker_troops - attack.defender_troops for attack in player_telemetry.attacks)
+        return int(player_telemetry.attacks.get_column("attacker_troops").sum(dtype=np.int64) - player_telemetry.attacks.get_column("defender_troops").sum(dtype=np.int64))
     
     def get_average_battle_differential(self, player_telemetry: PlayerTelemetry) -> float:
-        return self.get_total_battle_differential(player_telemetry) / len(player_telemetry.attacks) if player_telemetry.attacks else 0.0
+        return self.get_total_battle_differential(player_telemetry) / len(player_telemetry.attacks) if len(player_telemetry.attacks) else 0.0
     
     def get_territory_battle_counts(self) -> dict[Territory, list[int]]:
         """Calculate the number of times each territory attacked, or was attacked in a battle across all players."""
         territory_battle_counts: dict[Territory, list[int]] = defaultdict(lambda: [0, 0])  # [attacks, defenses]
 
+        num_territories = len(self.core_observer.risk_map.territories)
+        attack_counts, defense_counts = np.zeros(num_territories, dtype=np.int64), np.zeros(num_territories, dtype=np.int64)
         for player_telemetry in self.core_observer.player_telemetries:
-            for battle_log in player_telemetry.attacks:
-                territory_battle_counts[self.core_observer.risk_map.territories[battle_log.attacker_territory_id]][0] += 1
-                territory_battle_counts[self.core_observer.risk_map.territories[battle_log.defender_territory_id]][1] += 1
+            attack_counts += np.bincount(player_telemetry.attacks.get_column("attacker_territory_id"), minlength=num_territories)
+            defense_counts += np.bincount(player_telemetry.attacks.get_column("defender_territory_id"), minlength=num_territories)
+
+        for territory_id in np.flatnonzero(attack_counts + defense_counts).tolist():
+            territory_battle_counts[self.core_observer.risk_map.territories[territory_id]] = [int(attack_counts[territory_id]), int(defense_counts[territory_id])]
 
         return territory_battle_counts
     
     """Class methods for collecting and summarising aggregate outcome data for experimental anlaysis """
     
     @classmethod
-    def summarise_simulation(cls, observers: list[Self], rl_agent_performance_test: bool = False) -> str:
+    def summarise_simulation(cls, observers: "list[Self] | BattleReducer", rl_agent_performance_test: bool = False) -> str:
         lines = ["#### Battle Simulation Summary ####"]
 
         # Add player-specific battle summaries
@@ -120,22 +133,19 @@ class BattleObserver(Observer):
         return "\n".join(lines)
 
     @classmethod
-    def get_player_battle_statistics(cls, observers: list[Self], rl_agent_performance_test: bool = False) -> list[list]:
+    def create_reducer(cls, player_names: list[str]) -> "BattleReducer":
+        return BattleReducer(player_names)
+
+    @classmethod
+    def get_player_battle_statistics(cls, observers: "list[Self] | BattleReducer", rl_agent_performance_test: bool = False) -> list[list]:
         """Return list of [player_name, battle win rate, average battles per turn, average battle differential] for each player."""
+        reducer = cls.reduce(observers)
         rows = []
 
-        for player_name in [player.player_name for player in observers[0].core_observer.player_telemetries]:
+        for player_name in reducer.player_names:
             if rl_agent_performance_test and not player_name.startswith("RLAgent"):
                 continue
-            # assume the ordering of observer 0 is unshuffled and same as what is parsed in to SimulationRunner
-            total_battles, total_successful_battles, total_battle_differential, total_turns = 0, 0, 0, 0
-
-            for observer in observers:
-                player_telemetry = next(pt for pt in observer.core_observer.player_telemetries if pt.player_name == player_name)
-                total_battles += len(player_telemetry.attacks)
-                total_successful_battles += observer.get_total_successful_battles(player_telemetry)
-                total_battle_differential += observer.get_total_battle_differential(player_telemetry)
-                total_turns += observer.core_observer.get_player_turn_count(player_telemetry)
+            total_battles, total_successful_battles, total_battle_differential, total_turns = reducer.player_totals.get(player_name, [0, 0, 0, 0])
             
             rows.append([
                 player_name,
@@ -149,9 +159,97 @@ class BattleObserver(Observer):
         return rows
     
     @classmethod
-    def get_battle_logs(cls, observers: list[Self], player_name: str) -> list[BattleLog]:
-        battle_logs = []
-        for observer in observers:
-            player_telemetry = next((pt for pt in observer.core_observer.player_telemetries if pt.player_name == player_name))
-            battle_logs.extend(player_telemetry.attacks)
-        return battle_logs
+    def get_battle_logs(cls, observers: list[Self], player_name: str) -> dict[str, np.ndarray]:
+        """Return the columns of every battle initiated by the given player across the given observers' episodes."""
+        return ColumnarLog.concatenate([
+            next((pt for pt in observer.core_observer.player_telemetries if pt.player_name == player_name)).attacks
+            for observer in observers
+        ])
+
+class BattleReducer(ObserverReducer):
+    """Summary of the battles observed by the battle observers of many episodes, totalled per player, per defending territory and per turn.
+    Episodes' battle columns are buffered and folded into the summary with vectorised group-bys, every flush_interval episodes and whenever the summary is read."""
+    flush_interval = 1024 # episodes buffered at most, so that memory stays bounded however many episodes are folded in
+
+    def __init__(self, player_names: list[str]):
+        super().__init__(player_names)
+
+        self.player_totals: dict[str, list[int]] = {} # key=player name, value=[battles, successful battles, total battle differential, turns played]
+        self.defender_territory_counts: dict[str, Counter] = {} # key=player name, value={key=defender territory id, value=battles initiated against it}
+        self.turn_battle_totals: dict[str, dict[int, list[int]]] = {} # key=player name, value={key=turn number, value=[battles, total battle differential]}
+
+        self.player_ids: dict[str, int] = {} # key=player name, value=its id in the buffered rows
+        self.buffered_episode_count = 0
+        self.buffered_turn_counts: list[tuple[int, int]] = [] # (player id, turns played) of each player of each buffered episode
+        self.buffered_attacks: list[tuple[int, dict[str, np.ndarray]]] = [] # (player id, columns needed of its attacks) of each player of each buffered episode with any
+
+    def update(self, observer: BattleObserver):
+        super().update(observer)
+        for player_telemetry in observer.core_observer.player_telemetries:
+            player_id = self.player_ids.setdefault(player_telemetry.player_name, len(self.player_ids))
+            self.buffered_turn_counts.append((player_id, observer.core_observer.get_player_turn_count(player_telemetry)))
+            if len(player_telemetry.attacks):
+                self.buffered_attacks.append((player_id, {field: player_telemetry.attacks.get_column(field) for field in ["turn_number", "attacker_troops", "defender_territory_id", "defender_troops", "successful_battle"]}))
+
+        self.buffered_episode_count += 1
+        if self.buffered_episode_count >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Fold the buffered episodes into the summary."""
+        if not self.buffered_episode_count:
+            return
+
+        num_players = len(self.player_ids)
+        turn_count_player_ids, turn_counts = np.array(self.buffered_turn_counts, dtype=np.int64).reshape(-1, 2).T
+        player_turn_counts = np.bincount(turn_count_player_ids, weights=turn_counts, minlength=num_players)
+        player_battles, player_successful_battles, player_battle_differentials = np.zeros((3, num_players))
+
+        if self.buffered_attacks:
+            battle_player_ids = np.repeat([player_id for player_id, _ in self.buffered_attacks], [len(attacks["turn_number"]) for _, attacks in self.buffered_attacks])
+            attacks = {field: np.concatenate([attacks[field] for _, attacks in self.buffered_attacks]).astype(np.int64) for field in self.buffered_attacks[0][1]}
+            battle_differentials = attacks["attacker_troops"] - attacks["defender_troops"]
+            player_battles = np.bincount(battle_player_ids, minlength=num_players)
+            player_successful_battles = np.bincount(battle_player_ids, weights=attacks["successful_battle"], minlength=num_players)
+            player_battle_differentials = np.bincount(battle_player_ids, weights=battle_differentials, minlength=num_players)
+
+            # Group battles by (player, defender territory) and (player, turn) through combined integer keys
+            num_territory_ids = int(attacks["defender_territory_id"].max()) + 1
+            defender_keys, defender_battles = np.unique(battle_player_ids * num_territory_ids + attacks["defender_territory_id"], return_counts=True)
+            num_turn_numbers = int(attacks["turn_number"].max()) + 1
+            turn_keys, turn_indices, turn_battles = np.unique(battle_player_ids * num_turn_numbers + attacks["turn_number"], return_inverse=True, return_counts=True)
+            turn_battle_differentials = np.bincount(turn_indices, weights=battle_differentials, minlength=len(turn_keys))
+
+        player_names = list(self.player_ids)
+        for player_name, player_id in self.player_ids.items():
+            player_totals = self.player_totals.setdefault(player_name, [0, 0, 0, 0])
+            for i, total in enumerate([player_battles[player_id], player_successful_battles[player_id], player_battle_differentials[player_id], player_turn_counts[player_id]]):
+                player_totals[i] += int(total)
+            self.defender_territory_counts.setdefault(player_name, Counter())
+            self.turn_battle_totals.setdefault(player_name, {})
+
+        if self.buffered_attacks:
+            for key, battles in zip(defender_keys.tolist(), defender_battles.tolist()):
+                self.defender_territory_counts[player_names[key // num_territory_ids]][key % num_territory_ids] += battles
+            for key, battles, battle_differential in zip(turn_keys.tolist(), turn_battles.tolist(), turn_battle_differentials.tolist()):
+                turn_totals = self.turn_battle_totals[player_names[key // num_turn_numbers]].setdefault(key % num_turn_numbers, [0, 0])
+                turn_totals[0] += battles
+                turn_totals[1] += int(battle_differential)
+
+        self.buffered_episode_count, self.buffered_turn_counts, self.buffered_attacks = 0, [], []
+
+    def merge(self, other: Self) -> Self:
+        super().merge(other)
+        self.flush()
+        other.flush()
+        for player_name, player_totals in other.player_totals.items():
+            self.player_totals[player_name] = [total + other_total for total, other_total in zip(self.player_totals.get(player_name, [0, 0, 0, 0]), player_totals)]
+        for player_name, defender_territory_counts in other.defender_territory_counts.items():
+            self.defender_territory_counts.setdefault(player_name, Counter()).update(defender_territory_counts)
+        for player_name, turn_battle_totals in other.turn_battle_totals.items():
+            own_turn_battle_totals = self.turn_battle_totals.setdefault(player_name, {})
+            for turn_number, (battles, battle_differential) in turn_battle_totals.items():
+                turn_totals = own_turn_battle_totals.setdefault(turn_number, [0, 0])
+                turn_totals[0] += battles
+                turn_totals[1] += battle_differential
+        return self
@@ -1,21 +1,25 @@
 from typing import Self
 
+from collections import Counter
+
+import numpy as np
+
 from src.environment.actions import Action, DeployAction
 from src.environment.game_state import GameState
 
 from src.observers.observer import Observer
-from src.observers.player_telemetry import DeployLog
+from src.observers.observer_reducer import ObserverReducer
+from src.observers.player_telemetry import ColumnarLog
 
 class DeployObserver(Observer):
     """Observer for tracking deploy events for experimental analysis."""
+    action_types = (DeployAction,)
+    observes_action_lists = False
+
     def on_action_taken(self, action: Action, previous_state: GameState, _: GameState):
         if isinstance(action, DeployAction):
-            deploy_log = DeployLog(
-                turn_number=self.core_observer.turn_count,
-                player_id=previous_state.current_player,
-                territory_id=action.territory_id
-            )
-            self.core_observer.player_telemetries[deploy_log.player_id].deployments.append(deploy_log)
+            # turn_number, player_id, territory_id
+            self.core_observer.player_telemetries[previous_state.current_player].deployments.append(self.core_observer.turn_count, previous_state.current_player, action.territory_id)
     
     def summarise_game(self) -> str:
         return ""
@@ -23,13 +27,36 @@ class DeployObserver(Observer):
     """Class methods for collecting and summarising aggregate outcome data for experimental anlaysis """
     
     @classmethod
-    def summarise_simulation(cls, observers: list[Self], rl_agent_performance_test: bool = False) -> str:
+    def summarise_simulation(cls, observers: "list[Self] | DeployReducer", rl_agent_performance_test: bool = False) -> str:
         return ""
+
+    @classmethod
+    def create_reducer(cls, player_names: list[str]) -> "DeployReducer":
+        return DeployReducer(player_names)
     
     @classmethod
-    def get_deploy_logs(cls, observers: list[Self], player_name: str) -> list[DeployLog]:
-        deploy_logs = []
-        for observer in observers:
-            player_telemetry = next((pt for pt in observer.core_observer.player_telemetries if pt.player_name == player_name))
-            deploy_logs.extend(player_telemetry.deployments)
-        return deploy_logs
+    def get_deploy_logs(cls, observers: list[Self], player_name: str) -> dict[str, np.ndarray]:
+        """Return the columns of every deployment made by the given player across the given observers' episodes."""
+        return ColumnarLog.concatenate([
+            next((pt for pt in observer.core_observer.player_telemetries if pt.player_name == player_name)).deployments
+            for observer in observers
+        ])
+
+class DeployReducer(ObserverReducer):
+    """Summary of the deployments observed by the deploy observers of many episodes, counted per player and territory."""
+    def __init__(self, player_names: list[str]):
+        super().__init__(player_names)
+
+        self.territory_deploy_counts: dict[str, Counter] = {} # key=player name, value={key=territory id, value=deployments to it}
+
+    def update(self, observer: DeployObserver):
+        super().update(observer)
+        for player_telemetry in observer.core_observer.player_telemetries:
+            territory_ids, deploy_counts = np.unique(player_telemetry.deployments.get_column("territory_id"), return_counts=True)
+            self.territory_deploy_counts.setdefault(player_telemetry.player_name, Counter()).update(dict(zip(territory_ids.tolist(), deploy_counts.tolist())))
+
+    def merge(self, other: Self) -> Self:
+        super().merge(other)
+        for player_name, territory_deploy_counts in other.territory_deploy_counts.items():
+            self.territory_deploy_counts.setdefault(player_name, Counter()).update(territory_deploy_counts)
+        return self
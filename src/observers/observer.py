@@ -6,11 +6,16 @@ from src.environment.actions import Action, ActionList
 from src.environment.game_state import GameState, GamePhase
 from src.environment.map import RiskMap
 
+from src.observers.observer_reducer import Histogram, ObserverReducer
 from src.observers.player_telemetry import PlayerTelemetry
 
 class Observer(ABC):
     """Abstract base class for observers to track specific elements of a single Risk game.
-    Observers are NOT responsible for influencing the environment state nor agent decisions/rewards."""
+    Observers are NOT responsible for influencing the environment state nor agent decisions/rewards.
+    Subclasses declare the per-action events they consume, so that the ObserverManager only dispatches those (every action and action list unless declared otherwise)."""
+    action_types: tuple[type[Action], ...] = (Action,) # action types (including subclasses) on_action_taken is called for, () for none
+    observes_action_lists: bool = True # whether on_action_list_generated is called
+
     def __init__(self, core_observer: "CoreObserver" = None):
         self.core_observer = core_observer
 
@@ -39,7 +44,28 @@ class Observer(ABC):
         """Generate a human-readable summary of the observed simulation based on the collected aggregate data for the particular observer"""
         return ""
 
+    @classmethod
+    def create_reducer(cls, player_names: list[str]) -> ObserverReducer:
+        """Return an empty reducer summarising the observations of this observer type across episodes, or None if only retained observers can be summarised."""
+        return None
+
+    @classmethod
+    def reduce(cls, observers: list[Self] | ObserverReducer) -> ObserverReducer:
+        """Return the given reducer (with any buffered episodes flushed), or fold the given observers into a new one (reporting on the players of the first observer)."""
+        if isinstance(observers, ObserverReducer):
+            observers.flush()
+            return observers
+
+        reducer = cls.create_reducer([player_telemetry.player_name for player_telemetry in observers[0].core_observer.player_telemetries])
+        for observer in observers:
+            reducer.update(observer)
+        reducer.flush()
+
+        return reducer
+
 class CoreObserver(Observer):
+    observes_action_lists = False
+
     def __init__(self, risk_map: RiskMap, player_telemetries: list[PlayerTelemetry]):
         super().__init__(None)
 
@@ -61,3 +87,26 @@ class CoreObserver(Observer):
     def get_player_turn_count(self, player_telemetry: PlayerTelemetry) -> int:
         """Return the number of turns a player has been active in the game."""
         return player_telemetry.eliminated_turn_count if player_telemetry.eliminated_turn_count else self.turn_count
+
+    @classmethod
+    def create_reducer(cls, player_names: list[str]) -> "CoreReducer":
+        return CoreReducer(player_names)
+
+class CoreReducer(ObserverReducer):
+    """Summary of the game lengths observed by the core observers of many episodes."""
+    def __init__(self, player_names: list[str]):
+        super().__init__(player_names)
+
+        self.action_counts = Histogram()
+        self.turn_counts = Histogram()
+
+    def update(self, observer: CoreObserver):
+        super().update(observer)
+        self.action_counts.add(observer.action_count)
+        self.turn_counts.add(observer.turn_count)
+
+    def merge(self, other: Self) -> Self:
+        super().merge(other)
+        self.action_counts.merge(other.action_counts)
+        self.turn_counts.merge(other.turn_counts)
+        return self
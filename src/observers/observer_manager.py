@@ -23,6 +23,21 @@ class ObserverManager():
             for observer in self.observers:
                 observer.core_observer = core_observer
             self.observers.insert(0, core_observer)
+
+        # Dispatch tables, built once per episode, so that each event only reaches the observers subscribed to it
+        self.action_list_handlers = [observer.on_action_list_generated for observer in self.observers if observer.observes_action_lists]
+        self.action_handlers: dict[type[Action], list] = {} # key=action type, value=on_action_taken of each observer subscribed to it, in observer order
+        for action_type in Action.__subclasses__():
+            self.get_action_handlers(action_type)
+
+        self.observes_action_lists = len(self.action_list_handlers) > 0
+        self.observes_actions = any(observer.action_types for observer in self.observers)
+
+    def get_action_handlers(self, action_type: type[Action]) -> list:
+        if action_type not in self.action_handlers:
+            self.action_handlers[action_type] = [observer.on_action_taken for observer in self.observers if issubclass(action_type, observer.action_types)]
+
+        return self.action_handlers[action_type]
     
     def notify_game_start(self):
         for observer in self.observers:
@@ -30,12 +45,12 @@ class ObserverManager():
             observer.on_game_start()
     
     def notify_action_list_generated(self, action_list: ActionList):
-        for observer in self.observers:
-            observer.on_action_list_generated(action_list)
+        for action_list_handler in self.action_list_handlers:
+            action_list_handler(action_list)
     
     def notify_action_taken(self, action: Action, previous_state: GameState, current_state: GameState):
-        for observer in self.observers:
-            observer.on_action_taken(action, previous_state, current_state)
+        for action_handler in self.action_handlers.get(type(action)) or self.get_action_handlers(type(action)):
+            action_handler(action, previous_state, current_state)
     
     def notify_game_end(self, terminal_state: GameState):
         for observer in self.observers:
@@ -0,0 +1,71 @@
+from typing import Self
+
+from abc import ABC
+
+from collections import Counter
+
+import numpy as np
+
+class Histogram:
+    """Mergeable frequency table of observed values, giving exact totals and order statistics in memory proportional to the number of distinct values.
+    Continuous values should be rounded to a fixed number of decimals, so that the number of distinct values (and hence memory) stays bounded however many are added."""
+    def __init__(self, decimals: int = None):
+        self.decimals = decimals
+        self.counts: Counter = Counter() # key=value, value=number of times it was observed
+
+    def add(self, value: float, count: int = 1):
+        self.counts[value if self.decimals is None else round(value, self.decimals)] += count
+
+    def add_all(self, values: np.ndarray):
+        """Add every one of the given values, as add would one at a time."""
+        if self.decimals is not None:
+            values = [round(value, self.decimals) for value in values.tolist()] # Python's rounding, so that values land in the same bins as add's
+        unique_values, counts = np.unique(values, return_counts=True)
+        self.counts.update(dict(zip(unique_values.tolist(), counts.tolist())))
+
+    def merge(self, other: Self) -> Self:
+        self.counts.update(other.counts)
+        return self
+
+    def get_count(self, value: float) -> int:
+        """Return the number of times the given value was observed."""
+        return self.counts[value]
+
+    def get_total_count(self) -> int:
+        return sum(self.counts.values())
+
+    def get_sum(self) -> float:
+        return sum(value * count for value, count in self.counts.items())
+
+    def get_min(self) -> float:
+        return min(self.counts)
+
+    def get_max(self) -> float:
+        return max(self.counts)
+
+    def get_quantile(self, quantile: float) -> float:
+        """Return the value at position int(quantile * n) of the n sorted observations, e.g. sorted_values[n // 2] for a quantile of 0.5."""
+        rank = min(int(quantile * self.get_total_count()), self.get_total_count() - 1)
+        for value in sorted(self.counts):
+            rank -= self.counts[value]
+            if rank < 0:
+                return value
+
+class ObserverReducer(ABC):
+    """Abstract base class for mergeable online summaries of the observations of one observer type across many episodes.
+    Each finished episode is folded in with update, so a simulation can drop its observers rather than retain them, and summaries of separate shards of episodes are combined with merge."""
+    def __init__(self, player_names: list[str]):
+        self.player_names = player_names # players the summary rows are reported for, in the turn order of the first episode
+        self.episode_count = 0
+
+    def update(self, observer):
+        """Fold the observations of the given observer of a single finished episode into the summary."""
+        self.episode_count += 1
+
+    def flush(self):
+        """Fold any buffered episodes into the summary, before it is read."""
+
+    def merge(self, other: Self) -> Self:
+        """Fold the summary of another set of episodes of the same observer type into this one, and return it."""
+        self.episode_count += other.episode_count
+        return self
@@ -4,12 +4,20 @@ from typing import Self
 
 from tabulate import tabulate
 
+import numpy as np
+
 from src.environment.game_state import GameState
 
 from src.observers.observer import Observer, CoreObserver
+from src.observers.observer_reducer import Histogram, ObserverReducer
+
+from src.utils.confidence_interval import ConfidenceInterval
 
 class OutcomeObserver(Observer):
     """Observer for tracking the outcome of the game, including the winner and final game state."""
+    action_types = ()
+    observes_action_lists = False
+
     def __init__(self, core_observer: CoreObserver = None):
         super().__init__(core_observer)
 
@@ -17,10 +25,10 @@ class OutcomeObserver(Observer):
         self.running_time: float = None
     
     def on_game_start(self):
-        self.running_time = time.time()
+        self.running_time = time.perf_counter()
         
     def on_game_end(self, terminal_state: GameState):
-        self.running_time = time.time() - self.running_time
+        self.running_time = time.perf_counter() - self.running_time
         self.terminal_state = terminal_state
     
     def summarise_game(self) -> str:
@@ -34,64 +42,151 @@ class OutcomeObserver(Observer):
     """Class methods for collecting and summarising aggregate outcome data for experimental anlaysis """
     
     @classmethod
-    def summarise_simulation(cls, observers: list[Self], rl_agent_performance_test: bool = False) -> str:
+    def summarise_simulation(cls, observers: "list[Self] | OutcomeReducer", rl_agent_performance_test: bool = False) -> str:
         lines = ["#### Outcome Simulation Summary ####"]
+        reducer = cls.reduce(observers)
 
         # Add game length summaries
         lines.append(f"\n---- Game Length Statistics ----")
         headers = ["Metric", "Total", "Average", "Maximum", "Minimum"]
-        lines.append(tabulate(cls.get_game_length_statistics(observers), headers=headers, tablefmt="grid", colalign=["center"]*len(headers)))
+        lines.append(tabulate(cls.get_game_length_statistics(reducer), headers=headers, tablefmt="grid", colalign=["center"]*len(headers)))
 
         # Add winner distribution summaries
         lines.append(f"\n---- Winner Distribution Statistics ----")
         finish_position_headers = ["1st", "2nd", "3rd", "4th", "5th", "6th"]
-        headers = ["Player"] + finish_position_headers[:len(observers[0].core_observer.player_telemetries)] + ["Stalemate", "Win\nrate (%)", "Average\nfinish\nposition"]
-        lines.append(tabulate(cls.get_winner_distributions(observers, rl_agent_performance_test), headers=headers, tablefmt="grid", colalign=["center"]*len(headers)))
+        headers = ["Player"] + finish_position_headers[:len(reducer.player_names)] + ["Stalemate", "Win\nrate (%)", "Average\nfinish\nposition"]
+        lines.append(tabulate(cls.get_winner_distributions(reducer, rl_agent_performance_test), headers=headers, tablefmt="grid", colalign=["center"]*len(headers)))
         
         return "\n".join(lines)
     
     @classmethod
-    def get_game_length_statistics(cls, observers: list[Self]) -> list:
+    def create_reducer(cls, player_names: list[str]) -> "OutcomeReducer":
+        return OutcomeReducer(player_names)
+
+    @classmethod
+    def get_game_length_statistics(cls, observers: "list[Self] | OutcomeReducer") -> list:
         """Return list of [total, average (median), max, min] game length in seconds and turns."""
+        reducer = cls.reduce(observers)
         rows = []
+        for metric, histogram in [("Action count", reducer.action_counts), ("Turn count", reducer.turn_counts), ("Running time (s)", reducer.running_times)]:
+            rows.append([metric, histogram.get_sum(), histogram.get_quantile(0.5), histogram.get_max(), histogram.get_min()])
 
-        action_counts = sorted([observer.core_observer.action_count for observer in observers])
-        rows.append(["Action count", sum(action_counts), action_counts[len(action_counts) // 2], max(action_counts), min(action_counts)])
-
-        turn_counts = sorted([observer.core_observer.turn_count for observer in observers])
-        rows.append(["Turn count", sum(turn_counts), turn_counts[len(turn_counts) // 2], max(turn_counts), min(turn_counts)])
-
-        running_times = [round(observer.running_time, 2) for observer in observers]
-        rows.append(["Running time (s)", sum(running_times), running_times[len(running_times) // 2], max(running_times), min(running_times)])
-        
         return rows
     
     @classmethod
-    def get_winner_distributions(cls, observers: list[Self], rl_agent_performance_test: bool = False) -> list[list]:
+    def get_winner_distributions(cls, observers: "list[Self] | OutcomeReducer", rl_agent_performance_test: bool = False) -> list[list]:
         """Return list of [player_name, 1st, 2nd, ..., nth, stalemate, win rate, average finish position] for each player."""
-        rows = [[0] * (len(observers[0].core_observer.player_telemetries) + 4) for _ in range(len(observers[0].core_observer.player_telemetries))]
-        # assume the ordering of observer 0 is unshuffled and same as what is parsed in to SimulationRunner
-        
-        for i, player_telemetry in enumerate(observers[0].core_observer.player_telemetries):
-            rows[i][0] = player_telemetry.player_name
-
-        for observer in observers:
-            finish_order = sorted(observer.core_observer.player_telemetries, key=lambda x: (x.eliminated_turn_count is not None, -(x.eliminated_turn_count or 0)))
-            for i, player_telemetry in enumerate(finish_order):
-                if rl_agent_performance_test and not player_telemetry.player_name.startswith("RLAgent"):
-                    continue # Only interested in RL agent's performance for this experiment, so skip updating stats for other agents
-                row_index = next(index for index, row in enumerate(rows) if row[0] == player_telemetry.player_name)
-                if player_telemetry.eliminated_turn_count is None and not observer.terminal_state.is_terminal_state():
-                    rows[row_index][-3] += 1 # stalemate
-                else:
-                    rows[row_index][i + 1] += 1 # 1st, 2nd, ..., or nth place
-
-        completed_episode_count = sum(1 for observer in observers if observer.terminal_state.is_terminal_state())
-        for row in rows:
-            row[-2] = row[1] / completed_episode_count * 100 if completed_episode_count else 0.0 # win rate
-            row[-1] = sum(i * row[i] for i in range(1, len(observers[0].core_observer.player_telemetries) + 1)) / (len(observers) - row[-3]) if (len(observers) - row[-3]) else 0.0 # average finish position
+        reducer = cls.reduce(observers)
+        num_players = len(reducer.player_names)
+        rows = []
+
+        for player_name in reducer.player_names:
+            finish_position_counts = reducer.finish_position_counts.get(player_name, [0] * (num_players + 1))
+            if rl_agent_performance_test and not player_name.startswith("RLAgent"):
+                finish_position_counts = [0] * (num_players + 1) # Only interested in RL agent's performance for this experiment, so skip stats for other agents
+            stalemate_count = finish_position_counts[-1]
+            rows.append([player_name] + finish_position_counts + [
+                finish_position_counts[0] / reducer.completed_episode_count * 100 if reducer.completed_episode_count else 0.0, # win rate
+                sum((i + 1) * count for i, count in enumerate(finish_position_counts[:-1])) / (reducer.episode_count - stalemate_count) if (reducer.episode_count - stalemate_count) else 0.0 # average finish position
+            ])
         
         if rows[0][0].startswith("RLAgent") and rl_agent_performance_test:
             return [rows[0]] # Only return RLAgent's row, since that's the only one we're interested in for this experiment
 
         return rows
+
+    @classmethod
+    def get_outcome_intervals(cls, observers: "list[Self] | OutcomeReducer", confidence: float = 0.95, method: str = "wilson", rl_agent_performance_test: bool = False) -> list[list]:
+        """Return list of [player_name, win rate, win rate lower bound, win rate upper bound, average finish position, lower bound, upper bound] for each player.
+        Win rate bounds (%) are Wilson score or Jeffreys (method="bayesian") intervals at the given confidence, and finish position bounds are normal approximation intervals."""
+        assert method in ["wilson", "bayesian"], f"Unknown interval method {method}"
+        reducer = cls.reduce(observers)
+        get_proportion_interval = ConfidenceInterval.wilson if method == "wilson" else ConfidenceInterval.bayesian
+        rows = []
+
+        for row in cls.get_winner_distributions(reducer, rl_agent_performance_test):
+            finish_position_counts = row[1:-3]
+            num_finishes = sum(finish_position_counts)
+            win_rate_lower, win_rate_upper = get_proportion_interval(finish_position_counts[0], reducer.completed_episode_count, confidence)
+            finish_position_lower, finish_position_upper = ConfidenceInterval.mean(
+                num_finishes,
+                sum((i + 1) * count for i, count in enumerate(finish_position_counts)),
+                sum((i + 1) ** 2 * count for i, count in enumerate(finish_position_counts)),
+                confidence
+            )
+            rows.append([row[0], row[-2], win_rate_lower * 100, win_rate_upper * 100, row[-1], finish_position_lower, finish_position_upper])
+
+        return rows
+
+class OutcomeReducer(ObserverReducer):
+    """Summary of the game lengths and finish positions observed by the outcome observers of many episodes.
+    Episodes are buffered as rows and folded into the summary with vectorised group-bys, every flush_interval episodes and whenever the summary is read (see flush)."""
+    flush_interval = 4096 # episodes buffered at most, so that memory stays bounded however many episodes are folded in
+
+    def __init__(self, player_names: list[str]):
+        super().__init__(player_names)
+
+        self.action_counts = Histogram()
+        self.turn_counts = Histogram()
+        self.running_times = Histogram(decimals=2)
+        self.finish_position_counts: dict[str, list[int]] = {} # key=player name, value=[1st, 2nd, ..., nth, stalemate] counts
+        self.completed_episode_count = 0
+
+        self.player_ids: dict[str, int] = {} # key=player name, value=its id in the buffered player rows
+        self.buffered_episodes: list[tuple[int, int, float, bool]] = [] # (action count, turn count, running time, is terminal state) of each buffered episode
+        self.buffered_players: list[tuple[int, int, int]] = [] # (buffered episode, player id, eliminated turn count or 0) of each player of each buffered episode, in turn order
+
+    def update(self, observer: OutcomeObserver):
+        super().update(observer)
+        episode = len(self.buffered_episodes)
+        self.buffered_episodes.append((observer.core_observer.action_count, observer.core_observer.turn_count, observer.running_time, observer.terminal_state.is_terminal_state()))
+        for player_telemetry in observer.core_observer.player_telemetries:
+            self.buffered_players.append((episode, self.player_ids.setdefault(player_telemetry.player_name, len(self.player_ids)), player_telemetry.eliminated_turn_count or 0))
+
+        if len(self.buffered_episodes) >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Fold the buffered episodes into the summary."""
+        if not self.buffered_episodes:
+            return
+
+        action_counts, turn_counts, running_times, is_terminal_state = (np.array(column) for column in zip(*self.buffered_episodes))
+        players = dict(zip(["episode", "player_id", "eliminated_turn_count"], np.array(self.buffered_players, dtype=np.int64).T))
+        self.action_counts.add_all(action_counts)
+        self.turn_counts.add_all(turn_counts)
+        self.running_times.add_all(running_times)
+        self.completed_episode_count += int(is_terminal_state.sum())
+
+        # Rank the players of each episode as sorting them by (eliminated, -elimination turn) would, keeping their turn order among ties
+        is_eliminated = players["eliminated_turn_count"] > 0
+        finish_order = np.lexsort((np.arange(len(is_eliminated)), -players["eliminated_turn_count"], is_eliminated, players["episode"]))
+        finish_order_episodes = players["episode"][finish_order]
+        finish_positions = np.empty(len(finish_order), dtype=np.int64)
+        finish_positions[finish_order] = np.arange(len(finish_order)) - np.searchsorted(finish_order_episodes, finish_order_episodes) # position within its episode
+        is_stalemate = ~is_eliminated & ~is_terminal_state[players["episode"]]
+        finish_positions[is_stalemate] = len(self.player_names)
+
+        num_positions = len(self.player_names) + 1
+        player_finish_position_counts = np.bincount(players["player_id"] * num_positions + finish_positions, minlength=len(self.player_ids) * num_positions).reshape(len(self.player_ids), num_positions)
+        for player_name, player_id in self.player_ids.items():
+            if player_finish_position_counts[player_id].any():
+                finish_position_counts = self.finish_position_counts.setdefault(player_name, [0] * num_positions)
+                for i, count in enumerate(player_finish_position_counts[player_id].tolist()):
+                    finish_position_counts[i] += count
+
+        self.buffered_episodes, self.buffered_players = [], []
+
+    def merge(self, other: Self) -> Self:
+        super().merge(other)
+        self.flush()
+        other.flush()
+        self.action_counts.merge(other.action_counts)
+        self.turn_counts.merge(other.turn_counts)
+        self.running_times.merge(other.running_times)
+        for player_name, finish_position_counts in other.finish_position_counts.items():
+            own_finish_position_counts = self.finish_position_counts.setdefault(player_name, [0] * len(finish_position_counts))
+            for i, count in enumerate(finish_position_counts):
+                own_finish_position_counts[i] += count
+        self.completed_episode_count += other.completed_episode_count
+        return self
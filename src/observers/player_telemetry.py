@@ -1,58 +1,71 @@
+from typing import Self
+
+from array import array
+
+import numpy as np
+
 from src.environment.actions import DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction
 
-class BattleLog:
-    def __init__(
-        self,
-        turn_number: int,
-        attacker_player_id: int, 
-        attacker_territory_id: int,
-        attacker_troops: int,
-        defender_player_id: int, 
-        defender_territory_id: int, 
-        defender_troops: int, 
-        successful_battle: bool
-    ):
-        self.turn_number = turn_number
-        self.attacker_player_id = attacker_player_id
-        self.attacker_territory_id = attacker_territory_id
-        self.defender_player_id = defender_player_id
-        self.defender_territory_id = defender_territory_id
-        self.attacker_troops = attacker_troops
-        self.defender_troops = defender_troops
-        self.successful_battle = successful_battle
-
-class DeployLog:
-    def __init__(
-        self,
-        turn_number: int,
-        player_id: int,
-        territory_id: int
-    ):
-        self.turn_number = turn_number
-        self.player_id = player_id
-        self.territory_id = territory_id
+class ColumnarLog:
+    """Append-only log of records with fixed fields, stored as one typed array per field (with amortised growth) rather than one Python object per record.
+    Columns are read back as NumPy arrays, so that aggregations over the log are NumPy reductions."""
+    def __init__(self, fields: dict[str, str]):
+        self.fields = fields # key=field name, value=array typecode, e.g. "i" for C int and "b" for booleans
+        self.columns: dict[str, array] = {field: array(typecode) for field, typecode in fields.items()}
+        self.appenders = [column.append for column in self.columns.values()] # in field order
+
+    def append(self, *values):
+        """Append a record, given its value of every field in field order."""
+        for append, value in zip(self.appenders, values):
+            append(value)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def get_column(self, field: str) -> np.ndarray:
+        """Return a copy of the given field's column (a copy, since arrays cannot grow while NumPy views of them exist)."""
+        return np.frombuffer(self.columns[field], dtype=self.fields[field]).copy()
+
+    def get_columns(self) -> dict[str, np.ndarray]:
+        return {field: self.get_column(field) for field in self.fields}
+
+    @classmethod
+    def concatenate(cls, logs: list[Self]) -> dict[str, np.ndarray]:
+        """Return every column of the given logs (which must share fields), each concatenated in the order of the logs."""
+        return {field: np.concatenate([log.get_column(field) for log in logs]) for field in logs[0].fields}
+
+BATTLE_LOG_FIELDS = {
+    "turn_number": "i",
+    "attacker_player_id": "i",
+    "attacker_territory_id": "i",
+    "attacker_troops": "i",
+    "defender_player_id": "i",
+    "defender_territory_id": "i",
+    "defender_troops": "i",
+    "successful_battle": "b"
+}
+DEPLOY_LOG_FIELDS = {
+    "turn_number": "i",
+    "player_id": "i",
+    "territory_id": "i"
+}
+ACTION_TYPE_NAMES = [action_type.get_name() for action_type in [DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction]]
+ACTION_COUNT_LOG_FIELDS = {f"{action_type_name}_{count_type}": "i" for action_type_name in ACTION_TYPE_NAMES for count_type in ["generated", "executed"]}
 
 class PlayerTelemetry:
     """Records metrics of player behaviour during a single game, to be read and written by observers."""
+    log_names = ["attacks", "defenses", "deployments", "action_counts"] # attributes holding a ColumnarLog
+
     def __init__(self, player_name: str, turn_number: int):
         self.player_name = player_name
         self.turn_number = turn_number
 
         # attributes to be used by the BattleObserver
-        self.attacks: list[BattleLog] = [] # log of battles initiated by the player
-        self.defenses: list[BattleLog] = [] # log of battles initiated to the player, and outcome (true = failed defense)
+        self.attacks = ColumnarLog(BATTLE_LOG_FIELDS) # log of battles initiated by the player
+        self.defenses = ColumnarLog(BATTLE_LOG_FIELDS) # log of battles initiated to the player, and outcome (true = failed defense)
         # attributes to be used by the DeployObserver
-        self.deployments: list[DeployLog] = [] # log of deployments made by the player
+        self.deployments = ColumnarLog(DEPLOY_LOG_FIELDS) # log of deployments made by the player
         self.eliminated_turn_count: int = None # turn number when the player was eliminated or None if still in the game
 
-        # attributes to be used by the TemporalObserver
-        self.action_counts: dict[str, tuple[list[int], list[int]]] = {
-            DeployAction.get_name(): ([], []),
-            BattleFromAction.get_name(): ([], []),
-            BattleToAction.get_name(): ([], []),
-            TransferAction.get_name(): ([], []),
-            FortifyFromAction.get_name(): ([], []),
-            FortifyToAction.get_name(): ([], []),
-            FortifyAmountAction.get_name(): ([], []),
-            SkipAction.get_name(): ([], [])
-        } #key=action_type, value=(list of (maximum) no.action_types generated, list of no.action_types executed), indexed per turn)
\ No newline at end of file
+        # attributes to be used by the ActionCountObserver
+        self.action_counts = ColumnarLog(ACTION_COUNT_LOG_FIELDS) # one record per turn, of the (maximum) no. of each action type generated and the no. executed
@@ -0,0 +1,57 @@
+from tabulate import tabulate
+
+from src.observers.outcome_observer import OutcomeObserver, OutcomeReducer
+
+class EarlyStopping:
+    """Sequential stopping rule for a SimulationRunner, ending a simulation once the outcome estimates are precise enough rather than after a fixed number of episodes.
+    Every check_interval episodes (once at least min_episodes have finished), the simulation stops if the interval of every player's win rate (in percentage points) and average finish position is no wider than twice its target half-width."""
+    def __init__(
+        self,
+        win_rate_half_width: float = 2.5,
+        finish_position_half_width: float = None,
+        confidence: float = 0.95,
+        method: str = "wilson",
+        min_episodes: int = 100,
+        check_interval: int = 50
+    ):
+        assert win_rate_half_width is not None or finish_position_half_width is not None, "At least one target half-width is required"
+        assert 0 < confidence < 1, "Confidence must be between 0 and 1"
+        assert method in ["wilson", "bayesian"], f"Unknown interval method {method}"
+        assert check_interval >= 1, "Precision must be checked at least every episode"
+
+        self.win_rate_half_width = win_rate_half_width # None to ignore win rates
+        self.finish_position_half_width = finish_position_half_width # None to ignore average finish positions
+        self.confidence = confidence
+        self.method = method # "wilson" for Wilson score intervals, "bayesian" for Jeffreys intervals, of the win rates
+        self.min_episodes = min_episodes
+        self.check_interval = check_interval
+
+    def get_half_widths(self, outcome_reducer: OutcomeReducer, rl_agent_performance_test: bool = False) -> list[list]:
+        """Return list of [player_name, win rate, win rate half-width, average finish position, average finish position half-width] for each player."""
+        return [
+            [player_name, win_rate, (win_rate_upper - win_rate_lower) / 2, average_finish_position, (finish_position_upper - finish_position_lower) / 2]
+            for player_name, win_rate, win_rate_lower, win_rate_upper, average_finish_position, finish_position_lower, finish_position_upper
+            in OutcomeObserver.get_outcome_intervals(outcome_reducer, self.confidence, self.method, rl_agent_performance_test)
+        ]
+
+    def is_precise(self, outcome_reducer: OutcomeReducer, rl_agent_performance_test: bool = False) -> bool:
+        """Return True if at least min_episodes have finished and every targeted half-width is met."""
+        if outcome_reducer.episode_count < self.min_episodes:
+            return False
+
+        for _, _, win_rate_half_width, _, finish_position_half_width in self.get_half_widths(outcome_reducer, rl_agent_performance_test):
+            if self.win_rate_half_width is not None and win_rate_half_width > self.win_rate_half_width:
+                return False
+            if self.finish_position_half_width is not None and finish_position_half_width > self.finish_position_half_width:
+                return False
+
+        return True
+
+    def summarise(self, outcome_reducer: OutcomeReducer, rl_agent_performance_test: bool = False) -> str:
+        lines = [f"#### Early Stopping Precision ({self.confidence * 100:g}% {self.method} intervals) ####"]
+        lines.append(f"Targets: ±{self.win_rate_half_width} win rate (%), ±{self.finish_position_half_width} average finish position, met: {self.is_precise(outcome_reducer, rl_agent_performance_test)}")
+
+        headers = ["Player", "Win\nrate (%)", "± Win\nrate (%)", "Average\nfinish\nposition", "± Average\nfinish\nposition"]
+        lines.append(tabulate(self.get_half_widths(outcome_reducer, rl_agent_performance_test), headers=headers, tablefmt="grid", colalign=["center"]*len(headers)))
+
+        return "\n".join(lines)
@@ -1,11 +1,20 @@
+import time
+
+from typing import Generator
+
+import numpy as np
 
 from src.agents.agent import Agent
 
+from src.environment.actions import ActionList
+from src.environment.game_state import GameState
 from src.environment.map import RiskMap
 from src.environment.environment import RiskEnvironment
 
 from src.observers.observer_manager import ObserverManager
 
+from src.runners.runner_metrics import RunnerMetrics
+
 class GameRunner:
     """Manages the execution of a SINGLE Risk game episode, coordinating between the environment, agents, and observer."""
     def __init__(
@@ -14,6 +23,7 @@ class GameRunner:
         agents: list[Agent], # Already ordered by their turn_number for this game
         observer_manager: ObserverManager,
         max_episode_length: int,
+        metrics: RunnerMetrics = None
     ):
         assert len(agents) > 1, "At least two agents are required to run a game."
         
@@ -22,23 +32,65 @@ class GameRunner:
         self.agents = agents
         self.observer_manager = observer_manager
         self.max_episode_length = max_episode_length
+        self.metrics = metrics # if given, the episode's actions are counted and its sampled steps timed in it
     
     def run_episode(self):
+        for _ in self.play_episode(batch_decisions=False):
+            pass
+
+    def play_episode(self, batch_decisions: bool = True) -> Generator[tuple[Agent, ActionList, GameState], np.ndarray, None]:
+        """Run the episode as a generator. If batch_decisions, each decision of an agent with batched_inference is yielded as (agent, action_list, game_state) instead,
+        and the episode resumes once sent the agent's action probabilities for it, so that the decisions of many concurrent episodes can be evaluated together."""
         self.environment.reset()
         self.observer_manager.notify_game_start()
 
         is_terminal_state = False
         episode_length = 0
+        observes_action_lists, observes_actions = self.observer_manager.observes_action_lists, self.observer_manager.observes_actions
+
+        metrics = self.metrics
+        perf_counter_ns = time.perf_counter_ns
 
         while not is_terminal_state and episode_length < self.max_episode_length:
+            is_timed_step = metrics is not None and metrics.is_sampled_step()
+            if is_timed_step:
+                start_ns = perf_counter_ns()
+
             previous_state = self.environment.current_state
             action_list = self.environment.get_action_list()
-            self.observer_manager.notify_action_list_generated(action_list)
+            if is_timed_step:
+                action_list_ns = perf_counter_ns()
+            if observes_action_lists:
+                self.observer_manager.notify_action_list_generated(action_list)
 
-            selected_action = self.agents[previous_state.current_player].select_action(action_list, previous_state, self.risk_map)
+            agent = self.agents[previous_state.current_player]
+            is_batched_decision = batch_decisions and agent.batched_inference
+            if is_timed_step:
+                select_action_ns = perf_counter_ns()
+            if is_batched_decision:
+                action_probabilities = yield agent, action_list, previous_state
+                if is_timed_step:
+                    resume_ns = perf_counter_ns() # time spent suspended (and the batched inference, which the SimulationRunner times) is not counted in any phase
+                selected_action = agent.select_action_from_probabilities(action_probabilities)
+            else:
+                selected_action = agent.select_action(action_list, previous_state, self.risk_map)
+            if is_timed_step:
+                apply_ns = perf_counter_ns()
             current_state, is_terminal_state = self.environment.step(selected_action)
-            self.observer_manager.notify_action_taken(selected_action, previous_state, current_state)
+            if is_timed_step:
+                observer_dispatch_ns = perf_counter_ns()
+            if observes_actions:
+                self.observer_manager.notify_action_taken(selected_action, previous_state, current_state)
+
+            if is_timed_step:
+                end_ns = perf_counter_ns()
+                metrics.add_phase_time("action_list_generation", action_list_ns - start_ns)
+                metrics.add_phase_time(f"select_action.{agent.get_name()}", apply_ns - (resume_ns if is_batched_decision else select_action_ns))
+                metrics.add_phase_time(f"apply.{type(selected_action).get_name()}", observer_dispatch_ns - apply_ns)
+                metrics.add_phase_time("observer_dispatch", (select_action_ns - action_list_ns) + (end_ns - observer_dispatch_ns))
 
             episode_length += 1
 
         self.observer_manager.notify_game_end(self.environment.current_state)
+        if metrics is not None:
+            metrics.add_episode(episode_length)
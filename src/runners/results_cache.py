@@ -0,0 +1,113 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import zlib
+
+from enum import Enum
+from pathlib import Path
+
+from src.environment.map import RiskMap
+
+class ResultsCache:
+    """Local SQLite store of the aggregated results of simulations, keyed by a hash of everything that determines them, so that unchanged simulations are not re-run.
+    That is the source code, map, agent settings and the contents of the model checkpoints agents play, so simulations of agents that are not reproducible (e.g. wall-clock budgeted) are never cached.
+    The episode count is stored alongside rather than hashed into the key, so a simulation extended to more episodes resumes from the longest cached run of the same key."""
+    model_hashes: dict[tuple[str, int, int], str] = {} # key=(path, size, mtime_ns) of a model checkpoint, so that each version is hashed once per process
+    source_hash: str = None # hash of the simulation source code, computed once per process
+
+    def __init__(self, path: str = "experiment_results/results_cache.sqlite"):
+        self.path = path
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self.connect() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT NOT NULL, num_episodes INTEGER NOT NULL, state BLOB NOT NULL, PRIMARY KEY (key, num_episodes))")
+
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=60)
+
+    def load(self, key: str, max_episodes: int, min_episodes: int = 0) -> dict:
+        """Return the state stored for the given key by the longest simulation of between min_episodes and max_episodes episodes, or None if there is none."""
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT state FROM results WHERE key = ? AND num_episodes BETWEEN ? AND ? ORDER BY num_episodes DESC LIMIT 1",
+                (key, min_episodes, max_episodes)
+            ).fetchone()
+
+        return pickle.loads(zlib.decompress(row[0])) if row is not None else None
+
+    def store(self, key: str, num_episodes: int, state: dict):
+        """Store the state of a simulation of num_episodes episodes (compressed), replacing any previous one of the same key and length."""
+        with self.connect() as connection:
+            connection.execute("INSERT OR REPLACE INTO results (key, num_episodes, state) VALUES (?, ?, ?)", (key, num_episodes, zlib.compress(pickle.dumps(state))))
+
+    @classmethod
+    def get_key(cls, description: dict) -> str:
+        """Return the content hash of a simulation description, together with that of the simulation source code."""
+        return hashlib.sha256(json.dumps({"source": cls.get_source_hash(), **description}, sort_keys=True, default=str).encode()).hexdigest()
+
+    @classmethod
+    def get_source_hash(cls) -> str:
+        """Return the hash of every source file that can affect simulation results, i.e. all of src/ except the experiment scripts (so changing plotting code keeps the cache)."""
+        if cls.source_hash is None:
+            source_root = Path(__file__).resolve().parents[1]
+            source_hash = hashlib.sha256()
+            for source_path in sorted(source_root.rglob("*.py")):
+                if "experiments" not in source_path.relative_to(source_root).parts:
+                    source_hash.update(str(source_path.relative_to(source_root)).encode())
+                    source_hash.update(source_path.read_bytes())
+            cls.source_hash = source_hash.hexdigest()
+
+        return cls.source_hash
+
+    @classmethod
+    def describe_map(cls, risk_map: RiskMap) -> dict:
+        """Return a canonical description of the given map, equal for any two maps loaded from the same JSON."""
+        return {
+            "name": risk_map.name,
+            "territories": [risk_map.territories[territory_id].name for territory_id in range(len(risk_map.territories))],
+            "borders": risk_map.border_ids,
+            "continents": {continent.name: [continent.bonus, risk_map.continent_territory_ids[continent_id]] for continent_id, continent in risk_map.continents.items()}
+        }
+
+    @classmethod
+    def describe(cls, value, depth: int = 3):
+        """Return a description of the given value's class and (recursively, up to depth) its parameters, e.g. an agent and the settings of its strategies.
+        Only attributes named after a constructor parameter are described, so scratch state (e.g. a strategy's plan for the current turn) does not change the description of an agent that has already played.
+        The checkpoint of an agent with a model_path (e.g. an RLAgent) is described by the hash of its contents, so retraining a model version invalidates its results."""
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, Enum):
+            return value.name
+        if isinstance(value, (list, tuple)) and all(item is None or isinstance(item, (bool, int, float, str)) for item in value):
+            return list(value)
+        if depth > 0 and hasattr(value, "__dict__"):
+            parameter_names = cls.get_parameter_names(type(value))
+            description = {"class": type(value).__qualname__} | {name: cls.describe(attribute, depth - 1) for name, attribute in sorted(vars(value).items()) if name in parameter_names}
+            if isinstance(getattr(value, "model_path", None), str):
+                description["model_hash"] = cls.get_model_hash(value.model_path)
+
+            return description
+
+        return type(value).__qualname__ # e.g. models and maps held by agents, which are identified by their other attributes
+
+    @classmethod
+    def get_model_hash(cls, path: str) -> str:
+        """Return the hash of the contents of the given model checkpoint file, rehashed whenever its size or modification time changes."""
+        stat = os.stat(path)
+        key = (str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+        if key not in cls.model_hashes:
+            cls.model_hashes[key] = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+        return cls.model_hashes[key]
+
+    @classmethod
+    def get_parameter_names(cls, value_class: type) -> set[str]:
+        """Return the names of the parameters of the constructors of the given class and its base classes (e.g. AttackStrategy's transfer_method for every attack strategy)."""
+        return {
+            parameter_name
+            for base_class in value_class.__mro__ if base_class is not object and "__init__" in vars(base_class)
+            for parameter_name in list(inspect.signature(base_class.__init__).parameters)[1:] # without self
+        }
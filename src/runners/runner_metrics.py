@@ -0,0 +1,120 @@
+import csv
+import json
+import time
+
+from typing import Self
+
+class RunnerMetrics:
+    """Throughput and phase-timing metrics of a simulation, filled in by its GameRunners.
+    Episodes and actions are always counted, but phases of an episode step are only timed (with perf_counter_ns) every sample_interval steps, and never if sample_interval is 0, to keep the overhead low."""
+    def __init__(self, sample_interval: int = 0):
+        assert sample_interval >= 0, "The sample interval cannot be negative"
+
+        self.sample_interval = sample_interval
+        self.episode_count = 0
+        self.action_count = 0
+        self.elapsed_ns = 0 # wall-clock time spent running episodes (by this process or its workers), up to the last stop_timer
+        self.timer_start_ns: int = None # perf_counter_ns at the last start_timer, or None if the timer is stopped
+        self.phase_times: dict[str, list[int]] = {} # key=phase name, value=[no. of timed samples, total ns], e.g. "select_action.RandomAgent" or "apply.DeployAction"
+        self.step_countdown = 1 # steps until the next timed step
+
+    def is_sampled_step(self) -> bool:
+        """Return True if the phases of the current episode step should be timed."""
+        if self.sample_interval == 0:
+            return False
+
+        self.step_countdown -= 1
+        if self.step_countdown > 0:
+            return False
+
+        self.step_countdown = self.sample_interval
+        return True
+
+    def add_phase_time(self, phase: str, time_ns: int):
+        phase_time = self.phase_times.setdefault(phase, [0, 0])
+        phase_time[0] += 1
+        phase_time[1] += time_ns
+
+    def add_episode(self, action_count: int):
+        self.episode_count += 1
+        self.action_count += action_count
+
+    def start_timer(self):
+        self.timer_start_ns = time.perf_counter_ns()
+
+    def stop_timer(self):
+        self.elapsed_ns = self.get_elapsed_ns()
+        self.timer_start_ns = None
+
+    def get_elapsed_ns(self) -> int:
+        return self.elapsed_ns + (time.perf_counter_ns() - self.timer_start_ns if self.timer_start_ns is not None else 0)
+
+    def merge(self, other: Self) -> Self:
+        """Fold the counts and phase times of another metrics (e.g. of a worker process) into this one; its elapsed time overlaps this one's, so it is not added."""
+        self.episode_count += other.episode_count
+        self.action_count += other.action_count
+        for phase, (sample_count, total_ns) in other.phase_times.items():
+            phase_time = self.phase_times.setdefault(phase, [0, 0])
+            phase_time[0] += sample_count
+            phase_time[1] += total_ns
+
+        return self
+
+    def get_episodes_per_second(self) -> float:
+        elapsed_ns = self.get_elapsed_ns()
+        return self.episode_count / (elapsed_ns / 1e9) if elapsed_ns > 0 else 0.0
+
+    def get_actions_per_second(self) -> float:
+        elapsed_ns = self.get_elapsed_ns()
+        return self.action_count / (elapsed_ns / 1e9) if elapsed_ns > 0 else 0.0
+
+    def get_phase_rows(self) -> list[dict]:
+        """Return a row per timed phase (slowest first), of its no. of samples, total and mean time, and share of the total sampled time."""
+        sampled_ns = sum(total_ns for _, total_ns in self.phase_times.values())
+        return [
+            {
+                "phase": phase,
+                "samples": sample_count,
+                "total_ns": total_ns,
+                "mean_ns": total_ns / sample_count,
+                "share": total_ns / sampled_ns if sampled_ns > 0 else 0.0
+            }
+            for phase, (sample_count, total_ns) in sorted(self.phase_times.items(), key=lambda phase_time: phase_time[1][1], reverse=True)
+        ]
+
+    def get_progress_line(self) -> str:
+        return f"{self.get_episodes_per_second():.2f} episodes/s, {self.get_actions_per_second():.0f} actions/s"
+
+    def to_dict(self) -> dict:
+        return {
+            "episode_count": self.episode_count,
+            "action_count": self.action_count,
+            "elapsed_s": self.get_elapsed_ns() / 1e9,
+            "episodes_per_second": self.get_episodes_per_second(),
+            "actions_per_second": self.get_actions_per_second(),
+            "sample_interval": self.sample_interval,
+            "phases": self.get_phase_rows()
+        }
+
+    def export_json(self, path: str):
+        with open(path, "w") as json_file:
+            json.dump(self.to_dict(), json_file, indent=4)
+
+    def export_csv(self, path: str):
+        """Write the metrics as (metric, value) rows, with each phase's columns named "<phase>.<column>", e.g. "apply.DeployAction.mean_ns"."""
+        metrics = self.to_dict()
+        rows = [[metric, value] for metric, value in metrics.items() if metric != "phases"]
+        for row in metrics["phases"]:
+            rows.extend([f"{row['phase']}.{column}", value] for column, value in row.items() if column != "phase")
+
+        with open(path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(["metric", "value"])
+            writer.writerows(rows)
+
+    def summarise(self) -> str:
+        lines = [f"Ran {self.episode_count} episodes and {self.action_count} actions in {self.get_elapsed_ns() / 1e9:.2f}s ({self.get_progress_line()})."]
+        for row in self.get_phase_rows():
+            lines.append(f"{row['phase']}: {row['share']:.1%} of sampled time, {row['mean_ns'] / 1000:.1f}us mean over {row['samples']} samples")
+
+        return "\n".join(lines)
@@ -1,15 +1,30 @@
+import multiprocessing
+import os
+import pickle
 import random
+import time
+
+from typing import Generator
+
+import numpy as np
 
 from src.agents.agent import Agent
 from src.agents.agent_sampler import AgentSampler
 
 from src.environment.map import RiskMap
 
-from src.observers.observer import Observer
+from src.observers.observer import Observer, CoreObserver
 from src.observers.observer_manager import ObserverManager
+from src.observers.observer_reducer import ObserverReducer
 from src.observers.outcome_observer import OutcomeObserver
+from src.observers.player_telemetry import ColumnarLog, PlayerTelemetry
 
+from src.runners.early_stopping import EarlyStopping
 from src.runners.game_runner import GameRunner
+from src.runners.results_cache import ResultsCache
+from src.runners.runner_metrics import RunnerMetrics
+
+forked_simulation_runner: "SimulationRunner" = None # runner whose shards are being run by a forked pool, set before forking so that workers inherit it rather than unpickle a copy
 
 class SimulationRunner:
     """Manages the execution of multiple Risk game episodes, for RL training and aggregate experimental analysis."""
@@ -23,8 +38,25 @@ class SimulationRunner:
         max_episode_length = 100000,
         shuffle_turn_order = False,
         enable_rl_agent_performance_test = False,
-        rl_agent_performance_test_num_players = 2
+        rl_agent_performance_test_num_players = 2,
+        num_concurrent_games: int = 1,
+        seed: int = None,
+        num_workers: int = 1,
+        retain_game_observations: bool = True,
+        checkpoint_path: str = None,
+        checkpoint_interval: int = 100,
+        early_stopping: EarlyStopping = None,
+        results_cache: ResultsCache = None,
+        metrics_sample_interval: int = 0
     ):
+        assert num_concurrent_games >= 1, "At least one game must be run at a time"
+        assert num_workers >= 1, "At least one worker is required"
+        assert checkpoint_path is None or not retain_game_observations, "Checkpoints only hold the observer reducers, so game observations must not be retained"
+        assert checkpoint_interval >= 1, "Checkpoints must be written at least every episode"
+        assert results_cache is None or (seed is not None and not retain_game_observations), "Only seeded simulations without retained game observations can be cached"
+        assert results_cache is None or all(agent.is_reproducible() for agent in agents), "Simulations of agents with a wall-clock budget (e.g. an MCTSAgent with a time_limit) cannot be cached"
+        assert early_stopping is None or any(isinstance(observer, OutcomeObserver) for observer in observers), "Early stopping estimates win rates from an OutcomeObserver"
+
         self.title = title
         self.risk_map = risk_map
         self.agents = agents
@@ -33,6 +65,17 @@ class SimulationRunner:
         self.observers = observers
         self.shuffle_turn_order = shuffle_turn_order
         self.game_observations: list[ObserverManager] = []
+        self.num_concurrent_games = num_concurrent_games
+        self.seed = seed # if given, every episode is seeded with seed + episode
+        self.num_workers = num_workers
+        self.retain_game_observations = retain_game_observations # if False, each finished episode's observations are folded into observer_reducers and dropped, so memory stays flat however many episodes run
+        self.checkpoint_path = checkpoint_path # if given, progress is written here every checkpoint_interval episodes, and resumed from here by run_simulation
+        self.checkpoint_interval = checkpoint_interval
+        self.agents_episode = 0 # episode whose turn order self.agents holds
+        self.early_stopping = early_stopping # if given, the simulation stops once its outcome estimates are precise enough, with num_episodes as a cap
+        self.num_finished_episodes = 0
+        self.results_cache = results_cache # if given, results are loaded from (or extended from) and stored to it
+        self.metrics = RunnerMetrics(metrics_sample_interval) # throughput of the episodes run (not loaded), and phase timings of every metrics_sample_interval-th step if non-zero
 
         self.rl_agent_performance_test = enable_rl_agent_performance_test
         self.rl_agent_performance_test_num_players = rl_agent_performance_test_num_players
@@ -40,27 +83,300 @@ class SimulationRunner:
         if self.rl_agent_performance_test:
             assert len(self.agents) == 1 and self.agents[0].get_name().startswith("RLAgent"), "RL agent performance test should only be run with a single RL agent."
             self.rl_agent = self.agents[0]
+            if seed is not None:
+                random.seed(seed) # so that seeded simulations also agree on the first episode's opponents
             self.agents = [self.rl_agent] + AgentSampler.sample_agent_composition(self.rl_agent_performance_test_num_players - 1, [self.rl_agent])
+
+        self.observer_reducers: list[ObserverReducer] = None if self.retain_game_observations else self.create_observer_reducers() # aligned with each episode's observers, i.e. CoreObserver first
     
     def run_simulation(self):
-        for episode in range(self.num_episodes):
-            print(f"\rStarting episode {episode + 1}/{self.num_episodes} for {self.title}...", end="")
-            observers = [observer.clean_copy() for observer in self.observers]
-            if episode > 0: # we never shuffle turn order for the first episode
-                if self.rl_agent_performance_test:
-                    self.agents = AgentSampler.sample_agent_composition(self.rl_agent_performance_test_num_players, [self.rl_agent])
-                elif self.shuffle_turn_order: # we never shuffle turn order for the first episode...
-                    self.agents = random.sample(self.agents, len(self.agents))
-            observer_manager = ObserverManager(
-                self.risk_map, 
-                self.agents,
-                observers,
-            )
-            self.game_observations.append(observer_manager)
-            game_runner = GameRunner(self.risk_map, self.agents, observer_manager, self.max_episode_length)
+        """Run every episode (or until early_stopping is satisfied), across num_workers processes if more than one.
+        With a checkpoint_path, episodes are run in chunks of checkpoint_interval, each followed by a checkpoint, and a previous run's checkpoint is resumed from its next unfinished episode."""
+        seed = self.seed
+        if seed is None and (self.num_workers > 1 or self.checkpoint_path is not None):
+            seed = random.randrange(2**31) # shards and resumed runs must agree on the seed of every episode
+        next_episode = 0
+        if self.checkpoint_path is not None and os.path.exists(self.checkpoint_path):
+            next_episode, seed = self.load_checkpoint()
+        if self.results_cache is not None:
+            results_key = ResultsCache.get_key(self.get_results_description())
+            # Early stopping checks happen on chunk boundaries, so only a run with the same cap would have stopped at the same episode
+            cached_state = self.results_cache.load(results_key, self.num_episodes, self.num_episodes if self.early_stopping is not None else 0)
+            if cached_state is not None and cached_state["next_episode"] > next_episode:
+                next_episode, seed = self.set_state(cached_state)
+                print(f"Loaded {next_episode} cached episodes for {self.title}")
+
+        chunk_size = max(self.num_episodes, 1)
+        if self.checkpoint_path is not None:
+            chunk_size = min(chunk_size, self.checkpoint_interval)
+        if self.early_stopping is not None:
+            chunk_size = min(chunk_size, self.early_stopping.check_interval)
+
+        self.num_finished_episodes = next_episode
+        self.metrics.start_timer()
+        for chunk_start in range(next_episode, self.num_episodes, chunk_size):
+            if self.is_precise_enough():
+                break
+
+            episodes = range(chunk_start, min(chunk_start + chunk_size, self.num_episodes))
+            if self.num_workers > 1:
+                self.run_parallel_episodes(episodes, seed)
+            else:
+                self.run_episodes(episodes, seed)
+            self.num_finished_episodes = episodes.stop
+
+            if self.checkpoint_path is not None:
+                self.save_checkpoint(episodes.stop, seed)
+        self.metrics.stop_timer()
+
+        if self.results_cache is not None:
+            self.results_cache.store(results_key, self.num_episodes, self.get_state(self.num_finished_episodes, seed))
+
+    def is_precise_enough(self) -> bool:
+        """Return True if early stopping is enabled and the outcome estimates of the finished episodes already meet its targets."""
+        if self.early_stopping is None or self.num_finished_episodes < self.early_stopping.min_episodes:
+            return False
+
+        return self.early_stopping.is_precise(self.get_observer_reducer(OutcomeObserver), self.rl_agent_performance_test)
+
+    def get_state(self, next_episode: int, seed: int) -> dict:
+        """Return the observer reducers of the episodes before next_episode, together with the seed and global random state needed to continue the run identically."""
+        return {
+            "title": self.title,
+            "next_episode": next_episode,
+            "seed": seed,
+            "random_state": random.getstate(),
+            "observer_reducers": self.observer_reducers
+        }
+
+    def set_state(self, state: dict) -> tuple[int, int]:
+        """Restore the observer reducers and global random state of the given state (see get_state), and return its (next episode, seed)."""
+        self.observer_reducers = state["observer_reducers"]
+        random.setstate(state["random_state"])
+
+        return state["next_episode"], state["seed"]
+
+    def save_checkpoint(self, next_episode: int, seed: int):
+        """Atomically write the state of the episodes before next_episode (see get_state) to checkpoint_path."""
+        with open(f"{self.checkpoint_path}.tmp", "wb") as checkpoint_file:
+            pickle.dump(self.get_state(next_episode, seed), checkpoint_file)
+        os.replace(f"{self.checkpoint_path}.tmp", self.checkpoint_path) # so that a crash mid-write leaves the previous checkpoint intact
+
+    def load_checkpoint(self) -> tuple[int, int]:
+        """Restore the state of the checkpoint at checkpoint_path, and return its (next episode, seed)."""
+        with open(self.checkpoint_path, "rb") as checkpoint_file:
+            checkpoint = pickle.load(checkpoint_file)
+        assert checkpoint["title"] == self.title, f"Checkpoint at {self.checkpoint_path} belongs to {checkpoint['title']}, not {self.title}"
+        assert checkpoint["next_episode"] <= self.num_episodes, f"Checkpoint at {self.checkpoint_path} is ahead of the last episode"
+
+        return self.set_state(checkpoint)
+
+    def get_results_description(self) -> dict:
+        """Return a description of everything besides the episode count that determines this simulation's results, to key the results cache by."""
+        return {
+            "map": ResultsCache.describe_map(self.risk_map),
+            "agents": [[agent.get_name(), ResultsCache.describe(agent)] for agent in self.agents],
+            "observers": [type(observer).__qualname__ for observer in self.observers],
+            "max_episode_length": self.max_episode_length,
+            "shuffle_turn_order": self.shuffle_turn_order,
+            "rl_agent_performance_test": self.rl_agent_performance_test,
+            "rl_agent_performance_test_num_players": self.rl_agent_performance_test_num_players,
+            "seed": self.seed,
+            "early_stopping": ResultsCache.describe(self.early_stopping)
+        }
+
+    def run_parallel_episodes(self, episodes: range, seed: int):
+        """Distribute the given episodes across a pool of num_workers processes, in contiguous shards that each replay the turn orders preceding them.
+        Every episode is seeded with seed + episode, so the results match running them in one process with the same seed, in the same order."""
+        num_shards = min(len(episodes), 4 * self.num_workers) # a few shards per worker, so that workers finishing early pick up the remaining ones
+        shard_bounds = [episodes.start + round(len(episodes) * shard_i / num_shards) for shard_i in range(num_shards + 1)]
+        shards = [range(start, end) for start, end in zip(shard_bounds[:-1], shard_bounds[1:])]
+
+        # Workers are forked where possible so they share the parent's already loaded blitz probability matrix and models, rather than each reloading them.
+        # The runner (agents included) is then inherited through forked_simulation_runner, and only each (shard, seed) is pickled.
+        global forked_simulation_runner
+        start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        forked_simulation_runner = self if start_method == "fork" else None
+        run_shard = SimulationRunner.run_forked_shard if start_method == "fork" else self.run_shard
+        try:
+            with multiprocessing.get_context(start_method).Pool(self.num_workers) as pool:
+                self.merge_shards(shards, pool.imap(run_shard, [(shard, seed) for shard in shards]))
+        finally:
+            forked_simulation_runner = None
+
+    def merge_shards(self, shards: list[range], shard_results):
+        """Fold the (observations or reducers, metrics) of each shard, as they arrive in shard order, into this runner."""
+        for shard, (shard_observations, shard_metrics) in zip(shards, shard_results):
+            self.metrics.merge(shard_metrics)
+            if self.retain_game_observations:
+                for observer_manager in shard_observations:
+                    if observer_manager.observers:
+                        observer_manager.observers[0].risk_map = self.risk_map
+                self.game_observations.extend(shard_observations)
+            else:
+                for observer_reducer, shard_observer_reducer in zip(self.observer_reducers, shard_observations):
+                    observer_reducer.merge(shard_observer_reducer)
+            print(f"\rFinished episode {shard.stop}/{self.num_episodes} for {self.title} ({self.metrics.get_progress_line()})...", end="")
+
+    @classmethod
+    def run_forked_shard(cls, shard: tuple[range, int]) -> tuple[list[ObserverManager] | list[ObserverReducer], RunnerMetrics]:
+        """Run the given shard of the runner a forked worker inherited (see run_parallel_episodes)."""
+        return forked_simulation_runner.run_shard(shard)
+
+    def run_shard(self, shard: tuple[range, int]) -> tuple[list[ObserverManager] | list[ObserverReducer], RunnerMetrics]:
+        """Run the given (episodes, seed) shard inside a worker process, and return the observations of its episodes without their (parent-owned) map, or their reducers if episodes are not retained, along with its metrics."""
+        episodes, seed = shard
+        self.game_observations = []
+        self.metrics = RunnerMetrics(self.metrics.sample_interval)
+        if not self.retain_game_observations:
+            self.observer_reducers = self.create_observer_reducers()
+        self.run_episodes(episodes, seed)
+
+        if not self.retain_game_observations:
+            return self.observer_reducers, self.metrics
+
+        for observer_manager in self.game_observations:
+            if observer_manager.observers:
+                observer_manager.observers[0].risk_map = None
+
+        return self.game_observations, self.metrics
+
+    def run_episodes(self, episodes: range, seed: int = None):
+        """Run the given contiguous range of episodes, one at a time or interleaved if num_concurrent_games > 1.
+        Turn orders are picked from the previous episode's, so those of any episodes skipped since the last run are replayed first."""
+        assert episodes.start > self.agents_episode or episodes.start == self.agents_episode == 0, "Episodes must be run in order"
+        for episode in range(self.agents_episode + 1, episodes.start):
+            self.select_agents(episode, seed)
+
+        if self.num_concurrent_games > 1:
+            self.run_interleaved_episodes(episodes, seed)
+            return
+
+        for episode in episodes:
+            print(f"\rStarting episode {episode + 1}/{self.num_episodes} for {self.title} ({self.metrics.get_progress_line()})...", end="")
+            game_runner = self.start_episode(episode, seed)
             game_runner.run_episode()
-    
+            self.finish_episode(game_runner.observer_manager)
+
+    def run_interleaved_episodes(self, episodes: range, seed: int = None):
+        """Run up to num_concurrent_games episodes at once as generators, each with its own random state, evaluating the pending decisions of each batched inference agent in a single call.
+        Episodes are started in order, so every episode plays out exactly as it does when run one at a time with the same seed (a random one is drawn if none is given)."""
+        seed = seed if seed is not None else random.randrange(2**31)
+        pending_games: list[tuple[Generator, ObserverManager, tuple, tuple]] = [] # (episode generator, its observers, its random state, its pending decision)
+        next_episode = episodes.start
+
+        while next_episode < episodes.stop or pending_games:
+            while next_episode < episodes.stop and len(pending_games) < self.num_concurrent_games:
+                print(f"\rStarting episode {next_episode + 1}/{self.num_episodes} for {self.title} ({self.metrics.get_progress_line()})...", end="")
+                game_runner = self.start_episode(next_episode, seed)
+                self.resume_game(pending_games, game_runner.play_episode(), game_runner.observer_manager, random.getstate(), None)
+                next_episode += 1
+
+            decisions_by_agent: dict[Agent, list[tuple[Generator, ObserverManager, tuple, tuple]]] = {}
+            for pending_game in pending_games:
+                decisions_by_agent.setdefault(pending_game[3][0], []).append(pending_game)
+            pending_games = []
+
+            for agent, agent_games in decisions_by_agent.items():
+                start_ns = time.perf_counter_ns()
+                action_probabilities = agent.get_action_probabilities([decision[1] for _, _, _, decision in agent_games], [decision[2] for _, _, _, decision in agent_games], self.risk_map)
+                if self.metrics.sample_interval > 0:
+                    self.metrics.add_phase_time(f"batched_inference.{agent.get_name()}", time.perf_counter_ns() - start_ns)
+                for (episode_generator, observer_manager, random_state, _), game_action_probabilities in zip(agent_games, action_probabilities):
+                    self.resume_game(pending_games, episode_generator, observer_manager, random_state, game_action_probabilities)
+
+    def resume_game(self, pending_games: list[tuple[Generator, ObserverManager, tuple, tuple]], episode_generator: Generator, observer_manager: ObserverManager, random_state: tuple, value):
+        """Resume the given episode generator under its own random state with the given value, and add it back to the pending games unless it has finished."""
+        random.setstate(random_state)
+        try:
+            decision = episode_generator.send(value)
+        except StopIteration:
+            self.finish_episode(observer_manager)
+            return
+
+        pending_games.append((episode_generator, observer_manager, random.getstate(), decision))
+
+    def start_episode(self, episode: int, seed: int = None) -> GameRunner:
+        """Pick the agents' turn order for the given episode (see select_agents), and return its game runner."""
+        self.select_agents(episode, seed)
+        observer_manager = ObserverManager(
+            self.risk_map, 
+            self.agents,
+            [observer.clean_copy() for observer in self.observers],
+        )
+        self.game_observations.append(observer_manager)
+
+        return GameRunner(self.risk_map, self.agents, observer_manager, self.max_episode_length, self.metrics)
+
+    def finish_episode(self, observer_manager: ObserverManager):
+        """Fold the observations of the given finished episode into the observer reducers and drop them, unless episodes are retained."""
+        if self.retain_game_observations:
+            return
+
+        for observer_reducer, observer in zip(self.observer_reducers, observer_manager.observers):
+            observer_reducer.update(observer)
+        self.game_observations.remove(observer_manager)
+
+    def create_observer_reducers(self) -> list[ObserverReducer]:
+        """Return an empty reducer for each observer of an episode (CoreObserver first, none if there are no observers), reporting on the players in their initial turn order."""
+        if not self.observers:
+            return []
+
+        player_names = [agent.get_name() for agent in self.agents]
+        observer_reducers = [observer.create_reducer(player_names) for observer in [CoreObserver] + self.observers]
+        assert None not in observer_reducers, "Every observer must support reducers to run without retaining game observations"
+
+        return observer_reducers
+
+    def get_observer_reducer(self, observer_class: type[Observer]) -> ObserverReducer:
+        """Return the summary across all episodes of the observations of the given observer type, folding the retained observers into one if needed."""
+        observer_i = next(i for i, observer in enumerate(self.observers) if isinstance(observer, observer_class)) + 1 # CoreObserver comes first
+        if not self.retain_game_observations:
+            return observer_class.reduce(self.observer_reducers[observer_i])
+
+        return observer_class.reduce([observer_manager.observers[observer_i] for observer_manager in self.game_observations])
+
+    def select_agents(self, episode: int, seed: int = None):
+        """Seed the global random module with seed + episode (if a seed is given), and pick the agents' turn order for the given episode from that of the previous one."""
+        if seed is not None:
+            random.seed(seed + episode)
+        self.agents_episode = episode
+
+        if episode > 0: # we never shuffle turn order for the first episode
+            if self.rl_agent_performance_test:
+                self.agents = AgentSampler.sample_agent_composition(self.rl_agent_performance_test_num_players, [self.rl_agent])
+            elif self.shuffle_turn_order: # we never shuffle turn order for the first episode...
+                self.agents = random.sample(self.agents, len(self.agents))
+
+    def export_telemetry(self, path: str):
+        """Save the player telemetry logs of every retained episode to a compressed .npz file for offline analysis.
+        Each log is stored as one array per field (e.g. "attacks.defender_territory_id"), plus "<log>.episode" and "<log>.player_name" arrays identifying each record."""
+        assert self.retain_game_observations, "Telemetry can only be exported if game observations are retained"
+        player_telemetries = [
+            (episode, player_telemetry)
+            for episode, observer_manager in enumerate(self.game_observations) if observer_manager.observers
+            for player_telemetry in observer_manager.observers[0].player_telemetries
+        ]
+        assert player_telemetries, "No episodes with observers have been run"
+
+        arrays: dict[str, np.ndarray] = {}
+        for log_name in PlayerTelemetry.log_names:
+            logs = [getattr(player_telemetry, log_name) for _, player_telemetry in player_telemetries]
+            arrays |= {f"{log_name}.{field}": column for field, column in ColumnarLog.concatenate(logs).items()}
+            arrays[f"{log_name}.episode"] = np.repeat([episode for episode, _ in player_telemetries], [len(log) for log in logs])
+            arrays[f"{log_name}.player_name"] = np.repeat([player_telemetry.player_name for _, player_telemetry in player_telemetries], [len(log) for log in logs])
+
+        np.savez_compressed(path, **arrays)
+
+    def export_metrics(self, path: str):
+        """Save the simulation's metrics (see RunnerMetrics) to a .json file, or a .csv file of (metric, value) rows."""
+        if path.endswith(".csv"):
+            self.metrics.export_csv(path)
+        else:
+            self.metrics.export_json(path)
+
     def summarise_game(self, episode: int = None):
+        assert self.retain_game_observations, "Individual episodes can only be summarised if their observations are retained"
         if not self.game_observations[0].observers:
             return
         
@@ -74,10 +390,24 @@ class SimulationRunner:
 
     def summarise_simulation(self):
         print(f"\n\n**** Summarising observations for {self.title} ****")
+        if self.metrics.episode_count > 0:
+            print(self.metrics.summarise() + "\n")
+        if self.early_stopping is not None:
+            print(f"Ran {self.num_finished_episodes} of at most {self.num_episodes} episodes.\n")
+            print(self.early_stopping.summarise(self.get_observer_reducer(OutcomeObserver), self.rl_agent_performance_test) + "\n")
+
+        if not self.retain_game_observations:
+            for observer, observer_reducer in zip([CoreObserver] + self.observers, self.observer_reducers):
+                print(observer.summarise_simulation(observer_reducer, self.rl_agent_performance_test))
+
+            if self.observer_reducers:
+                print(f"\n{self.observer_reducers[0].action_counts.get_count(self.max_episode_length)}/{self.num_finished_episodes} episodes reached the maximum episode length of {self.max_episode_length} and were truncated.")
+            return
+
         for i, observer in enumerate(self.game_observations[0].observers):
             observers = [observer_manager.observers[i] for observer_manager in self.game_observations]
             print(observer.summarise_simulation(observers, self.rl_agent_performance_test))
         
         if self.game_observations[0].observers:
             truncated_episodes = [observer_manager for observer_manager in self.game_observations if observer_manager.observers[0].action_count == self.max_episode_length]
-            print(f"\n{len(truncated_episodes)}/{self.num_episodes} episodes reached the maximum episode length of {self.max_episode_length} and were truncated.")
+            print(f"\n{len(truncated_episodes)}/{self.num_finished_episodes} episodes reached the maximum episode length of {self.max_episode_length} and were truncated.")
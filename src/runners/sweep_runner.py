@@ -0,0 +1,91 @@
+import contextlib
+import multiprocessing
+import os
+import random
+import time
+
+from typing import Any, Callable
+
+from src.runners.simulation_runner import SimulationRunner
+
+class SweepRunner:
+    """Runs one simulation per point of a parameter sweep, concurrently across a pool of num_workers processes (each simulation running in a single process).
+    Points are started longest job first, so that the biggest maps do not straggle at the end of the sweep, but results are returned in the order of the parameter grid."""
+    def __init__(
+        self,
+        title: str,
+        parameters: list,
+        create_simulation_runner: Callable[[Any], SimulationRunner],
+        num_workers: int = 1,
+        get_cost: Callable[[SimulationRunner], float] = None
+    ):
+        assert num_workers >= 1, "At least one worker is required"
+
+        self.title = title
+        self.parameters = parameters
+        self.create_simulation_runner = create_simulation_runner # factory of the (unstarted) simulation of a sweep point, from its map, agents and observers
+        self.num_workers = num_workers
+        self.get_cost = get_cost or self.get_default_cost # estimated relative running time of a sweep point's simulation
+
+        self.simulations: dict[Any, SimulationRunner] = {} # key=parameter, value=finished SimulationRunner of that sweep point
+
+    def run_sweep(self) -> dict[Any, SimulationRunner]:
+        """Run the simulation of every sweep point, and return them keyed by parameter in grid order."""
+        # Simulations are created in grid order in this process, so maps generated from a seeded global random module are the same however the points are scheduled
+        simulation_runners = {parameter: self.create_simulation_runner(parameter) for parameter in self.parameters}
+        for simulation_runner in simulation_runners.values():
+            assert simulation_runner.num_workers == 1 or self.num_workers == 1, "Simulations of a parallel sweep must each run in a single process"
+
+        costs = {parameter: self.get_cost(simulation_runner) for parameter, simulation_runner in simulation_runners.items()}
+        scheduled_points = sorted(simulation_runners.items(), key=lambda point: costs[point[0]], reverse=True)
+        total_cost, finished_cost = sum(costs.values()), 0
+        start_time = time.perf_counter()
+
+        finished_simulations: dict[Any, SimulationRunner] = {}
+        for parameter, simulation_runner, running_time in self.run_sweep_points(scheduled_points):
+            finished_simulations[parameter] = simulation_runner
+            finished_cost += costs[parameter]
+            elapsed_time = time.perf_counter() - start_time
+            remaining_time = elapsed_time * (total_cost - finished_cost) / finished_cost if finished_cost > 0 else 0.0
+            print(
+                f"\r{self.title}: finished {len(finished_simulations)}/{len(self.parameters)} sweep points "
+                f"(last {parameter} in {running_time:.1f}s), {elapsed_time:.0f}s elapsed, ~{remaining_time:.0f}s remaining...",
+                end="" if len(finished_simulations) < len(self.parameters) else "\n"
+            )
+
+        self.simulations = {parameter: finished_simulations[parameter] for parameter in self.parameters}
+        return self.simulations
+
+    def run_sweep_points(self, scheduled_points: list[tuple[Any, SimulationRunner]]):
+        """Yield (parameter, finished SimulationRunner, running time) of the given sweep points as they finish, in this process if num_workers is 1."""
+        if self.num_workers == 1:
+            for scheduled_point in scheduled_points:
+                yield self.run_sweep_point(scheduled_point)
+            return
+
+        # Workers are forked where possible so they share the parent's already loaded blitz probability matrix, rather than each reloading it
+        start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        with multiprocessing.get_context(start_method).Pool(min(self.num_workers, len(scheduled_points))) as pool:
+            yield from pool.imap_unordered(self.run_parallel_sweep_point, scheduled_points)
+
+    @classmethod
+    def run_sweep_point(cls, scheduled_point: tuple[Any, SimulationRunner]) -> tuple[Any, SimulationRunner, float]:
+        parameter, simulation_runner = scheduled_point
+        start_time = time.perf_counter()
+        simulation_runner.run_simulation()
+
+        return parameter, simulation_runner, time.perf_counter() - start_time
+
+    @classmethod
+    def run_parallel_sweep_point(cls, scheduled_point: tuple[Any, SimulationRunner]) -> tuple[Any, SimulationRunner, float]:
+        """Run a sweep point inside a worker process, whose per-episode progress would only garble the sweep's."""
+        if scheduled_point[1].seed is None:
+            random.seed() # forked workers would otherwise all continue the parent's random state
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            return cls.run_sweep_point(scheduled_point)
+
+    @classmethod
+    def get_default_cost(cls, simulation_runner: SimulationRunner) -> float:
+        """Estimate a simulation's running time as its number of episodes times the size of its map (in territories and borders)."""
+        risk_map = simulation_runner.risk_map
+        return simulation_runner.num_episodes * (len(risk_map.territories) + sum(len(border_ids) for border_ids in risk_map.border_ids))
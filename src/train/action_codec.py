@@ -0,0 +1,38 @@
+import numpy as np
+
+from src.environment.actions import Action, ActionList, DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction
+from src.environment.map import RiskMap
+
+ACTION_CLASSES: list[type[Action]] = [DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction] # order of the segments of the action space
+
+class ActionCodec:
+    """Maps actions to and from their index in the flat RL action space of a given map, compiled once so that encoding and decoding are single lookups."""
+    def __init__(self, risk_map: RiskMap):
+        self.risk_map = risk_map
+
+        self.max_actions = np.array([action_class.get_max_actions(risk_map) for action_class in ACTION_CLASSES], dtype=np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(self.max_actions)[:-1]))
+        self.size = int(self.max_actions.sum())
+        self.class_offsets: dict[type[Action], int] = {action_class: int(offset) for action_class, offset in zip(ACTION_CLASSES, self.offsets)}
+
+        # index -> (action class position within ACTION_CLASSES, index local to that action class), and index -> action instance
+        self.index_action_classes = np.repeat(np.arange(len(ACTION_CLASSES)), self.max_actions)
+        self.index_local_indices = np.arange(self.size) - self.offsets[self.index_action_classes]
+        self.index_actions: list[Action] = [ACTION_CLASSES[action_class_i].decode_action(int(local_index), risk_map) for action_class_i, local_index in zip(self.index_action_classes, self.index_local_indices)]
+
+    def encode(self, action: Action) -> int:
+        """Return the index of the given action within the action space. Reverse of decode."""
+        return self.class_offsets[type(action)] + action.encode_action(self.risk_map)
+
+    def decode(self, action_index: int) -> Action:
+        """Return the action at the given index of the action space. Reverse of encode. Actions are shared between calls, and must not be mutated."""
+        return self.index_actions[action_index]
+
+    def get_action_masks(self, valid_action_lists: list[ActionList]) -> np.ndarray:
+        """Return a new (len(valid_action_lists), size) boolean array marking the valid actions of each of the given action lists."""
+        action_masks = np.zeros((len(valid_action_lists), self.size), dtype=bool)
+        for i, valid_actions in enumerate(valid_action_lists):
+            for action in valid_actions.flatten():
+                action_masks[i, self.encode(action)] = True
+
+        return action_masks
@@ -0,0 +1,121 @@
+import argparse
+
+import numpy as np
+
+from src.environment.map import RiskMap
+
+from src.train.model_paths import get_model_name, get_model_path
+from src.train.observation_encoder import ObservationEncoder
+
+ACTIVATIONS = {
+    "Tanh": np.tanh,
+    "ReLU": lambda x: np.maximum(x, 0.0),
+}
+
+class FastPolicy:
+    """NumPy-only copy of the actor of a trained MaskablePPO MultiInputPolicy, i.e. its feature extractor, policy MLP and action head, for inference without torch or SB3.
+    The CombinedExtractor's reordering of the observation keys is folded into the first layer, so the policy takes the flat observations of ObservationEncoder.encode_flat as is."""
+    def __init__(self, weights: list[np.ndarray], biases: list[np.ndarray], activation: str):
+        assert len(weights) == len(biases), "Every layer needs both a weight matrix and a bias"
+
+        self.weights = [weight.T.astype(np.float32) for weight in weights] # stored transposed, so layers are applied as observations @ weight
+        self.biases = [bias.astype(np.float32) for bias in biases]
+        self.activation = activation
+        self.activation_function = ACTIVATIONS[activation]
+
+    def get_action_logits(self, flat_observations: np.ndarray) -> np.ndarray:
+        """Return the unmasked action logits for a batch of flat observations (one per row)."""
+        hidden = flat_observations
+        for weight, bias in zip(self.weights[:-1], self.biases[:-1]):
+            hidden = self.activation_function(hidden @ weight + bias)
+
+        return hidden @ self.weights[-1] + self.biases[-1]
+
+    def get_action_probabilities(self, flat_observations: np.ndarray, action_masks: np.ndarray) -> np.ndarray:
+        """Return the masked action probabilities for a batch of flat observations and their action masks, as MaskableCategoricalDistribution computes them."""
+        logits = np.where(action_masks, self.get_action_logits(flat_observations), -np.inf)
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def get_action_indices(self, flat_observations: np.ndarray, action_masks: np.ndarray) -> np.ndarray:
+        """Return the index of the most likely valid action for a batch of flat observations and their action masks."""
+        return np.where(action_masks, self.get_action_logits(flat_observations), -np.inf).argmax(axis=1)
+
+    def save(self, path: str):
+        arrays = {f"weight_{i}": weight.T for i, weight in enumerate(self.weights)} | {f"bias_{i}": bias for i, bias in enumerate(self.biases)}
+        np.savez(path, activation=np.array(self.activation), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "FastPolicy":
+        """Load a policy exported to the given .npz file."""
+        with np.load(path) as arrays:
+            num_layers = sum(1 for key in arrays.files if key.startswith("weight_"))
+            return cls([arrays[f"weight_{i}"] for i in range(num_layers)], [arrays[f"bias_{i}"] for i in range(num_layers)], str(arrays["activation"]))
+
+    @classmethod
+    def sample_action_index(cls, action_probabilities: np.ndarray, uniform_sample: float = None) -> int:
+        """Return the index of the most likely action if no uniform_sample in [0, 1) is given, otherwise the action it selects by inverse transform sampling."""
+        if uniform_sample is None:
+            return int(np.argmax(action_probabilities))
+
+        cumulative_probabilities = np.cumsum(action_probabilities, dtype=np.float64)
+        return int(np.searchsorted(cumulative_probabilities, uniform_sample * cumulative_probabilities[-1], side="right"))
+
+    @classmethod
+    def export(cls, model_path: str, output_path: str = None) -> str:
+        """Export the actor of the MaskablePPO checkpoint at model_path (.zip, extension optional) to an .npz file (model_path with an .npz extension by default), and return its path."""
+        from stable_baselines3.common.save_util import load_from_zip_file # only exporting reads torch checkpoints, so keep torch out of inference-only imports
+
+        model_path = model_path.removesuffix(".zip")
+        data, parameters, _ = load_from_zip_file(model_path)
+        state_dict = {key: value.cpu().numpy() for key, value in parameters["policy"].items()}
+        activation = data.get("policy_kwargs", {}).get("activation_fn", None)
+        activation = "Tanh" if activation is None else activation.__name__
+        assert activation in ACTIVATIONS, f"Unsupported activation function {activation}"
+
+        # The CombinedExtractor concatenates the flattened observation values in key order, so map each of its input features to its position in the flat encoding
+        observation_space = data["observation_space"]
+        observation_encoder = ObservationEncoder(observation_space["territories"].shape[0])
+        flat_positions = observation_encoder.unflatten(np.arange(observation_encoder.flat_observation.size)[None, :])
+        feature_positions = np.concatenate([flat_positions[key].reshape(-1) for key in observation_space.spaces.keys()])
+
+        layer_keys = sorted((key.removesuffix(".weight") for key in state_dict if key.startswith("mlp_extractor.policy_net.") and key.endswith(".weight")), key=lambda key: int(key.split(".")[-1]))
+        weights = [state_dict[f"{key}.weight"] for key in layer_keys] + [state_dict["action_net.weight"]]
+        biases = [state_dict[f"{key}.bias"] for key in layer_keys] + [state_dict["action_net.bias"]]
+
+        first_weight = np.zeros((weights[0].shape[0], observation_encoder.flat_observation.size), dtype=np.float32)
+        first_weight[:, feature_positions] = weights[0]
+        weights[0] = first_weight
+
+        output_path = output_path or f"{model_path}.npz"
+        cls(weights, biases, activation).save(output_path)
+
+        return output_path
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export the actor of a trained PPO model to a NumPy .npz file for torch-free inference.")
+    parser.add_argument(
+        "--map_name",
+        type=str,
+        required=True,
+        help="Map name of the model to export (e.g. mini, classic).",
+    )
+    parser.add_argument(
+        "--num_players",
+        type=int,
+        required=True,
+        help="Number of players the model was trained for.",
+    )
+    parser.add_argument(
+        "--model_name",
+        type=str,
+        help="Version of the model to export. Defaults to the most recent version.",
+    )
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    risk_map = RiskMap.from_json(f"maps/{args.map_name}.json")
+    print(f"Exported fast policy to {FastPolicy.export(get_model_path(risk_map, args.num_players, get_model_name(risk_map, args.num_players, args.model_name)))}")
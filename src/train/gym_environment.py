@@ -1,3 +1,5 @@
+import random
+
 import numpy as np
 
 import gymnasium
@@ -5,10 +7,13 @@ import gymnasium
 from src.agents.agent import Agent
 from src.agents.agent_sampler import AgentSampler
 
-from src.environment.actions import Action, ActionList, DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction
+from src.environment.actions import Action, ActionList, LazyActionList
 from src.environment.game_state import GameState, GamePhase
 from src.environment.map import RiskMap
 
+from src.train.action_codec import ActionCodec
+from src.train.observation_encoder import ObservationEncoder
+
 class DummyRLAgent(Agent):
     """Placeholder agent used only to mark the RL-controlled slot within the environment"""
     def __init__(self):
@@ -31,11 +36,24 @@ class RiskGymEnvironment(gymnasium.Env):
         self.episode_length = 0
         self.game_state = GameState(len(self.agents), len(risk_map.territories), reset_to_initial_state=True)
         self.game_state_at_start_of_rl_turn = None
+        self.observation_encoder = ObservationEncoder(len(risk_map.territories))
+        self.action_codec = ActionCodec(risk_map)
         self.observation_space = self.get_observation_space()
         self.action_space = gymnasium.spaces.Discrete(self.get_max_actions(), dtype=np.uint16)
 
-    def reset(self, seed: int=None):
+    @property
+    def agents(self) -> list[Agent]:
+        return self._agents
+
+    @agents.setter
+    def agents(self, agents: list[Agent]):
+        self._agents = agents
+        self.rl_agent_turn_number = agents.index(self.rl_agent) # cached, as the turn order only changes when a new composition is sampled on reset
+
+    def reset(self, seed: int=None, options: dict=None):
         super().reset(seed=seed)
+        if seed is not None:
+            random.seed(seed) # the game engine and opponent agents draw from the global random module
 
         self.agents = AgentSampler.sample_agent_composition(num_players=len(self.agents), min_agents=[self.rl_agent])
         self.episode_length = 0
@@ -68,6 +86,7 @@ class RiskGymEnvironment(gymnasium.Env):
 
         info = {}
         if terminated or truncated:
+            observation = {key: value.copy() for key, value in observation.items()} # vectorised envs keep the terminal observation after resetting, which would otherwise overwrite its buffers
             info["win"] = self.game_state.is_terminal_state() and self.game_state.get_winner() == self.get_rl_agent_turn_number()
             info["episode_length"] = self.episode_length
 
@@ -99,40 +118,33 @@ class RiskGymEnvironment(gymnasium.Env):
         return observation_space
     
     def encode_observation(self, inference=False) -> dict:
-        if inference:
-            rl_agent_turn_number = self.game_state.current_player
-        else:
-            rl_agent_turn_number = self.get_rl_agent_turn_number()
-        total_troops = sum(self.game_state.territory_troops)
-
-        encoded_observation = {
-            "current_phase": np.arange(3) == self.game_state.current_phase.value,
-            "territories": np.array([
-                [int(territory_owner == rl_agent_turn_number), troop_count / total_troops]
-                for territory_owner, troop_count in zip(self.game_state.territory_owners, self.game_state.territory_troops)
-            ], dtype=np.float32),
-            "territory_card_count": np.array([min(self.game_state.territory_card_counts[rl_agent_turn_number] / 3.0, 1.0)], dtype=np.float32),
-            "deployment_troops": np.array([self.game_state.deployment_troops / (self.game_state.deployment_troops + total_troops)], dtype=np.float32)
-        }
-
-        return encoded_observation
+        """Return the observation of the current game state. Its arrays are reused buffers that are overwritten by the next call."""
+        rl_agent_turn_number = self.game_state.current_player if inference else self.get_rl_agent_turn_number()
+
+        return self.observation_encoder.encode(self.game_state, rl_agent_turn_number)
+
+    def encode_flat_observation(self, inference=False) -> np.ndarray:
+        """Return the observation of the current game state as a single flat vector, sharing the buffers of encode_observation."""
+        rl_agent_turn_number = self.game_state.current_player if inference else self.get_rl_agent_turn_number()
+
+        return self.observation_encoder.encode_flat(self.game_state, rl_agent_turn_number)
     
     def get_max_actions(self) -> int:
         """size: 5T + 9, where T is the number of territories"""
-        return DeployAction.get_max_actions(self.risk_map) + \
-               BattleFromAction.get_max_actions(self.risk_map) + \
-               BattleToAction.get_max_actions(self.risk_map) + \
-               TransferAction.get_max_actions(self.risk_map) + \
-               FortifyFromAction.get_max_actions(self.risk_map) + \
-               FortifyToAction.get_max_actions(self.risk_map) + \
-               FortifyAmountAction.get_max_actions(self.risk_map) + \
-               SkipAction.get_max_actions(self.risk_map)
+        return self.action_codec.size
     
     def advance_to_rl_turn(self):
-        while self.game_state.current_player != self.get_rl_agent_turn_number() and not self.game_state.is_terminal_state() and self.game_state.active_players[self.get_rl_agent_turn_number()]:
-            action_list = ActionList.get_action_list(self.game_state, self.risk_map)
-            selected_action = self.agents[self.game_state.current_player].select_action(action_list, self.game_state, self.risk_map)
-            self.game_state = selected_action.apply(self.game_state, self.risk_map)
+        """Play out the opponents' turns until it is the RL agent's turn (or the episode is over).
+        The game state is copied once up front and then advanced in place, and opponents are handed lazily generated action lists, as rule-based policies only inspect the segments of the current phase.
+        Opponents select the same actions (and consume the RNG in the same order) as with a full ActionList and Action.apply."""
+        if self.game_state.current_player == self.rl_agent_turn_number or self.game_state.is_terminal_state() or not self.game_state.active_players[self.rl_agent_turn_number]:
+            return
+
+        game_state = self.game_state.copy()
+        while game_state.current_player != self.rl_agent_turn_number and not game_state.is_terminal_state() and game_state.active_players[self.rl_agent_turn_number]:
+            selected_action = self.agents[game_state.current_player].select_action(LazyActionList(game_state, self.risk_map), game_state, self.risk_map)
+            selected_action.apply_in_place(game_state, self.risk_map)
+        self.game_state = game_state
     
     def action_masks(self, action_list: ActionList = None) -> np.ndarray:
         action_mask = np.zeros(self.get_max_actions(), dtype=bool)
@@ -141,26 +153,15 @@ class RiskGymEnvironment(gymnasium.Env):
             action_list = ActionList.get_action_list(self.game_state, self.risk_map)
 
         for action in action_list.flatten():
-            action_mask[self.encode_action(action)] = True
+            action_mask[self.action_codec.encode(action)] = True
         
         return action_mask
     
     def encode_action(self, action: Action) -> int:
-        offset = 0
-        for action_class in [DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction]:
-            if isinstance(action, action_class):
-                return offset + action.encode_action(self.risk_map)
-            
-            offset += action_class.get_max_actions(self.risk_map)
+        return self.action_codec.encode(action)
 
     def decode_action(self, action_index: int) -> Action:
-        offset = 0
-        for action_class in [DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction]:
-            max_actions = action_class.get_max_actions(self.risk_map)
-            if offset <= action_index < offset + max_actions:
-                return action_class.decode_action(int(action_index - offset), self.risk_map)
-            
-            offset += max_actions
+        return self.action_codec.decode(action_index)
     
     def calculate_reward(self, previous_state: GameState) -> float:
         """Calculate the reward for the current state based on the previous state and action."""
@@ -194,4 +195,4 @@ class RiskGymEnvironment(gymnasium.Env):
             return 0.0
     
     def get_rl_agent_turn_number(self) -> int:
-        return next(i for i, agent in enumerate(self.agents) if agent == self.rl_agent)
+        return self.rl_agent_turn_number
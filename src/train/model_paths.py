@@ -0,0 +1,19 @@
+from pathlib import Path
+
+from src.environment.map import RiskMap
+
+def get_model_dir(risk_map: RiskMap, num_players: int) -> Path:
+    """Return the folder every saved version of the model for the given map and number of players lives in."""
+    return Path(f"models/{risk_map.name}_map_{num_players}_player".lower())
+
+def get_model_name(risk_map: RiskMap, num_players: int, model_name: str = None) -> str:
+    """Return the given model name, or that of the most recently saved version if None."""
+    if model_name is None:
+        most_recent_version = len(list(get_model_dir(risk_map, num_players).glob("*.zip")))
+        model_name = f"v{most_recent_version}"
+
+    return model_name
+
+def get_model_path(risk_map: RiskMap, num_players: int, model_name: str) -> str:
+    """Return the path (without file extension) the given version of the model is saved to."""
+    return str(get_model_dir(risk_map, num_players) / model_name.lower())
@@ -0,0 +1,78 @@
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.environment.map import RiskMap
+
+from src.train.fast_policy import FastPolicy
+from src.train.model_paths import get_model_name, get_model_path
+
+class ModelRegistry:
+    """Process-wide cache of loaded model checkpoints, keyed by (map name, number of players, version), so that every agent playing the same checkpoint shares a single loaded policy.
+    At most max_models policies are kept, evicting the least recently used, and the resolved latest version of each model folder is cached until clear is called."""
+    def __init__(self, max_models: int = 16):
+        assert max_models >= 1, "The registry must be able to hold at least one model"
+
+        self.max_models = max_models
+        self.models: OrderedDict[tuple[str, int, str, bool], object] = OrderedDict() # key = (map name, num_players, model_name, inference_only i.e. FastPolicy rather than RiskPPO), most recently used last
+        self.latest_model_names: dict[tuple[str, int], str] = {}
+        self.lock = threading.Lock()
+
+    def get_model_name(self, risk_map: RiskMap, num_players: int, model_name: str = None) -> str:
+        """Return the given model name, or that of the most recently saved version if None (resolved from disk once per model folder)."""
+        if model_name is not None:
+            return model_name
+
+        key = (risk_map.name, num_players)
+        with self.lock:
+            if key not in self.latest_model_names:
+                self.latest_model_names[key] = get_model_name(risk_map, num_players)
+
+            return self.latest_model_names[key]
+
+    def get_fast_policy(self, risk_map: RiskMap, num_players: int, model_name: str = None) -> FastPolicy:
+        """Return the shared NumPy export (see FastPolicy) of the given checkpoint, loading it if it is not cached."""
+        return self.get_model(risk_map, num_players, model_name, True)
+
+    def get_risk_ppo(self, risk_map: RiskMap, num_players: int, model_name: str = None):
+        """Return the shared inference-only RiskPPO of the given checkpoint, loading it if it is not cached."""
+        return self.get_model(risk_map, num_players, model_name, False)
+
+    def get_model(self, risk_map: RiskMap, num_players: int, model_name: str, inference_only: bool):
+        key = (risk_map.name, num_players, self.get_model_name(risk_map, num_players, model_name), inference_only)
+        with self.lock:
+            if key in self.models:
+                self.models.move_to_end(key)
+                return self.models[key]
+
+        model = self.load_model(risk_map, num_players, key[2], inference_only) # loaded outside the lock, so that preloads run in parallel
+
+        with self.lock:
+            model = self.models.setdefault(key, model) # keep the first copy if another thread loaded the same checkpoint meanwhile
+            self.models.move_to_end(key)
+            while len(self.models) > self.max_models:
+                self.models.popitem(last=False)
+
+        return model
+
+    def preload(self, checkpoints: list[tuple[RiskMap, int, str]], inference_only: bool = True, max_workers: int = None):
+        """Load the given (risk_map, num_players, model_name) checkpoints into the registry in parallel, e.g. ahead of a tournament between them."""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda checkpoint: self.get_model(*checkpoint, inference_only), checkpoints))
+
+    def clear(self):
+        """Forget every loaded model and resolved latest version, e.g. after saving a new version."""
+        with self.lock:
+            self.models.clear()
+            self.latest_model_names.clear()
+
+    @classmethod
+    def load_model(cls, risk_map: RiskMap, num_players: int, model_name: str, inference_only: bool):
+        if inference_only:
+            return FastPolicy.load(f"{get_model_path(risk_map, num_players, model_name)}.npz")
+
+        from src.train.ppo import RiskPPO # imported on demand, as torch and SB3 take seconds to import
+        return RiskPPO.load(risk_map, num_players, model_name, inference_only=True)
+
+model_registry = ModelRegistry()
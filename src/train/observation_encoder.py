@@ -0,0 +1,68 @@
+import numpy as np
+
+from src.environment.game_state import GameState
+
+class ObservationEncoder:
+    """Encodes game states into observation buffers that are allocated once per environment and overwritten in place on every call.
+    The dict observation's arrays are views into a single flat float32 vector laid out as [current_phase (3), territories (2T, row-major), territory_card_count (1), deployment_troops (1)], so the flat variant shares the same buffers.
+    The returned observations are therefore only valid until the next call, so copy them if they must outlive it."""
+    def __init__(self, num_territories: int):
+        self.num_territories = num_territories
+        self.flat_observation = np.zeros(3 + 2 * num_territories + 2, dtype=np.float32)
+
+        territories_end = 3 + 2 * num_territories
+        self.observation = {key: value[0] for key, value in self.unflatten(self.flat_observation[None, :]).items()}
+
+        # Views written to on every call, created once up front
+        self.current_phase = self.observation["current_phase"]
+        self.owned_column = self.observation["territories"][:, 0]
+        self.troop_share_column = self.observation["territories"][:, 1]
+        self.tail = self.flat_observation[territories_end:] # [territory_card_count, deployment_troops]
+
+        # Scratch buffers for the conversion of the list-backed game state
+        self.territory_owners = np.zeros(num_territories, dtype=np.int64)
+        self.territory_troops = np.zeros(num_territories, dtype=np.float64)
+
+    def __reduce__(self):
+        # Pickling would turn the views into separate copies of the flat observation, so unpickle as a fresh encoder (the buffers only hold the last call's observation)
+        return (ObservationEncoder, (self.num_territories,))
+
+    def encode(self, game_state: GameState, player_i: int) -> dict[str, np.ndarray]:
+        """Write the observation of the given game state from the perspective of the given player into the buffers, and return the dict observation."""
+        self.territory_owners[:] = game_state.territory_owners
+        self.territory_troops[:] = game_state.territory_troops
+        total_troops = self.territory_troops.sum()
+
+        self.current_phase.fill(0.0)
+        self.current_phase[game_state.current_phase.value] = 1.0
+        np.equal(self.territory_owners, player_i, out=self.owned_column)
+        np.divide(self.territory_troops, total_troops, out=self.troop_share_column) # divide in float64 and only then round to float32
+        self.tail[0] = min(game_state.territory_card_counts[player_i] / 3.0, 1.0)
+        self.tail[1] = game_state.deployment_troops / (game_state.deployment_troops + total_troops)
+
+        return self.observation
+
+    def encode_flat(self, game_state: GameState, player_i: int) -> np.ndarray:
+        """Write the observation of the given game state from the perspective of the given player into the buffers, and return the flat observation vector."""
+        self.encode(game_state, player_i)
+
+        return self.flat_observation
+
+    def encode_flat_batch(self, game_states: list[GameState]) -> np.ndarray:
+        """Return a new (len(game_states), observation size) array of the flat observations of the given game states, each from the perspective of its current player."""
+        flat_observations = np.empty((len(game_states), self.flat_observation.size), dtype=np.float32)
+        for i, game_state in enumerate(game_states):
+            flat_observations[i] = self.encode_flat(game_state, game_state.current_player)
+
+        return flat_observations
+
+    def unflatten(self, flat_observations: np.ndarray) -> dict[str, np.ndarray]:
+        """Return the dict observation views into a batch of flat observation vectors (one per row). Reverse of encode_flat, without copying."""
+        territories_end = 3 + 2 * self.num_territories
+
+        return {
+            "current_phase": flat_observations[:, 0:3],
+            "territories": flat_observations[:, 3:territories_end].reshape(len(flat_observations), self.num_territories, 2),
+            "territory_card_count": flat_observations[:, territories_end:territories_end + 1],
+            "deployment_troops": flat_observations[:, territories_end + 1:territories_end + 2]
+        }
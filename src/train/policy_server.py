@@ -0,0 +1,280 @@
+import argparse
+import os
+import random
+import selectors
+import socket
+import struct
+import time
+
+import numpy as np
+
+from src.agents.agent import Agent
+
+from src.environment.actions import Action, ActionList
+from src.environment.game_state import GameState
+from src.environment.map import RiskMap
+
+from src.train.action_codec import ActionCodec
+from src.train.fast_policy import FastPolicy
+from src.train.model_paths import get_model_path
+from src.train.model_registry import model_registry
+from src.train.observation_encoder import ObservationEncoder
+
+# Wire format (little-endian), one frame per request/response:
+#   request  = [frame length (uint32)] [model key length (uint16)] [uniform sample (float64, NaN for the most likely action)] [model key] [flat observation (float32)] [action mask (uint8)]
+#   response = [action index (uint32)]
+REQUEST_HEADER = struct.Struct("<IHd")
+RESPONSE = struct.Struct("<I")
+
+def get_model_key(risk_map: RiskMap, num_players: int, model_name: str) -> str:
+    """Return the key a policy server knows a checkpoint by, i.e. its path within the models folder."""
+    return f"{risk_map.name}_map_{num_players}_player/{model_name}".lower()
+
+class PendingRequest:
+    __slots__ = ("connection", "model_key", "uniform_sample", "observation", "action_mask", "arrival_time")
+
+    def __init__(self, connection: socket.socket, model_key: str, uniform_sample: float, observation: np.ndarray, action_mask: np.ndarray, arrival_time: float):
+        self.connection = connection
+        self.model_key = model_key
+        self.uniform_sample = uniform_sample
+        self.observation = observation
+        self.action_mask = action_mask
+        self.arrival_time = arrival_time
+
+class PolicyServer:
+    """Serves the policies of one or more PPO checkpoints over a Unix domain socket, so that many simulation worker processes share a single loaded copy of each.
+    Requests from all connected clients are dynamically batched: a batch is evaluated as soon as it holds max_batch_size requests, every connected client is waiting on it, or its oldest request has waited max_latency seconds."""
+    def __init__(self, socket_path: str, max_batch_size: int = 256, max_latency: float = 0.002):
+        self.socket_path = socket_path
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+
+        self.risk_ppos = {} # key=model key, value=RiskPPO, loaded through the model registry so that clients importing this module never import torch
+        self.receive_buffers: dict[socket.socket, bytearray] = {}
+        self.pending_requests: list[PendingRequest] = []
+        self.selector: selectors.BaseSelector = None # set while serving
+        self.is_serving = False
+
+        # Throughput statistics
+        self.total_requests = 0
+        self.total_batches = 0
+
+    def load_model(self, risk_map: RiskMap, num_players: int, model_name: str = None) -> str:
+        """Load the given checkpoint (the most recent version if model_name is None) once, and return the key clients request it by."""
+        model_name = model_registry.get_model_name(risk_map, num_players, model_name)
+        model_key = get_model_key(risk_map, num_players, model_name)
+        if model_key not in self.risk_ppos:
+            self.risk_ppos[model_key] = model_registry.get_risk_ppo(risk_map, num_players, model_name)
+
+        return model_key
+
+    def serve_forever(self, poll_interval: float = 0.1):
+        """Accept and answer requests until shutdown is called (checked every poll_interval seconds while idle) or the process is terminated."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server_socket.bind(self.socket_path)
+        server_socket.listen()
+        server_socket.setblocking(False)
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(server_socket, selectors.EVENT_READ)
+        self.is_serving = True
+        try:
+            while self.is_serving:
+                timeout = poll_interval if not self.pending_requests else max(0.0, self.pending_requests[0].arrival_time + self.max_latency - time.perf_counter())
+                for key, _ in self.selector.select(timeout):
+                    if key.fileobj is server_socket:
+                        connection, _ = server_socket.accept()
+                        connection.setblocking(False)
+                        self.receive_buffers[connection] = bytearray()
+                        self.selector.register(connection, selectors.EVENT_READ)
+                    elif key.fileobj in self.receive_buffers and not self.receive(key.fileobj):
+                        self.disconnect(key.fileobj)
+
+                # Clients have one request in flight at a time, so once every connected client is waiting the batch cannot grow any further
+                if self.pending_requests and (len(self.pending_requests) >= min(self.max_batch_size, len(self.receive_buffers)) or time.perf_counter() - self.pending_requests[0].arrival_time >= self.max_latency):
+                    self.answer_pending_requests()
+        finally:
+            for connection in list(self.receive_buffers):
+                self.disconnect(connection)
+            self.selector.close()
+            self.selector = None
+            server_socket.close()
+            os.unlink(self.socket_path)
+
+    def shutdown(self):
+        """Stop serve_forever from another thread."""
+        self.is_serving = False
+
+    def disconnect(self, connection: socket.socket):
+        """Close the given client connection, and drop its buffered bytes and pending requests, so that the server keeps answering every other client."""
+        self.selector.unregister(connection)
+        del self.receive_buffers[connection]
+        self.pending_requests = [request for request in self.pending_requests if request.connection is not connection]
+        connection.close()
+
+    def receive(self, connection: socket.socket) -> bool:
+        """Read the available bytes of the given connection and queue every complete request. Return False if the client disconnected, or requested a model that is not loaded (so only its connection is closed)."""
+        try:
+            data = connection.recv(1 << 16)
+        except OSError: # e.g. ConnectionResetError, if the client process was killed
+            return False
+        if not data:
+            return False
+
+        receive_buffer = self.receive_buffers[connection]
+        receive_buffer.extend(data)
+        arrival_time = time.perf_counter()
+        while len(receive_buffer) >= 4:
+            frame_length = int.from_bytes(receive_buffer[:4], "little")
+            if len(receive_buffer) < frame_length:
+                break
+
+            _, model_key_length, uniform_sample = REQUEST_HEADER.unpack_from(receive_buffer)
+            model_key_end = REQUEST_HEADER.size + model_key_length
+            model_key = receive_buffer[REQUEST_HEADER.size:model_key_end].decode()
+            if model_key not in self.risk_ppos:
+                print(f"Closing a connection that requested the unknown model {model_key}")
+                return False
+            observation_size = self.risk_ppos[model_key].observation_encoder.flat_observation.size
+            observation = np.frombuffer(receive_buffer, dtype=np.float32, count=observation_size, offset=model_key_end).copy()
+            action_mask = np.frombuffer(receive_buffer, dtype=bool, count=frame_length - model_key_end - 4 * observation_size, offset=model_key_end + 4 * observation_size).copy()
+            self.pending_requests.append(PendingRequest(connection, model_key, None if np.isnan(uniform_sample) else uniform_sample, observation, action_mask, arrival_time))
+            del receive_buffer[:frame_length]
+
+        return True
+
+    def answer_pending_requests(self):
+        """Evaluate the (up to max_batch_size) oldest pending requests in one forward pass per model, and send every client its action."""
+        batch, self.pending_requests = self.pending_requests[:self.max_batch_size], self.pending_requests[self.max_batch_size:]
+        requests_by_model: dict[str, list[PendingRequest]] = {}
+        for request in batch:
+            requests_by_model.setdefault(request.model_key, []).append(request)
+
+        for model_key, requests in requests_by_model.items():
+            observations = self.risk_ppos[model_key].observation_encoder.unflatten(np.stack([request.observation for request in requests]))
+            action_probabilities = self.risk_ppos[model_key].evaluate_policy(observations, np.stack([request.action_mask for request in requests]))
+            self.total_requests += len(requests)
+            self.total_batches += 1
+            for request, request_action_probabilities in zip(requests, action_probabilities):
+                if request.connection not in self.receive_buffers:
+                    continue # disconnected while answering an earlier request of this batch
+
+                try:
+                    request.connection.sendall(RESPONSE.pack(FastPolicy.sample_action_index(request_action_probabilities, request.uniform_sample)))
+                except OSError: # e.g. BrokenPipeError, if the client closed before reading its response
+                    self.disconnect(request.connection)
+
+class PolicyClient:
+    """Blocking connection to a PolicyServer, with one request in flight at a time."""
+    def __init__(self, socket_path: str):
+        self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connection.connect(socket_path)
+
+    def request_action_index(self, model_key: str, observation: np.ndarray, action_mask: np.ndarray, uniform_sample: float = None) -> int:
+        """Return the index of the action the server's policy selects for the given flat observation and action mask (the most likely one if no uniform_sample is given)."""
+        encoded_model_key = model_key.encode()
+        payload = encoded_model_key + observation.astype(np.float32, copy=False).tobytes() + action_mask.astype(bool, copy=False).tobytes()
+        header = REQUEST_HEADER.pack(REQUEST_HEADER.size + len(payload), len(encoded_model_key), float("nan") if uniform_sample is None else uniform_sample)
+        self.connection.sendall(header + payload)
+
+        response = b""
+        while len(response) < RESPONSE.size:
+            chunk = self.connection.recv(RESPONSE.size - len(response))
+            assert chunk, "The policy server closed the connection (e.g. as the requested model is not loaded)"
+            response += chunk
+
+        return RESPONSE.unpack(response)[0]
+
+    def close(self):
+        self.connection.close()
+
+class RemoteRLAgent(Agent):
+    """Thin client of a PolicyServer, selecting the same actions as an RLAgent of the same checkpoint without loading the model (or a gym environment) itself.
+    Each process connects on its first request, so that forked or unpickled copies of the agent (e.g. in simulation workers) never share a connection."""
+    def __init__(self, risk_map: RiskMap, num_players: int, socket_path: str, model_name: str = None, deterministic: bool = False):
+        self.risk_map = risk_map
+        self.model_name = model_registry.get_model_name(risk_map, num_players, model_name)
+        self.model_key = get_model_key(risk_map, num_players, self.model_name)
+        self.model_path = f"{get_model_path(risk_map, num_players, self.model_name)}.zip" # checkpoint file the server loads the policy from
+        self.deterministic = deterministic
+
+        self.socket_path = socket_path
+        self.policy_client: PolicyClient = None
+        self.policy_client_pid: int = None # process that opened policy_client
+        self.observation_encoder = ObservationEncoder(len(risk_map.territories))
+        self.action_codec = ActionCodec(risk_map)
+
+    def select_action(self, valid_actions: ActionList, game_state: GameState, risk_map: RiskMap) -> Action:
+        assert risk_map.name == self.risk_map.name, "RemoteRLAgent is not compatible with the given map"
+
+        observation = self.observation_encoder.encode_flat(game_state, game_state.current_player)
+        action_mask = self.action_codec.get_action_masks([valid_actions])[0]
+        action_index = self.get_policy_client().request_action_index(self.model_key, observation, action_mask, None if self.deterministic else random.random())
+
+        return self.action_codec.decode(action_index)
+
+    def get_policy_client(self) -> PolicyClient:
+        """Return this process's connection to the policy server, connecting first if this process has not yet."""
+        if self.policy_client_pid != os.getpid():
+            self.policy_client = PolicyClient(self.socket_path) # an inherited connection is left open for the process that opened it
+            self.policy_client_pid = os.getpid()
+
+        return self.policy_client
+
+    def __getstate__(self) -> dict:
+        return self.__dict__ | {"policy_client": None, "policy_client_pid": None}
+
+    def get_name(self) -> str:
+        return f"RLAgent ({self.model_name})"
+
+    @classmethod
+    def get_colour(cls):
+        return "black"
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the policies of trained PPO agents to simulation worker processes over a Unix domain socket.")
+    parser.add_argument(
+        "--socket_path",
+        type=str,
+        default="/tmp/risk_policy_server.sock",
+        help="Path of the Unix domain socket to listen on. Defaults to /tmp/risk_policy_server.sock.",
+    )
+    parser.add_argument(
+        "--map_name",
+        type=str,
+        required=True,
+        help="Map name of the model to serve (e.g. mini, classic).",
+    )
+    parser.add_argument(
+        "--num_players",
+        type=int,
+        required=True,
+        help="Number of players the model was trained for.",
+    )
+    parser.add_argument(
+        "--model_name",
+        type=str,
+        help="Version of the model to serve. Defaults to the most recent version.",
+    )
+    parser.add_argument(
+        "--max_batch_size",
+        type=int,
+        default=256,
+        help="Maximum number of requests evaluated in one forward pass. Defaults to 256.",
+    )
+    parser.add_argument(
+        "--max_latency",
+        type=float,
+        default=0.002,
+        help="Maximum time (in seconds) a request waits for its batch to fill up. Defaults to 0.002.",
+    )
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    policy_server = PolicyServer(args.socket_path, args.max_batch_size, args.max_latency)
+    print(f"Serving {policy_server.load_model(RiskMap.from_json(f'maps/{args.map_name}.json'), args.num_players, args.model_name)} on {args.socket_path}")
+    policy_server.serve_forever()
@@ -1,33 +1,63 @@
-from typing import Self
+import multiprocessing
+import random
 
-from pathlib import Path
+import numpy as np
+import torch
+
+from typing import Callable, Self
 
 from sb3_contrib import MaskablePPO
 from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.save_util import load_from_zip_file
+from stable_baselines3.common.vec_env import SubprocVecEnv
 
 from src.environment.actions import Action, ActionList
 from src.environment.map import RiskMap
 from src.environment.game_state import GameState
 
+from src.train.action_codec import ActionCodec
+from src.train.fast_policy import FastPolicy
 from src.train.gym_environment import RiskGymEnvironment
+from src.train.model_paths import get_model_dir, get_model_name, get_model_path
+from src.train.observation_encoder import ObservationEncoder
 
 class RiskPPO:
     """Trains a PPO agent to play Risk on a given map and number of players."""
-    def __init__(self, risk_map: RiskMap, num_players: int, model_name: str = None):
+    def __init__(self, risk_map: RiskMap, num_players: int, model_name: str = None, num_envs: int = 1, seed: int = None, inference_only: bool = False):
+        assert num_envs >= 1, "At least one training environment is required"
+
         self.risk_map = risk_map
         self.num_players = num_players
+        self.num_envs = num_envs
+        self.seed = seed
 
         if model_name is None:
-            model_dir = Path(f"models/{self.risk_map.name}_map_{self.num_players}_player")
-            most_recent_version = 0 if not model_dir.exists() else len(list(model_dir.glob("*.zip")))
-            model_name = f"v{most_recent_version + 1}"
+            model_name = f"v{int(get_model_name(self.risk_map, self.num_players)[1:]) + 1}"
         self.model_name = model_name
 
+        # Observations and action masks for prediction are encoded with these rather than through a gym environment
+        self.observation_encoder = ObservationEncoder(len(self.risk_map.territories))
+        self.action_codec = ActionCodec(self.risk_map)
+
+        # An inference-only instance is just a holder for the policy set by load, so skip building the environments and an untrained MaskablePPO
+        if inference_only:
+            self.env, self.train_env, self.model, self.policy = None, None, None, None
+            return
+
         self.env = RiskGymEnvironment(
             risk_map=self.risk_map,
             num_players=self.num_players
         )
 
+        # Rollouts are collected from num_envs environments stepped in parallel worker processes, each with its own seed stream.
+        # Workers are forked where possible so they share the parent's already loaded (read-only) blitz probability matrix, rather than each reloading it.
+        if self.num_envs > 1:
+            base_seed = self.seed if self.seed is not None else random.randrange(2**31)
+            start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+            self.train_env = SubprocVecEnv([self.make_env(base_seed + rank) for rank in range(self.num_envs)], start_method=start_method)
+        else:
+            self.train_env = self.env
+
         self.hyperparameters = dict(
             policy="MultiInputPolicy",
             learning_rate=3e-4,
@@ -40,43 +70,80 @@ class RiskPPO:
         )
 
         self.model = MaskablePPO(
-            env=self.env,
-            tensorboard_log=f"models/{self.risk_map.name}_map_{self.num_players}_player/logs",
+            env=self.train_env,
+            seed=self.seed,
+            tensorboard_log=str(get_model_dir(self.risk_map, self.num_players) / "logs"),
             **self.hyperparameters,
         )
+        self.policy = self.model.policy
     
+    def make_env(self, seed: int) -> Callable[[], RiskGymEnvironment]:
+        """Return a factory for a training environment (run inside its worker process) whose game engine is seeded with the given seed."""
+        risk_map, num_players = self.risk_map, self.num_players
+
+        def init_env() -> RiskGymEnvironment:
+            random.seed(seed)
+            return RiskGymEnvironment(risk_map=risk_map, num_players=num_players)
+
+        return init_env
+
     def train(self, total_timesteps: int):
-        print(f"Training PPO agent on {self.risk_map.name} map with {self.num_players} players for {total_timesteps} timesteps...")
+        print(f"Training PPO agent on {self.risk_map.name} map with {self.num_players} players across {self.num_envs} environment(s) for {total_timesteps} timesteps...")
         self.model.learn(
             total_timesteps=total_timesteps,
             progress_bar=True,
             callback=RiskMetricsCallback(),
             tb_log_name=self.model_name,
         )
+
+    def close(self):
+        """Shut down the worker processes of the training environments, if any."""
+        if self.train_env is not self.env:
+            self.train_env.close()
     
-    def predict(self, valid_actions: ActionList, game_state: GameState) -> Action:
-        self.env.game_state = game_state
-        observation = self.env.encode_observation(inference=True)
-        action, _ = self.model.predict(observation=observation, action_masks=self.env.action_masks(valid_actions))
-        decoded_action = self.env.decode_action(action)
+    def predict(self, valid_actions: ActionList, game_state: GameState, deterministic: bool = False) -> Action:
+        return self.sample_action(self.get_action_probabilities([valid_actions], [game_state])[0], deterministic)
+
+    def get_action_probabilities(self, valid_action_lists: list[ActionList], game_states: list[GameState]) -> np.ndarray:
+        """Return the masked action probabilities of the policy for each of the given decisions (one row each), evaluated in a single batched forward pass."""
+        observations = self.observation_encoder.unflatten(self.observation_encoder.encode_flat_batch(game_states))
+
+        return self.evaluate_policy(observations, self.action_codec.get_action_masks(valid_action_lists))
 
-        return decoded_action
+    def evaluate_policy(self, observations: dict[str, np.ndarray], action_masks: np.ndarray) -> np.ndarray:
+        """Return the masked action probabilities of the policy for a batch of encoded observations (one row each) and their action masks, in a single forward pass."""
+        self.policy.set_training_mode(False)
+        observation_tensor, _ = self.policy.obs_to_tensor(observations)
+        with torch.no_grad():
+            action_probabilities = self.policy.get_distribution(observation_tensor, action_masks).distribution.probs
+
+        return action_probabilities.cpu().numpy()
+
+    def sample_action(self, action_probabilities: np.ndarray, deterministic: bool = False) -> Action:
+        """Return the most likely action if deterministic, otherwise sample one from the given action probabilities.
+        Samples are drawn from the global random module (rather than torch), so they follow the seeded stream of the game they are made in."""
+        return self.action_codec.decode(FastPolicy.sample_action_index(action_probabilities, None if deterministic else random.random()))
 
     def save(self):
-        filename = f"models/{self.risk_map.name}_map_{self.num_players}_player/{self.model_name}".lower()
+        filename = get_model_path(self.risk_map, self.num_players, self.model_name)
         self.model.save(filename)
-        print(f"Saved PPO model to {filename}")
+        FastPolicy.export(filename)
+        print(f"Saved PPO model (and its fast policy export) to {filename}")
     
     @classmethod
-    def load(cls, risk_map: RiskMap, num_players: int, model_name: str = None) -> Self:
-        if model_name is None:
-            model_dir = Path(f"models/{risk_map.name}_map_{num_players}_player")
-            most_recent_version = len(list(model_dir.glob("*.zip")))
-            model_name = f"v{most_recent_version}"
+    def load(cls, risk_map: RiskMap, num_players: int, model_name: str = None, inference_only: bool = False) -> Self:
+        """Load a saved model. If inference_only, only the policy weights are deserialised, for prediction:
+        no gym environment, untrained MaskablePPO or log directory is created, and the loaded instance cannot be trained further."""
+        risk_ppo = cls(risk_map, num_players, get_model_name(risk_map, num_players, model_name), inference_only=inference_only)
+        path = get_model_path(risk_map, num_players, risk_ppo.model_name)
 
-        risk_ppo = cls(risk_map, num_players, model_name)
-        path = f"models/{risk_map.name}_map_{num_players}_player/{risk_ppo.model_name}".lower()
-        risk_ppo.model = MaskablePPO.load(path, env=risk_ppo.env)
+        if inference_only:
+            data, parameters, _ = load_from_zip_file(path, device="cpu")
+            risk_ppo.policy = data["policy_class"](data["observation_space"], data["action_space"], lambda _: 0.0, **data["policy_kwargs"]) # the learning rate schedule is only used by the optimiser
+            risk_ppo.policy.load_state_dict(parameters["policy"])
+        else:
+            risk_ppo.model = MaskablePPO.load(path, env=risk_ppo.env)
+            risk_ppo.policy = risk_ppo.model.policy
 
         return risk_ppo
 
@@ -85,13 +152,15 @@ class RiskMetricsCallback(BaseCallback):
         super().__init__()
         self.total_episodes = 0
         self.total_wins = 0
+        self.total_episode_length = 0
 
     def _on_step(self):
-        infos = self.locals["infos"]
+        infos = self.locals["infos"] # one info per training environment
         for info in infos:
             if "win" in info:
                 self.total_episodes += 1
                 self.total_wins += 1 if info["win"] else 0
+                self.total_episode_length += info["episode_length"]
                 self.logger.record("win_rate", self.total_wins / self.total_episodes)
-                self.logger.record("average_episode_length", self.num_timesteps /self.total_episodes)
+                self.logger.record("average_episode_length", self.total_episode_length / self.total_episodes)
         return True
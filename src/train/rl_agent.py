@@ -1,3 +1,7 @@
+import random
+
+import numpy as np
+
 from src.agents.agent import Agent
 
 from src.environment.actions import Action, ActionList
@@ -5,19 +9,47 @@ from src.environment.map import RiskMap
 
 from src.environment.game_state import GameState
 
-from src.train.ppo import RiskPPO
+from src.train.action_codec import ActionCodec
+from src.train.fast_policy import FastPolicy
+from src.train.model_paths import get_model_path
+from src.train.model_registry import model_registry
+from src.train.observation_encoder import ObservationEncoder
 
 class RLAgent(Agent):
-    def __init__(self, risk_map: RiskMap, num_players: int, model_name: str = None):
-        self.risk_ppo = RiskPPO.load(risk_map, num_players, model_name)
+    """Plays the policy of a trained PPO model. If inference_only, the NumPy export of the model (see FastPolicy) is used instead, so that neither torch nor SB3 are ever imported."""
+    batched_inference = True
+
+    def __init__(self, risk_map: RiskMap, num_players: int, model_name: str = None, deterministic: bool = False, inference_only: bool = False):
+        self.risk_map = risk_map
+        self.model_name = model_registry.get_model_name(risk_map, num_players, model_name)
+        self.deterministic = deterministic
+        self.inference_only = inference_only
+        self.model_path = f"{get_model_path(risk_map, num_players, self.model_name)}.{'npz' if inference_only else 'zip'}" # checkpoint file the policy is loaded from
+        self.action_codec = ActionCodec(risk_map)
+
+        # Policies are shared between every agent playing the same checkpoint
+        if self.inference_only:
+            self.fast_policy = model_registry.get_fast_policy(risk_map, num_players, self.model_name)
+            self.observation_encoder = ObservationEncoder(len(risk_map.territories))
+        else:
+            self.risk_ppo = model_registry.get_risk_ppo(risk_map, num_players, self.model_name)
 
     def select_action(self, valid_actions: ActionList, game_state: GameState, risk_map: RiskMap) -> Action:
-        assert risk_map.name == self.risk_ppo.risk_map.name, "RLAgent is not compatible with the given map"
-        
-        return self.risk_ppo.predict(valid_actions, game_state)
+        return self.select_action_from_probabilities(self.get_action_probabilities([valid_actions], [game_state], risk_map)[0])
+
+    def get_action_probabilities(self, valid_action_lists: list[ActionList], game_states: list[GameState], risk_map: RiskMap) -> np.ndarray:
+        assert risk_map.name == self.risk_map.name, "RLAgent is not compatible with the given map"
+
+        if not self.inference_only:
+            return self.risk_ppo.get_action_probabilities(valid_action_lists, game_states)
+
+        return self.fast_policy.get_action_probabilities(self.observation_encoder.encode_flat_batch(game_states), self.action_codec.get_action_masks(valid_action_lists))
+
+    def select_action_from_probabilities(self, action_probabilities: np.ndarray) -> Action:
+        return self.action_codec.decode(FastPolicy.sample_action_index(action_probabilities, None if self.deterministic else random.random()))
     
     def get_name(self) -> str:
-        return f"RLAgent ({self.risk_ppo.model_name})"
+        return f"RLAgent ({self.model_name})"
     
     @classmethod
     def get_colour(cls):
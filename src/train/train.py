@@ -6,16 +6,17 @@ from src.train.ppo import RiskPPO
 
 from src.utils.k_clique_generator import KCliqueGenerator
 
-def train(map_name: str, num_players: int, total_timesteps: int, clique_size: int, clique_density: str):
+def train(map_name: str, num_players: int, total_timesteps: int, clique_size: int, clique_density: str, num_envs: int = 1, seed: int = None):
     if map_name.startswith("clique"):
         density = 2/clique_size if clique_density.lower() == "min" else 1.0
         risk_map = RiskMap.from_json(json_data=KCliqueGenerator.generate(k=clique_size, density=density))
     else:
         risk_map = RiskMap.from_json(f"maps/{map_name}.json")
 
-    ppo_trainer = RiskPPO(risk_map=risk_map, num_players=num_players)
+    ppo_trainer = RiskPPO(risk_map=risk_map, num_players=num_players, num_envs=num_envs, seed=seed)
     ppo_trainer.train(total_timesteps=total_timesteps)
     ppo_trainer.save()
+    ppo_trainer.close()
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Train a PPO agent for the Risk environment.")
@@ -47,8 +48,19 @@ def parse_args() -> argparse.Namespace:
         type=str,
         help="Density of the clique to generate if map_name starts with 'clique'. Must be either max or min to ensure deterministic generation.",
     )
+    parser.add_argument(
+        "--num_envs",
+        type=int,
+        default=1,
+        help="Number of environments to collect rollouts from in parallel, each in its own worker process. Defaults to 1 (no worker processes).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Base seed for training. Each environment worker is seeded with seed + its rank. Defaults to a random seed.",
+    )
     return parser.parse_args()
 
 if __name__ == "__main__":
     args = parse_args()
-    train(args.map_name, args.num_players, args.total_timesteps, args.clique_size, args.clique_density)
+    train(args.map_name, args.num_players, args.total_timesteps, args.clique_size, args.clique_density, args.num_envs, args.seed)
@@ -1,6 +1,8 @@
 import csv
 import random
 
+import numpy as np
+
 class BlitzBattleSimulator:
     def __init__(self, dimension: int = 100):
         # key = (attacker_troops, defender_troops), value = {key = (remaining_attacker_troops, remaining_defender_troops), value = probability}
@@ -9,6 +11,13 @@ class BlitzBattleSimulator:
         # key = (attacker_troops, defender_troops), value = win probability for attacker
         self.blitz_win_probabilities: dict[tuple[int, int], float] = {} 
 
+        # key = (attacker_troops, defender_troops), value = expected remaining attacker troops given that the attacker wins, memoised on first use
+        self.blitz_expected_survivors: dict[tuple[int, int], float] = {}
+
+        # (dimension + 1) x (dimension + 1) arrays indexed by [attacker_troops, defender_troops], built on first use for vectorised lookups
+        self.win_probability_table: np.ndarray = None
+        self.expected_survivors_table: np.ndarray = None
+
         with open(f"blitz_probability_matrices/{dimension}_d_blitz_probability_matrix.csv", "r") as file:
             reader = csv.reader(file)
             headers = next(reader)
@@ -63,6 +72,44 @@ class BlitzBattleSimulator:
             
             return self.blitz_win_probabilities[(A, D)]
 
+    def get_expected_survivors(self, attacker_troops: int, defender_troops: int) -> float:
+        """Return the expected number of remaining attacker troops, given that the attacker wins the battle."""
+        if attacker_troops <= self.dimension and defender_troops <= self.dimension:
+            return self.get_interpolated_expected_survivors(attacker_troops, defender_troops)
+        else:
+            scale = max(attacker_troops, defender_troops) / self.dimension
+            A, D = max(1, round(attacker_troops / scale)), max(1, round(defender_troops / scale))
+            if A == 1:
+                A, D = 2, min(2 * D, self.dimension)
+
+            return self.get_interpolated_expected_survivors(A, D) * scale
+
+    def get_interpolated_expected_survivors(self, A: int, D: int) -> float:
+        if (A, D) not in self.blitz_expected_survivors:
+            win_outcomes = [(remaining_attacker_troops, probability) for (remaining_attacker_troops, remaining_defender_troops), probability in self.blitz_probability_matrix.get((A, D), {}).items() if remaining_defender_troops == 0]
+            win_probability = sum(probability for _, probability in win_outcomes)
+            self.blitz_expected_survivors[(A, D)] = sum(remaining_attacker_troops * probability for remaining_attacker_troops, probability in win_outcomes) / win_probability if win_probability > 0 else 1.0
+
+        return self.blitz_expected_survivors[(A, D)]
+
+    def get_win_probability_table(self) -> np.ndarray:
+        """Return the attacker win probabilities as a (dimension + 1) x (dimension + 1) array indexed by [attacker_troops, defender_troops], with 0 for battles that cannot take place."""
+        if self.win_probability_table is None:
+            self.win_probability_table = np.zeros((self.dimension + 1, self.dimension + 1))
+            for (A, D), win_probability in self.blitz_win_probabilities.items():
+                self.win_probability_table[A, D] = win_probability
+
+        return self.win_probability_table
+
+    def get_expected_survivors_table(self) -> np.ndarray:
+        """Return the expected survivors as a (dimension + 1) x (dimension + 1) array indexed by [attacker_troops, defender_troops], with 1 for battles that cannot take place."""
+        if self.expected_survivors_table is None:
+            self.expected_survivors_table = np.ones((self.dimension + 1, self.dimension + 1))
+            for A, D in self.blitz_probability_matrix.keys():
+                self.expected_survivors_table[A, D] = self.get_interpolated_expected_survivors(A, D)
+
+        return self.expected_survivors_table
+
     def __str__(self):
         lines = []
         lines.append(f"{self.dimension} X {self.dimension} BlitzProbabilityMatrix:")
@@ -0,0 +1,91 @@
+import math
+
+from statistics import NormalDist
+
+class ConfidenceInterval:
+    """Two-sided interval estimates of the proportions and means measured by simulations, computed with the standard library alone."""
+    @classmethod
+    def get_z_score(cls, confidence: float) -> float:
+        return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    @classmethod
+    def wilson(cls, successes: int, trials: int, confidence: float = 0.95) -> tuple[float, float]:
+        """Return the Wilson score interval of a binomial proportion, or (0, 1) if there are no trials."""
+        if trials == 0:
+            return 0.0, 1.0
+
+        z = cls.get_z_score(confidence)
+        proportion = successes / trials
+        denominator = 1 + z * z / trials
+        centre = (proportion + z * z / (2 * trials)) / denominator
+        half_width = z * math.sqrt(proportion * (1 - proportion) / trials + z * z / (4 * trials * trials)) / denominator
+
+        return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+    @classmethod
+    def bayesian(cls, successes: int, trials: int, confidence: float = 0.95) -> tuple[float, float]:
+        """Return the equal-tailed credible interval of a binomial proportion under a Jeffreys Beta(1/2, 1/2) prior, i.e. the Jeffreys interval."""
+        a, b = successes + 0.5, trials - successes + 0.5
+        tail = (1 - confidence) / 2
+
+        return (0.0 if successes == 0 else cls.get_beta_quantile(tail, a, b)), (1.0 if successes == trials else cls.get_beta_quantile(1 - tail, a, b))
+
+    @classmethod
+    def mean(cls, count: int, total: float, total_squares: float, confidence: float = 0.95) -> tuple[float, float]:
+        """Return the normal approximation interval of a mean from the count, sum and sum of squares of its samples, or an unbounded one for fewer than two samples."""
+        if count < 2:
+            return -math.inf, math.inf
+
+        mean = total / count
+        variance = max(0.0, (total_squares - count * mean * mean) / (count - 1)) # sample variance, clamped against rounding below zero
+        half_width = cls.get_z_score(confidence) * math.sqrt(variance / count)
+
+        return mean - half_width, mean + half_width
+
+    @classmethod
+    def get_beta_quantile(cls, quantile: float, a: float, b: float) -> float:
+        """Return the given quantile of a Beta(a, b) distribution, by bisection on its CDF."""
+        lower, upper = 0.0, 1.0
+        for _ in range(60): # well below float precision on [0, 1]
+            middle = (lower + upper) / 2
+            if cls.get_beta_cdf(middle, a, b) < quantile:
+                lower = middle
+            else:
+                upper = middle
+
+        return (lower + upper) / 2
+
+    @classmethod
+    def get_beta_cdf(cls, x: float, a: float, b: float) -> float:
+        """Return the CDF of a Beta(a, b) distribution at x, i.e. the regularised incomplete beta function."""
+        if x <= 0.0:
+            return 0.0
+        if x >= 1.0:
+            return 1.0
+
+        front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x))
+        if x < (a + 1) / (a + b + 2): # the continued fraction converges quickly on this side, so use the symmetry I_x(a, b) = 1 - I_(1-x)(b, a) on the other
+            return front * cls.get_beta_continued_fraction(x, a, b) / a
+
+        return 1.0 - front * cls.get_beta_continued_fraction(1.0 - x, b, a) / b
+
+    @classmethod
+    def get_beta_continued_fraction(cls, x: float, a: float, b: float) -> float:
+        """Evaluate the continued fraction of the incomplete beta function with the modified Lentz method."""
+        tiny = 1e-300
+        c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        fraction = d
+
+        for m in range(1, 1000):
+            for numerator in [m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)), -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))]:
+                d = 1.0 + numerator * d
+                d = 1.0 / (d if abs(d) > tiny else tiny)
+                c = 1.0 + numerator / c
+                c = c if abs(c) > tiny else tiny
+                fraction *= c * d
+
+            if abs(c * d - 1.0) < 1e-14:
+                break
+
+        return fraction
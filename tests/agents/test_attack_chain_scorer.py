@@ -0,0 +1,63 @@
+import unittest
+
+from src.agents.attack_chain_scorer import AttackChainScorer
+
+from src.environment.actions import battle_simulator
+from src.environment.game_state import GameState, GamePhase
+from src.environment.map import RiskMap
+
+class TestAttackChainScorer(unittest.TestCase):
+    def setUp(self):
+        self.classic_map = RiskMap.from_json("maps/classic.json")
+        self.game_state = GameState(2, len(self.classic_map.territories), True)
+        self.game_state.current_phase = GamePhase.ATTACK
+        self.game_state.deployment_troops = 0
+        self.game_state.territory_owners = [1] * len(self.game_state.territory_owners)
+        self.game_state.territory_troops = [1] * len(self.game_state.territory_troops)
+
+    def test_single_battle_chain_value_is_win_probability(self):
+        self.game_state.territory_owners[23], self.game_state.territory_troops[23] = 0, 5 # Madagascar, whose borders East Africa and South Africa
+        self.game_state.territory_troops[21], self.game_state.territory_troops[25] = 3, 4
+
+        best_chain = AttackChainScorer.get_best_chain(self.game_state, self.classic_map, min_win_probability=0.0, max_chain_length=1)
+        self.assertEqual(best_chain[:2], (23, 21))
+        self.assertAlmostEqual(best_chain[2], battle_simulator.get_win_probability(5, 3))
+
+    def test_longer_chains_add_expected_captures(self):
+        self.game_state.territory_owners[23], self.game_state.territory_troops[23] = 0, 30
+
+        single_battle_chain = AttackChainScorer.get_best_chain(self.game_state, self.classic_map, min_win_probability=0.5, max_chain_length=1)
+        long_chain = AttackChainScorer.get_best_chain(self.game_state, self.classic_map, min_win_probability=0.5, max_chain_length=3)
+
+        self.assertLess(single_battle_chain[2], long_chain[2])
+        self.assertLessEqual(long_chain[2], 3.0)
+
+    def test_no_chain_below_min_win_probability(self):
+        self.game_state.territory_owners[23], self.game_state.territory_troops[23] = 0, 2
+        self.game_state.territory_troops[21], self.game_state.territory_troops[25] = 10, 10
+
+        self.assertIsNone(AttackChainScorer.get_best_chain(self.game_state, self.classic_map, min_win_probability=0.5, max_chain_length=3))
+        self.assertIsNotNone(AttackChainScorer.get_best_chain(self.game_state, self.classic_map, min_win_probability=0.5, max_chain_length=3, extra_troops=20))
+
+    def test_continent_completing_territory_is_preferred(self):
+        for territory_id in range(9, 12): # Player 0 owns all of South America but Venezuela
+            self.game_state.territory_owners[territory_id], self.game_state.territory_troops[territory_id] = 0, 10
+        self.game_state.territory_troops[12] = 3
+
+        territory_values = AttackChainScorer.get_territory_values(self.game_state, self.classic_map)
+        self.assertEqual(territory_values[12], 1 + self.classic_map.continents[self.classic_map.territories[12].continent.id].bonus)
+        self.assertEqual(AttackChainScorer.get_best_chain(self.game_state, self.classic_map, min_win_probability=0.5, max_chain_length=1)[1], 12)
+
+    def test_expected_survivors(self):
+        self.assertEqual(battle_simulator.get_expected_survivors(2, 1), 2.0)
+        self.assertGreater(battle_simulator.get_expected_survivors(20, 1), battle_simulator.get_expected_survivors(20, 10))
+        self.assertAlmostEqual(battle_simulator.get_expected_survivors_table()[20, 10], battle_simulator.get_expected_survivors(20, 10))
+        self.assertAlmostEqual(battle_simulator.get_win_probability_table()[20, 10], battle_simulator.get_win_probability(20, 10))
+        self.assertEqual(battle_simulator.get_win_probability_table()[1, 10], 0.0)
+
+        # Battles beyond the matrix dimension are scaled down and back up
+        dimension = battle_simulator.dimension
+        self.assertAlmostEqual(battle_simulator.get_expected_survivors(2 * dimension, dimension), 2 * battle_simulator.get_expected_survivors(dimension, dimension // 2))
+
+if __name__ == "__main__":
+    unittest.main()
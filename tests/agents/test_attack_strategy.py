@@ -1,6 +1,6 @@
 import unittest
 
-from src.agents.attack_strategy import WeightedRandomAttackStrategy, SafeAttackStrategy, TransferMethod
+from src.agents.attack_strategy import WeightedRandomAttackStrategy, SafeAttackStrategy, ExpectimaxAttackStrategy, TransferMethod
 
 from src.environment.actions import BattleFromAction, BattleToAction, TransferAction, SkipAction
 from src.environment.environment import RiskEnvironment
@@ -100,6 +100,26 @@ class TestSafeAttackStrategy(TestAttackStrategy):
         self.assertEqual(selected_action, TransferAction(TransferMethod.SPLIT))
         self.environment.step(selected_action)
 
+class TestExpectimaxAttackStrategy(TestAttackStrategy):
+    def setUp(self):
+        super().setUp()
+
+        self.attack_strategy = ExpectimaxAttackStrategy(min_win_probability=0.6, max_chain_length=3)
+
+    def test_select_action_returns_first_battle_of_best_chain(self):
+        selected_action = self.attack_strategy.compute_best_battle(self.action_list, self.game_state, self.classic_map)
+
+        self.assertEqual(selected_action, (BattleFromAction(25), BattleToAction(21)))
+
+    def test_select_action_returns_skip_when_win_probability_not_met(self):
+        self.attack_strategy = ExpectimaxAttackStrategy(min_win_probability=0.99, max_chain_length=3)
+        selected_action = self.attack_strategy.select_action(self.action_list, self.game_state, self.classic_map)
+
+        self.assertEqual(selected_action, SkipAction())
+
+    def test_transfers_all_troops_to_continue_chain(self):
+        self.assertEqual(self.attack_strategy.transfer_method, TransferMethod.ALL)
+
 class TestTransferMethod(TestAttackStrategy):
     def setUp(self):
         super().setUp()
@@ -0,0 +1,92 @@
+import random
+import unittest
+
+import numpy as np
+
+from src.agents.candidate_scorer import CandidateScorer
+
+from src.environment.actions import BattleFromAction, BattleToAction, FortifyFromAction, FortifyToAction
+from src.environment.game_state import GameState, GamePhase
+from src.environment.map import RiskMap
+
+from src.utils.k_clique_generator import KCliqueGenerator
+
+class TestCandidateScorer(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.risk_maps = [
+            RiskMap.from_json("maps/classic.json"),
+            RiskMap.from_json(json_data=KCliqueGenerator.generate(k=30, density=0.2)),
+            RiskMap.from_json(json_data=KCliqueGenerator.generate(k=30, density=1.0))
+        ]
+
+    def get_random_game_states(self, risk_map: RiskMap, phase: GamePhase, num_states: int = 200) -> list[GameState]:
+        game_states = []
+        for _ in range(num_states):
+            game_state = GameState(random.randint(2, 6), len(risk_map.territories), True)
+            game_state.current_phase = phase
+            game_state.current_player = random.randrange(len(game_state.active_players))
+            game_state.deployment_troops = 0
+            game_state.territory_troops = [random.randint(1, 6) for _ in game_state.territory_troops] # small troop range to force plenty of ties
+            game_states.append(game_state)
+
+        return game_states
+
+    def get_reference_best_battle(self, game_state: GameState, risk_map: RiskMap) -> tuple[int, int, int]:
+        """Original per-attacker implementation of SafeAttackStrategy, used as the ground truth."""
+        best_battle = None
+        for battle_from_action in BattleFromAction.get_action_list(game_state, risk_map):
+            forwarded_game_state = battle_from_action.apply(game_state, risk_map)
+            least_defended_territory = min(BattleToAction.get_action_list(forwarded_game_state, risk_map), key=lambda to_action: game_state.territory_troops[to_action.defender_territory_id])
+            disparity = game_state.territory_troops[battle_from_action.attacker_territory_id] - game_state.territory_troops[least_defended_territory.defender_territory_id]
+            if not best_battle or disparity > best_battle[2]:
+                best_battle = (battle_from_action.attacker_territory_id, least_defended_territory.defender_territory_id, disparity)
+
+        return best_battle
+
+    def get_reference_best_fortify(self, game_state: GameState, risk_map: RiskMap) -> tuple[int, int, int]:
+        """Original per-source DFS implementation of MinimumFortifyStrategy, used as the ground truth."""
+        best_fortify = None
+        for fortify_from_action in FortifyFromAction.get_action_list(game_state, risk_map):
+            forwarded_game_state = fortify_from_action.apply(game_state, risk_map)
+            least_fortified_territory = min(FortifyToAction.get_action_list(forwarded_game_state, risk_map), key=lambda to_action: game_state.territory_troops[to_action.to_territory_id])
+            disparity = game_state.territory_troops[fortify_from_action.from_territory_id] - game_state.territory_troops[least_fortified_territory.to_territory_id]
+            if not best_fortify or disparity > best_fortify[2]:
+                best_fortify = (fortify_from_action.from_territory_id, least_fortified_territory.to_territory_id, disparity)
+
+        return best_fortify
+
+    def test_best_battle_matches_reference(self):
+        for risk_map in self.risk_maps:
+            for game_state in self.get_random_game_states(risk_map, GamePhase.ATTACK):
+                self.assertEqual(CandidateScorer.get_best_battle(game_state, risk_map), self.get_reference_best_battle(game_state, risk_map))
+
+    def test_best_fortify_matches_reference(self):
+        for risk_map in self.risk_maps:
+            for game_state in self.get_random_game_states(risk_map, GamePhase.FORTIFY):
+                self.assertEqual(CandidateScorer.get_best_fortify(game_state, risk_map), self.get_reference_best_fortify(game_state, risk_map))
+
+    def test_no_candidates(self):
+        risk_map = self.risk_maps[0]
+        game_state = GameState(2, len(risk_map.territories), True)
+        game_state.territory_troops = [1] * len(game_state.territory_troops)
+
+        self.assertIsNone(CandidateScorer.get_best_battle(game_state, risk_map))
+        self.assertIsNone(CandidateScorer.get_best_fortify(game_state, risk_map))
+
+    def test_friendly_component_labels(self):
+        risk_map = self.risk_maps[0]
+        game_state = GameState(2, len(risk_map.territories), True)
+        game_state.territory_owners = [1] * len(game_state.territory_owners)
+        game_state.territory_owners[20], game_state.territory_owners[21], game_state.territory_owners[25] = 0, 0, 0 # Congo, East Africa, South Africa
+        game_state.territory_owners[0] = 0 # Alaska
+
+        owned = np.array(game_state.territory_owners) == 0
+        component_labels = CandidateScorer.get_friendly_component_labels(owned, risk_map)
+
+        self.assertEqual(component_labels[0], 0)
+        self.assertEqual([component_labels[20], component_labels[21], component_labels[25]], [20, 20, 20])
+        self.assertEqual(component_labels[1], -1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,9 @@
+import random
 import unittest
 
-from src.agents.draft_strategy import RandomDraftStrategy, MinimumDraftStrategy, MaximumDraftStrategy, ContinentalDraftStrategy
+from src.agents.draft_strategy import RandomDraftStrategy, MinimumDraftStrategy, MaximumDraftStrategy, ExpectimaxDraftStrategy, ContinentalDraftStrategy
 
-from src.environment.actions import DeployAction
+from src.environment.actions import ActionList, DeployAction
 from src.environment.environment import RiskEnvironment
 from src.environment.map import RiskMap
 
@@ -38,6 +39,18 @@ class TestDraftStrategy(unittest.TestCase):
         self.deployment_troops = 1
         self.action_list = self.environment.get_action_list()
 
+    def get_deploy_sequence(self, draft_strategy, select_action) -> list[DeployAction]:
+        """Play out a full 25 troop draft phase from the baseline scenario, returning the sequence of selected deploy actions."""
+        game_state = self.game_state.copy()
+        game_state.deployment_troops = 25
+        deploy_sequence = []
+        while game_state.deployment_troops > 0:
+            deploy_action = select_action(draft_strategy, ActionList.get_action_list(game_state, self.classic_map), game_state)
+            deploy_sequence.append(deploy_action)
+            game_state = deploy_action.apply(game_state, self.classic_map)
+
+        return deploy_sequence
+
 class TestRandomDraftStrategy(TestDraftStrategy):
     def setUp(self):
         super().setUp()
@@ -58,6 +71,13 @@ class TestMinimumDraftStrategy(TestDraftStrategy):
 
         self.assertEqual(selected_action, DeployAction(35))
 
+    def test_planned_deploy_sequence_matches_per_troop_selection(self):
+        def select_minimum_per_troop(_, action_list, game_state):
+            return min(action_list.deploy_actions, key=lambda action: game_state.territory_troops[action.territory_id])
+
+        planned_sequence = self.get_deploy_sequence(self.draft_strategy, lambda draft_strategy, action_list, game_state: draft_strategy.select_action(action_list, game_state, self.classic_map))
+        self.assertEqual(planned_sequence, self.get_deploy_sequence(self.draft_strategy, select_minimum_per_troop))
+
 class TestMaximumDraftStrategy(TestDraftStrategy):
     def setUp(self):
         super().setUp()
@@ -71,6 +91,38 @@ class TestMaximumDraftStrategy(TestDraftStrategy):
 
         self.assertEqual(expected_actions, selected_actions)
 
+    def test_planned_deploy_sequence_matches_per_troop_selection(self):
+        def select_capital_per_troop(draft_strategy, _, game_state):
+            return DeployAction(random.choice(draft_strategy.get_capital_territory_ids(game_state)))
+
+        for capitals in range(1, 6):
+            draft_strategy = MaximumDraftStrategy(capitals=capitals)
+            for seed in range(10):
+                random.seed(seed)
+                planned_sequence = self.get_deploy_sequence(draft_strategy, lambda draft_strategy, action_list, game_state: draft_strategy.select_action(action_list, game_state, self.classic_map))
+                random.seed(seed)
+                self.assertEqual(planned_sequence, self.get_deploy_sequence(draft_strategy, select_capital_per_troop))
+
+class TestExpectimaxDraftStrategy(TestDraftStrategy):
+    def setUp(self):
+        super().setUp()
+        self.draft_strategy = ExpectimaxDraftStrategy(min_win_probability=0.6, max_chain_length=3)
+
+    def select_action(self, draft_strategy, action_list, game_state):
+        return draft_strategy.select_action(action_list, game_state, self.classic_map)
+
+    def test_deploys_every_troop_to_start_of_best_chain(self):
+        self.game_state.territory_troops[34] = 5 # Siam, the last Asian territory player 0 is missing
+        deployed_territory_ids = {deploy_action.territory_id for deploy_action in self.get_deploy_sequence(self.draft_strategy, self.select_action)}
+
+        self.assertEqual(len(deployed_territory_ids), 1)
+        self.assertIn(deployed_territory_ids.pop(), [27, 28]) # China or India, which border Siam
+
+    def test_falls_back_to_minimum_draft_when_no_chain_is_worth_attacking(self):
+        self.draft_strategy = ExpectimaxDraftStrategy(min_win_probability=1.01, max_chain_length=3)
+
+        self.assertEqual(self.get_deploy_sequence(self.draft_strategy, self.select_action), self.get_deploy_sequence(MinimumDraftStrategy(), self.select_action))
+
 class TestContinentalDraftStrategy(TestDraftStrategy):
     def setUp(self):
         super().setUp()
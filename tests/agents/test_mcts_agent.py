@@ -0,0 +1,113 @@
+import math
+import random
+import unittest
+
+from src.agents.agent import Agent, CommunistAgent
+from src.agents.mcts_agent import MCTSAgent, DecisionNode, ChanceNode, RolloutAgent, evaluate_game_state
+
+from src.environment.actions import TransferMethod, ActionList
+from src.environment.environment import RiskEnvironment
+from src.environment.game_state import GameState, GamePhase
+from src.environment.map import RiskMap
+
+class TestMCTSAgent(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.mini_map = RiskMap.from_json("maps/mini.json")
+        self.classic_map = RiskMap.from_json("maps/classic.json")
+
+    def get_attack_state(self) -> GameState:
+        game_state = GameState(2, len(self.classic_map.territories), True)
+        game_state.current_phase = GamePhase.ATTACK
+        game_state.deployment_troops = 0
+        game_state.territory_owners[0], game_state.territory_troops[0] = 0, 20 # Alaska
+        game_state.territory_owners[5], game_state.territory_troops[5] = 1, 5 # Kamchatka
+
+        return game_state
+
+    def test_full_game_only_selects_valid_actions(self):
+        agents = [MCTSAgent(iterations=10), CommunistAgent()]
+        environment = RiskEnvironment(self.mini_map, len(agents))
+
+        is_terminal_state, episode_length = False, 0
+        while not is_terminal_state and episode_length < 5000:
+            game_state = environment.current_state
+            action = agents[game_state.current_player].select_action(environment.get_action_list(), game_state, self.mini_map)
+            _, is_terminal_state = environment.step(action) # step validates the selected action
+            episode_length += 1
+
+        self.assertTrue(is_terminal_state)
+        self.assertGreater(agents[0].total_playouts, 0)
+        self.assertGreater(agents[0].get_playouts_per_second(), 0)
+
+    def test_search_does_not_mutate_game_state(self):
+        game_state = self.get_attack_state()
+        game_state_before_search = str(game_state)
+
+        action = MCTSAgent(iterations=50).select_action(ActionList.get_action_list(game_state, self.classic_map), game_state, self.classic_map)
+
+        self.assertEqual(str(game_state), game_state_before_search)
+        action.validate_action(game_state, self.classic_map)
+
+    def test_search_excludes_random_transfer_methods(self):
+        game_state = self.get_attack_state()
+        game_state.current_battle = (0, 5)
+        game_state.territory_owners[5], game_state.territory_troops[5] = 0, 0
+
+        search_actions = MCTSAgent.get_search_actions(ActionList.get_action_list(game_state, self.classic_map))
+        self.assertEqual([action.transfer_method for action in search_actions], [TransferMethod.ONE, TransferMethod.SPLIT, TransferMethod.ALL])
+
+    def test_progressive_widening_limits_battle_outcomes(self):
+        game_state = self.get_attack_state()
+        game_state.current_battle = (0, -1)
+        mcts_agent = MCTSAgent(iterations=200, widening_constant=1.0, widening_exponent=0.5)
+        root = DecisionNode(game_state, self.classic_map, 0)
+        for _ in range(200):
+            mcts_agent.run_iteration(root, self.classic_map)
+
+        chance_nodes = [child for child in root.children if isinstance(child, ChanceNode)]
+        self.assertTrue(chance_nodes)
+        for chance_node in chance_nodes:
+            self.assertLessEqual(len(chance_node.children), math.ceil(chance_node.visits ** 0.5))
+            self.assertEqual(sum(child.visits for child in chance_node.children.values()), chance_node.visits)
+            for (remaining_attacker_troops, remaining_defender_troops), child in chance_node.children.items():
+                self.assertEqual(child.game_state.territory_troops[0], remaining_attacker_troops)
+                self.assertEqual(child.game_state.territory_troops[chance_node.action.defender_territory_id], remaining_defender_troops)
+
+    def test_tree_is_reused_for_chained_actions(self):
+        game_state = self.get_attack_state()
+        mcts_agent = MCTSAgent(iterations=100)
+        action = mcts_agent.select_action(ActionList.get_action_list(game_state, self.classic_map), game_state, self.classic_map)
+        previous_child = mcts_agent.previous_child # BattleFrom/Skip lead to decision nodes, so the next call should resume from it
+
+        self.assertIsInstance(previous_child, DecisionNode)
+        self.assertIs(mcts_agent.get_root(action.apply(game_state, self.classic_map), self.classic_map), previous_child)
+
+        mcts_agent.previous_child = previous_child
+        self.assertIsNot(mcts_agent.get_root(game_state, self.classic_map), previous_child) # a non-matching state starts a fresh tree
+
+    def test_wall_clock_budget(self):
+        game_state = self.get_attack_state()
+        mcts_agent = MCTSAgent(iterations=None, time_limit=0.05)
+        mcts_agent.select_action(ActionList.get_action_list(game_state, self.classic_map), game_state, self.classic_map)
+
+        self.assertGreater(mcts_agent.total_playouts, 0)
+        self.assertLess(mcts_agent.total_search_time, 1.0)
+
+    def test_rollout_agent_does_not_affect_agent_names(self):
+        Agent.reset_player_ids()
+        agents = [CommunistAgent(), MCTSAgent(), CommunistAgent()]
+
+        self.assertEqual([agent.get_name() for agent in agents], ["CommunistAgent 1", "MCTSAgent", "CommunistAgent 2"])
+        self.assertIsInstance(agents[1].rollout_agent, RolloutAgent)
+
+    def test_evaluate_game_state(self):
+        game_state = GameState(2, len(self.mini_map.territories), True)
+        rewards = evaluate_game_state(game_state)
+        self.assertAlmostEqual(sum(rewards), 1.0)
+
+        game_state.active_players = [False, True]
+        self.assertEqual(evaluate_game_state(game_state), [0.0, 1.0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import random
+import unittest
+
+from benchmarks.benchmark import Benchmark, BenchmarkRunner
+from benchmarks.gym_env_benchmarks import GymEnvBenchmarks
+
+from src.environment.map import RiskMap
+
+from src.train.gym_environment import RiskGymEnvironment
+
+class TestBenchmark(unittest.TestCase):
+    def test_every_repeat_is_seeded_and_set_up(self):
+        random_values, setup_count = [], [0]
+        benchmark = Benchmark("test", lambda: random_values.append(random.random()), num_operations=4, setup=lambda: setup_count.__setitem__(0, setup_count[0] + 1), seed=3, repeats=5, warmup=2)
+        timings = benchmark.measure()
+
+        self.assertEqual(setup_count[0], 7)
+        self.assertEqual(set(random_values), {random.Random(3).random()})
+        self.assertEqual((timings["operations"], timings["repeats"]), (4, 5))
+        self.assertTrue(timings["min_ns"] <= timings["median_ns"] <= timings["p95_ns"] <= timings["max_ns"])
+
+    def test_compare_results_orders_regressions_first(self):
+        baseline_results = {"metadata": {"commit": None}, "results": {"a": {"median_ns": 100.0}, "b": {"median_ns": 100.0}, "c": {"median_ns": 50.0}}}
+        current_results = {"metadata": {"commit": None}, "results": {"a": {"median_ns": 80.0}, "b": {"median_ns": 150.0}, "d": {"median_ns": 10.0}}}
+
+        self.assertEqual(BenchmarkRunner.compare_results(baseline_results, current_results), [["b", 100.0, 150.0, 1.5], ["a", 100.0, 80.0, 0.8]])
+        self.assertEqual([BenchmarkRunner.format_time(time_ns) for time_ns in [512, 1500, 2.5e6, 3e9]], ["512ns", "1.50us", "2.50ms", "3.00s"])
+
+    def test_gym_env_replay_revisits_recorded_states(self):
+        gym_environment = RiskGymEnvironment(RiskMap.from_json("maps/mini.json"), num_players=3)
+        actions, game_states = GymEnvBenchmarks.record_episode(gym_environment, 50)
+
+        gym_environment.reset(seed=0)
+        for action, game_state in zip(actions, game_states):
+            self.assertEqual(gym_environment.game_state.territory_troops, game_state.territory_troops)
+            gym_environment.step(action)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,9 @@
+import random
 import unittest
 
 from src.environment.game_state import GameState, GamePhase
 from src.environment.map import RiskMap
-from src.environment.actions import TransferMethod, DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction
+from src.environment.actions import TransferMethod, ActionList, LazyActionList, DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction
 
 class TestAction(unittest.TestCase):
     def setUp(self):
@@ -170,6 +171,22 @@ class TestBattleToAction(TestAction):
         self.assertEqual(new_state.active_players[3], False) # Defender should be eliminated since they own no other territories
         self.assertEqual(new_state.territory_card_counts, [4, 1, 0, 0])
 
+    def test_apply_battle_to_action_with_predetermined_outcome(self):
+        self.game_state.current_battle = (0, -1)
+        self.game_state.territory_troops[0] = 10
+        self.game_state.territory_troops[5] = 4
+        action = BattleToAction(5)
+
+        won_state = action.apply_outcome_in_place(self.game_state.copy(), self.classic_map, 7, 0)
+        self.assertEqual((won_state.territory_troops[0], won_state.territory_troops[5]), (7, 0))
+        self.assertEqual(won_state.territory_owners[5], 0)
+        self.assertEqual(won_state.current_battle, (0, 5))
+
+        lost_state = action.apply_outcome_in_place(self.game_state.copy(), self.classic_map, 1, 2)
+        self.assertEqual((lost_state.territory_troops[0], lost_state.territory_troops[5]), (1, 2))
+        self.assertEqual(lost_state.territory_owners[5], 1)
+        self.assertEqual(lost_state.current_battle, (-1, -1))
+
 class TestTransferAction(TestAction):
     def setUp(self):
         super().setUp()
@@ -457,5 +474,41 @@ class TestSkipAction(TestAction):
         self.assertEqual(new_state.current_phase, GamePhase.DRAFT)
         self.assertEqual(new_state.current_player, 3)
 
+class TestApplyInPlace(TestAction):
+    def test_apply_in_place_matches_apply(self):
+        random.seed(0)
+        for _ in range(2000):
+            action = ActionList.get_action_list(self.game_state, self.classic_map).get_random_action()
+            game_state_before_apply = str(self.game_state)
+
+            random_state = random.getstate()
+            new_state = action.apply(self.game_state, self.classic_map)
+            random.setstate(random_state)
+            in_place_state = action.apply_in_place(self.game_state.copy(), self.classic_map)
+
+            self.assertEqual(str(self.game_state), game_state_before_apply) # apply must never mutate the given game state
+            self.assertEqual(str(in_place_state), str(new_state))
+
+            self.game_state = new_state
+            if self.game_state.is_terminal_state():
+                self.game_state.reset_to_initial_state()
+
+class TestLazyActionList(TestAction):
+    def test_lazy_segments_match_action_list(self):
+        random.seed(0)
+        for _ in range(2000):
+            action_list = ActionList.get_action_list(self.game_state, self.classic_map)
+            lazy_action_list = LazyActionList(self.game_state, self.classic_map)
+
+            self.assertEqual(lazy_action_list.segments, {}) # nothing is generated until accessed
+            self.assertEqual(lazy_action_list.battle_from_actions, action_list.battle_from_actions)
+            self.assertEqual(len(lazy_action_list.segments), 1)
+            self.assertEqual(lazy_action_list.flatten(), action_list.flatten())
+            self.assertEqual(lazy_action_list.size(), action_list.size())
+
+            self.game_state = action_list.get_random_action().apply(self.game_state, self.classic_map)
+            if self.game_state.is_terminal_state():
+                self.game_state.reset_to_initial_state()
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,70 @@
+import random
+import unittest
+
+from src.environment import actions, queries
+from src.environment.actions import ActionList, SkipAction
+from src.environment.environment import RiskEnvironment
+from src.environment.game_state import GamePhase
+from src.environment.map import RiskMap
+from src.environment.queries import attack_targets, fortify_targets, deployment_income, legal_action_count
+
+class TestQueries(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.num_players = 4
+        self.classic_map = RiskMap.from_json("maps/classic.json")
+        self.environment = RiskEnvironment(self.classic_map, self.num_players)
+        self.game_state = self.environment.current_state
+
+    def test_queries_match_forwarded_action_lists(self):
+        for _ in range(3000):
+            game_state = self.environment.current_state
+            game_state_before_queries = str(game_state)
+            action_list = self.environment.get_action_list()
+
+            self.assertEqual(legal_action_count(game_state, self.classic_map), action_list.size())
+            for battle_from_action in action_list.battle_from_actions:
+                forwarded_action_list = ActionList.get_action_list(battle_from_action.apply(game_state, self.classic_map), self.classic_map)
+                self.assertEqual(attack_targets(game_state, self.classic_map, battle_from_action.attacker_territory_id), [action.defender_territory_id for action in forwarded_action_list.battle_to_actions])
+            for fortify_from_action in action_list.fortify_from_actions:
+                forwarded_action_list = ActionList.get_action_list(fortify_from_action.apply(game_state, self.classic_map), self.classic_map)
+                self.assertEqual(fortify_targets(game_state, self.classic_map, fortify_from_action.from_territory_id), [action.to_territory_id for action in forwarded_action_list.fortify_to_actions])
+
+            self.assertEqual(str(game_state), game_state_before_queries) # queries must never mutate the game state
+
+            _, is_terminal = self.environment.step(action_list.get_random_action())
+            if is_terminal:
+                self.environment.reset()
+
+    def test_deployment_income_matches_skip_action(self):
+        self.game_state.current_phase = GamePhase.FORTIFY
+        self.game_state.deployment_troops = 0
+        self.game_state.territory_owners = [0] * len(self.game_state.territory_owners)
+        for territory_id in range(9, 13): # Player 1 owns all of South America
+            self.game_state.territory_owners[territory_id] = 1
+        self.game_state.territory_card_counts = [0, 4, 0, 0]
+
+        self.assertEqual(deployment_income(self.game_state, self.classic_map, 1), 3 + 2 + 10)
+        self.assertEqual(deployment_income(self.game_state, self.classic_map, 0), 38 // 3 + 5 + 5 + 2 + 3 + 7)
+        self.assertEqual(SkipAction().apply(self.game_state, self.classic_map).deployment_troops, deployment_income(self.game_state, self.classic_map, 1))
+
+    def test_legal_action_count_for_pending_transfer(self):
+        self.game_state.current_phase = GamePhase.ATTACK
+        self.game_state.deployment_troops = 0
+        self.game_state.current_battle = (0, 5)
+
+        self.assertEqual(legal_action_count(self.game_state, self.classic_map), 4)
+
+    def test_fortify_targets_excludes_disconnected_territories(self):
+        self.game_state.territory_owners = [1] * len(self.game_state.territory_owners)
+        self.game_state.territory_owners[20], self.game_state.territory_owners[21], self.game_state.territory_owners[25] = 0, 0, 0 # Congo, East Africa, South Africa
+        self.game_state.territory_owners[0] = 0 # Alaska
+
+        self.assertEqual(fortify_targets(self.game_state, self.classic_map, 25), [20, 21])
+        self.assertEqual(fortify_targets(self.game_state, self.classic_map, 0), [])
+
+    def test_trade_in_value_is_still_importable_from_actions(self):
+        self.assertIs(actions.TRADE_IN_VALUE, queries.TRADE_IN_VALUE)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from src.agents.agent import Agent, RandomAgent, CommunistAgent
+
+from src.environment.actions import Action, ActionList, DeployAction, BattleFromAction, BattleToAction, SkipAction
+from src.environment.game_state import GameState
+from src.environment.map import RiskMap
+
+from src.observers.action_count_observer import ActionCountObserver
+from src.observers.battle_observer import BattleObserver
+from src.observers.deploy_observer import DeployObserver
+from src.observers.observer import Observer
+from src.observers.observer_manager import ObserverManager
+from src.observers.outcome_observer import OutcomeObserver
+
+from src.runners.game_runner import GameRunner
+
+class RecordingObserver(Observer):
+    """Records every event it is notified of."""
+    action_types = (DeployAction, BattleToAction)
+    observes_action_lists = False
+
+    def __init__(self, core_observer = None):
+        super().__init__(core_observer)
+        self.action_types_taken = []
+
+    def on_action_taken(self, action: Action, _previous_state: GameState, _current_state: GameState):
+        self.action_types_taken.append(type(action))
+
+    def on_action_list_generated(self, _: ActionList):
+        raise AssertionError("Action lists were not subscribed to")
+
+class TestObserverManager(unittest.TestCase):
+    def setUp(self):
+        self.mini_map = RiskMap.from_json("maps/mini.json")
+        Agent.reset_player_ids()
+        self.agents = [CommunistAgent(), RandomAgent()]
+
+    def test_dispatch_tables_only_hold_subscribed_observers(self):
+        observer_manager = ObserverManager(self.mini_map, self.agents, [OutcomeObserver(), BattleObserver(), DeployObserver()])
+        core_observer, _, battle_observer, deploy_observer = observer_manager.observers
+
+        self.assertFalse(observer_manager.observes_action_lists)
+        self.assertTrue(observer_manager.observes_actions)
+        self.assertEqual(observer_manager.action_handlers[DeployAction], [core_observer.on_action_taken, deploy_observer.on_action_taken])
+        self.assertEqual(observer_manager.action_handlers[BattleFromAction], [core_observer.on_action_taken, battle_observer.on_action_taken])
+        self.assertEqual(observer_manager.action_handlers[SkipAction], [core_observer.on_action_taken])
+
+        self.assertTrue(ObserverManager(self.mini_map, self.agents, [ActionCountObserver()]).observes_action_lists)
+        self.assertFalse(ObserverManager(self.mini_map, self.agents, []).observes_actions)
+
+    def test_observers_are_only_notified_of_subscribed_events(self):
+        recording_observer = RecordingObserver()
+        observer_manager = ObserverManager(self.mini_map, self.agents, [recording_observer])
+        GameRunner(self.mini_map, self.agents, observer_manager, max_episode_length=500).run_episode()
+
+        self.assertGreater(observer_manager.observers[0].action_count, len(recording_observer.action_types_taken))
+        self.assertIn(DeployAction, recording_observer.action_types_taken)
+        self.assertTrue(set(recording_observer.action_types_taken) <= {DeployAction, BattleToAction})
+
+if __name__ == "__main__":
+    unittest.main()
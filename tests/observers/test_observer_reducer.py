@@ -0,0 +1,104 @@
+import unittest
+
+from unittest import mock
+
+import numpy as np
+
+from src.agents.agent import Agent, RandomAgent, CommunistAgent, CapitalistAgent
+
+from src.environment.map import RiskMap
+
+from src.observers.battle_observer import BattleObserver, BattleReducer
+from src.observers.observer_reducer import Histogram
+from src.observers.outcome_observer import OutcomeObserver, OutcomeReducer
+
+from src.runners.simulation_runner import SimulationRunner
+
+class TestHistogram(unittest.TestCase):
+    def setUp(self):
+        self.values = [5, 3, 9, 3, 7, 1, 3, 8]
+        self.histogram = Histogram()
+        for value in self.values:
+            self.histogram.add(value)
+
+    def test_order_statistics(self):
+        sorted_values = sorted(self.values)
+        self.assertEqual(self.histogram.get_total_count(), len(self.values))
+        self.assertEqual(self.histogram.get_sum(), sum(self.values))
+        self.assertEqual(self.histogram.get_min(), 1)
+        self.assertEqual(self.histogram.get_max(), 9)
+        self.assertEqual(self.histogram.get_count(3), 3)
+        for quantile in [0.0, 0.25, 0.5, 0.75, 1.0]:
+            self.assertEqual(self.histogram.get_quantile(quantile), sorted_values[min(int(quantile * len(sorted_values)), len(sorted_values) - 1)])
+
+    def test_merge_matches_single_histogram(self):
+        first_half, second_half = Histogram(), Histogram()
+        for value in self.values[:3]:
+            first_half.add(value)
+        for value in self.values[3:]:
+            second_half.add(value)
+
+        self.assertEqual(first_half.merge(second_half).counts, self.histogram.counts)
+
+    def test_rounded_values(self):
+        histogram = Histogram(decimals=2)
+        for value in [0.123, 0.1249, 0.5]:
+            histogram.add(value)
+
+        self.assertEqual(histogram.get_count(0.12), 2)
+        self.assertEqual(histogram.get_quantile(0.5), 0.12)
+
+    def test_add_all_matches_add(self):
+        histogram = Histogram()
+        histogram.add_all(np.array(self.values))
+        self.assertEqual(histogram.counts, self.histogram.counts)
+
+        values = [0.125, 0.135, 2.675, 0.1249, 1.005]
+        rounded_histogram, batch_rounded_histogram = Histogram(decimals=2), Histogram(decimals=2)
+        for value in values:
+            rounded_histogram.add(value)
+        batch_rounded_histogram.add_all(np.array(values))
+        self.assertEqual(batch_rounded_histogram.counts, rounded_histogram.counts)
+
+class TestBufferedReducers(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        Agent.reset_player_ids()
+        simulation_runner = SimulationRunner("test", RiskMap.from_json("maps/mini.json"), [RandomAgent(), CommunistAgent(), CapitalistAgent()], num_episodes=20, observers=[OutcomeObserver(), BattleObserver()], max_episode_length=150, shuffle_turn_order=True, seed=2)
+        simulation_runner.run_simulation()
+        cls.outcome_observers = [observer_manager.observers[1] for observer_manager in simulation_runner.game_observations]
+        cls.battle_observers = [observer_manager.observers[2] for observer_manager in simulation_runner.game_observations]
+
+    def test_finish_positions_match_sorting_each_episode(self):
+        player_names = [player_telemetry.player_name for player_telemetry in self.outcome_observers[0].core_observer.player_telemetries]
+        expected_finish_position_counts = {player_name: [0] * (len(player_names) + 1) for player_name in player_names}
+        for observer in self.outcome_observers:
+            finish_order = sorted(observer.core_observer.player_telemetries, key=lambda x: (x.eliminated_turn_count is not None, -(x.eliminated_turn_count or 0)))
+            for i, player_telemetry in enumerate(finish_order):
+                is_stalemate = player_telemetry.eliminated_turn_count is None and not observer.terminal_state.is_terminal_state()
+                expected_finish_position_counts[player_telemetry.player_name][-1 if is_stalemate else i] += 1
+
+        reducer = OutcomeObserver.reduce(self.outcome_observers)
+        self.assertEqual(reducer.finish_position_counts, expected_finish_position_counts)
+        self.assertGreater(sum(counts[-1] for counts in expected_finish_position_counts.values()), 0) # some episodes were truncated
+        self.assertGreater(reducer.completed_episode_count, 0)
+
+    def test_flush_interval_does_not_change_results(self):
+        outcome_reducer, battle_reducer = OutcomeObserver.reduce(self.outcome_observers), BattleObserver.reduce(self.battle_observers)
+        with mock.patch.object(OutcomeReducer, "flush_interval", 3), mock.patch.object(BattleReducer, "flush_interval", 3):
+            frequently_flushed_outcome_reducer, frequently_flushed_battle_reducer = OutcomeObserver.reduce(self.outcome_observers), BattleObserver.reduce(self.battle_observers)
+            merged_battle_reducer = BattleObserver.reduce(self.battle_observers[:7]).merge(BattleObserver.reduce(self.battle_observers[7:]))
+
+        self.assertEqual(OutcomeObserver.get_winner_distributions(outcome_reducer), OutcomeObserver.get_winner_distributions(frequently_flushed_outcome_reducer))
+        self.assertEqual(outcome_reducer.turn_counts.counts, frequently_flushed_outcome_reducer.turn_counts.counts)
+        self.assertEqual(outcome_reducer.running_times.counts, frequently_flushed_outcome_reducer.running_times.counts)
+        for other_battle_reducer in [frequently_flushed_battle_reducer, merged_battle_reducer]:
+            self.assertEqual(battle_reducer.player_totals, other_battle_reducer.player_totals)
+            self.assertEqual(battle_reducer.defender_territory_counts, other_battle_reducer.defender_territory_counts)
+            self.assertEqual(battle_reducer.turn_battle_totals, other_battle_reducer.turn_battle_totals)
+
+        expected_battles = sum(len(player_telemetry.attacks) for observer in self.battle_observers for player_telemetry in observer.core_observer.player_telemetries)
+        self.assertEqual(sum(player_totals[0] for player_totals in battle_reducer.player_totals.values()), expected_battles)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.agents.agent import Agent, RandomAgent, CommunistAgent
+
+from src.environment.map import RiskMap
+
+from src.observers.battle_observer import BattleObserver
+from src.observers.deploy_observer import DeployObserver
+from src.observers.player_telemetry import ColumnarLog, DEPLOY_LOG_FIELDS
+
+from src.runners.simulation_runner import SimulationRunner
+
+class TestColumnarLog(unittest.TestCase):
+    def test_append_and_read_columns(self):
+        deploy_log = ColumnarLog(DEPLOY_LOG_FIELDS)
+        self.assertEqual(len(deploy_log), 0)
+        self.assertEqual(deploy_log.get_column("territory_id").tolist(), [])
+
+        for turn_number in range(1000):
+            deploy_log.append(turn_number, turn_number % 2, turn_number % 7)
+        territory_ids = deploy_log.get_column("territory_id")
+        deploy_log.append(1000, 0, 3) # the returned column is a copy, so the log can keep growing
+
+        self.assertEqual(len(deploy_log), 1001)
+        self.assertEqual(len(territory_ids), 1000)
+        self.assertEqual(deploy_log.get_column("turn_number").sum(), sum(range(1001)))
+        self.assertEqual(np.bincount(deploy_log.get_column("player_id")).tolist(), [501, 500])
+
+    def test_concatenate_and_pickle(self):
+        deploy_logs = [ColumnarLog(DEPLOY_LOG_FIELDS) for _ in range(3)]
+        deploy_logs[0].append(1, 0, 5)
+        deploy_logs[2].append(2, 1, 6)
+        deploy_logs[2].append(3, 1, 7)
+
+        unpickled_deploy_log = pickle.loads(pickle.dumps(deploy_logs[2]))
+        unpickled_deploy_log.append(4, 0, 8)
+
+        self.assertEqual(ColumnarLog.concatenate(deploy_logs)["territory_id"].tolist(), [5, 6, 7])
+        self.assertEqual(unpickled_deploy_log.get_column("territory_id").tolist(), [6, 7, 8])
+        self.assertEqual(len(deploy_logs[2]), 2)
+
+    def test_export_telemetry(self):
+        Agent.reset_player_ids()
+        simulation_runner = SimulationRunner("test", RiskMap.from_json("maps/mini.json"), [CommunistAgent(), RandomAgent()], num_episodes=3, observers=[BattleObserver(), DeployObserver()], max_episode_length=500, seed=1)
+        simulation_runner.run_simulation()
+
+        with tempfile.TemporaryDirectory() as export_dir:
+            export_path = os.path.join(export_dir, "telemetry.npz")
+            simulation_runner.export_telemetry(export_path)
+            with np.load(export_path) as telemetry:
+                battle_observers = [observer_manager.observers[1] for observer_manager in simulation_runner.game_observations]
+                random_agent_battles = telemetry["attacks.player_name"] == "RandomAgent"
+                self.assertEqual(telemetry["attacks.defender_territory_id"][random_agent_battles].tolist(), BattleObserver.get_battle_logs(battle_observers, "RandomAgent")["defender_territory_id"].tolist())
+                self.assertEqual(sorted(set(telemetry["deployments.episode"].tolist())), [0, 1, 2])
+                self.assertEqual(len(telemetry["action_counts.episode"]), 0) # no ActionCountObserver
+
+if __name__ == "__main__":
+    unittest.main()
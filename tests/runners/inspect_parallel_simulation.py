@@ -0,0 +1,30 @@
+import os
+import time
+
+from src.agents.agent import Agent, RandomAgent, CommunistAgent, CapitalistAgent
+
+from src.environment.map import RiskMap
+
+from src.observers.outcome_observer import OutcomeObserver
+
+from src.runners.simulation_runner import SimulationRunner
+
+def measure_episodes_per_second(risk_map: RiskMap, num_workers: int, num_episodes: int = 200) -> float:
+    Agent.reset_player_ids()
+    simulation_runner = SimulationRunner(
+        "inspect", risk_map, [RandomAgent(), CommunistAgent(), CapitalistAgent()], num_episodes=num_episodes, observers=[OutcomeObserver()],
+        max_episode_length=5000, shuffle_turn_order=True, seed=0, num_workers=num_workers
+    )
+
+    start_time = time.perf_counter()
+    simulation_runner.run_simulation()
+
+    return num_episodes / (time.perf_counter() - start_time)
+
+# No assertions here, just want to eyeball how simulation throughput on the classic map scales with the number of worker processes
+if __name__ == "__main__":
+    risk_map = RiskMap.from_json("maps/classic.json")
+    num_workers = 1
+    while num_workers <= os.cpu_count():
+        print(f"\n{num_workers} workers: {measure_episodes_per_second(risk_map, num_workers):.1f} episodes per second")
+        num_workers *= 2
@@ -0,0 +1,37 @@
+import tracemalloc
+
+from src.agents.agent import Agent, RandomAgent, CommunistAgent, CapitalistAgent
+
+from src.environment.map import RiskMap
+
+from src.observers.battle_observer import BattleObserver
+from src.observers.deploy_observer import DeployObserver
+from src.observers.outcome_observer import OutcomeObserver
+
+from src.runners.simulation_runner import SimulationRunner
+
+def measure_peak_memory(risk_map: RiskMap, num_episodes: int, retain_game_observations: bool) -> float:
+    """Return the peak memory (in MB) allocated while running and summarising the given number of episodes."""
+    Agent.reset_player_ids()
+    simulation_runner = SimulationRunner(
+        "inspect", risk_map, [RandomAgent(), CommunistAgent(), CapitalistAgent()], num_episodes=num_episodes, observers=[OutcomeObserver(), BattleObserver(), DeployObserver()],
+        max_episode_length=1000, shuffle_turn_order=True, seed=0, retain_game_observations=retain_game_observations
+    )
+
+    tracemalloc.start()
+    simulation_runner.run_simulation()
+    simulation_runner.summarise_simulation()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak_memory / 2**20
+
+# No assertions here, just want to eyeball that memory stays flat with the number of episodes when observations are folded into reducers
+if __name__ == "__main__":
+    risk_map = RiskMap.from_json("maps/mini.json")
+    results = []
+    for num_episodes in [100, 200, 400]:
+        for retain_game_observations in [True, False]:
+            results.append(f"{num_episodes} episodes, {'retained' if retain_game_observations else 'streamed'}: {measure_peak_memory(risk_map, num_episodes, retain_game_observations):.1f} MB peak")
+
+    print("\n\n" + "\n".join(results))
@@ -0,0 +1,47 @@
+import unittest
+
+from src.agents.agent import Agent, RandomAgent, CommunistAgent
+
+from src.environment.map import RiskMap
+
+from src.observers.outcome_observer import OutcomeObserver
+
+from src.runners.early_stopping import EarlyStopping
+from src.runners.simulation_runner import SimulationRunner
+
+class TestEarlyStopping(unittest.TestCase):
+    def setUp(self):
+        self.mini_map = RiskMap.from_json("maps/mini.json")
+
+    def run_simulation(self, num_episodes: int, early_stopping: EarlyStopping = None) -> SimulationRunner:
+        Agent.reset_player_ids()
+        simulation_runner = SimulationRunner("test", self.mini_map, [CommunistAgent(), RandomAgent()], num_episodes=num_episodes, observers=[OutcomeObserver()], max_episode_length=1000, seed=3, retain_game_observations=False, early_stopping=early_stopping)
+        simulation_runner.run_simulation()
+
+        return simulation_runner
+
+    def test_stops_once_win_rates_are_precise(self):
+        for method in ["wilson", "bayesian"]:
+            early_stopping = EarlyStopping(win_rate_half_width=8.0, method=method, min_episodes=10, check_interval=10)
+            early_stopped_runner = self.run_simulation(200, early_stopping)
+            outcome_reducer = early_stopped_runner.get_observer_reducer(OutcomeObserver)
+
+            self.assertLess(early_stopped_runner.num_finished_episodes, 200)
+            self.assertEqual(early_stopped_runner.num_finished_episodes % 10, 0)
+            self.assertEqual(outcome_reducer.episode_count, early_stopped_runner.num_finished_episodes)
+            self.assertTrue(early_stopping.is_precise(outcome_reducer))
+            self.assertTrue(all(win_rate_half_width <= 8.0 for _, _, win_rate_half_width, _, _ in early_stopping.get_half_widths(outcome_reducer)))
+
+            # The stopped simulation is the prefix of a fixed length one, which was not yet precise one check earlier
+            fixed_runner = self.run_simulation(early_stopped_runner.num_finished_episodes)
+            self.assertEqual(OutcomeObserver.get_winner_distributions(fixed_runner.get_observer_reducer(OutcomeObserver)), OutcomeObserver.get_winner_distributions(outcome_reducer))
+            self.assertFalse(early_stopping.is_precise(self.run_simulation(early_stopped_runner.num_finished_episodes - 10).get_observer_reducer(OutcomeObserver)))
+
+    def test_runs_to_cap_if_never_precise(self):
+        simulation_runner = self.run_simulation(30, EarlyStopping(win_rate_half_width=0.1, finish_position_half_width=0.01, min_episodes=10, check_interval=10))
+
+        self.assertEqual(simulation_runner.num_finished_episodes, 30)
+        self.assertIn("met: False", simulation_runner.early_stopping.summarise(simulation_runner.get_observer_reducer(OutcomeObserver)))
+
+if __name__ == "__main__":
+    unittest.main()
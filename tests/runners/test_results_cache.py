@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest import mock
+
+from src.agents.agent import Agent, RandomAgent, CommunistAgent
+from src.agents.mcts_agent import MCTSAgent
+
+from src.environment.map import RiskMap
+
+from src.observers.battle_observer import BattleObserver
+from src.observers.outcome_observer import OutcomeObserver
+
+from src.runners.results_cache import ResultsCache
+from src.runners.simulation_runner import SimulationRunner
+
+from src.train.rl_agent import RLAgent
+
+class TestResultsCache(unittest.TestCase):
+    def setUp(self):
+        self.mini_map = RiskMap.from_json("maps/mini.json")
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.results_cache = ResultsCache(os.path.join(self.cache_dir.name, "results_cache.sqlite"))
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def create_simulation_runner(self, num_episodes: int, results_cache: ResultsCache = None, seed: int = 5, disparity: int = 3, risk_map: RiskMap = None) -> SimulationRunner:
+        Agent.reset_player_ids()
+        return SimulationRunner("test", risk_map or self.mini_map, [CommunistAgent(disparity), RandomAgent()], num_episodes=num_episodes, observers=[OutcomeObserver(), BattleObserver()], max_episode_length=1000, seed=seed, retain_game_observations=False, results_cache=results_cache)
+
+    def assertSameResults(self, simulation_runner: SimulationRunner, other_simulation_runner: SimulationRunner):
+        self.assertEqual(simulation_runner.observer_reducers[0].action_counts.counts, other_simulation_runner.observer_reducers[0].action_counts.counts)
+        self.assertEqual(OutcomeObserver.get_winner_distributions(simulation_runner.get_observer_reducer(OutcomeObserver)), OutcomeObserver.get_winner_distributions(other_simulation_runner.get_observer_reducer(OutcomeObserver)))
+        self.assertEqual(simulation_runner.get_observer_reducer(BattleObserver).turn_battle_totals, other_simulation_runner.get_observer_reducer(BattleObserver).turn_battle_totals)
+
+    def test_cache_hit_runs_no_episodes(self):
+        simulation_runner = self.create_simulation_runner(8, self.results_cache)
+        simulation_runner.run_simulation()
+
+        cached_runner = self.create_simulation_runner(8, self.results_cache)
+        with mock.patch.object(SimulationRunner, "run_episodes") as run_episodes:
+            cached_runner.run_simulation()
+
+        run_episodes.assert_not_called()
+        self.assertEqual(cached_runner.num_finished_episodes, 8)
+        self.assertSameResults(simulation_runner, cached_runner)
+
+    def test_extended_simulation_only_runs_missing_episodes(self):
+        self.create_simulation_runner(8, self.results_cache).run_simulation()
+
+        extended_runner = self.create_simulation_runner(12, self.results_cache)
+        run_episodes = SimulationRunner.run_episodes
+        with mock.patch.object(SimulationRunner, "run_episodes", autospec=True, side_effect=run_episodes) as patched_run_episodes:
+            extended_runner.run_simulation()
+        self.assertEqual([call.args[1] for call in patched_run_episodes.call_args_list], [range(8, 12)])
+
+        uncached_runner = self.create_simulation_runner(12)
+        uncached_runner.run_simulation()
+        self.assertEqual(extended_runner.get_observer_reducer(OutcomeObserver).episode_count, 12)
+        self.assertSameResults(uncached_runner, extended_runner)
+
+        # A shorter simulation is not served the longer one's results
+        self.assertIsNone(self.results_cache.load(ResultsCache.get_key(extended_runner.get_results_description()), 7))
+
+    def test_key_depends_on_everything_that_determines_results(self):
+        get_key = lambda simulation_runner: ResultsCache.get_key(simulation_runner.get_results_description())
+        key = get_key(self.create_simulation_runner(8))
+
+        self.assertEqual(key, get_key(self.create_simulation_runner(20)))
+        self.assertEqual(key, get_key(self.create_simulation_runner(8, risk_map=RiskMap.from_json("maps/mini.json"))))
+        self.assertNotEqual(key, get_key(self.create_simulation_runner(8, seed=6)))
+        self.assertNotEqual(key, get_key(self.create_simulation_runner(8, disparity=4)))
+        self.assertNotEqual(key, get_key(self.create_simulation_runner(8, risk_map=RiskMap.from_json("maps/classic.json"))))
+
+    def test_agents_that_have_played_keep_their_key(self):
+        Agent.reset_player_ids()
+        agents = [CommunistAgent(), RandomAgent()] # shared between sweep points, as in Experiments 1 and 2
+        create_simulation_runner = lambda seed: SimulationRunner("test", self.mini_map, agents, num_episodes=4, observers=[OutcomeObserver()], max_episode_length=1000, seed=seed, retain_game_observations=False, results_cache=self.results_cache)
+        fresh_key = ResultsCache.get_key(create_simulation_runner(1).get_results_description())
+        for seed in [1, 2]:
+            create_simulation_runner(seed).run_simulation()
+
+        self.assertEqual(ResultsCache.get_key(create_simulation_runner(1).get_results_description()), fresh_key)
+        with mock.patch.object(SimulationRunner, "run_episodes") as run_episodes:
+            for seed in [1, 2]:
+                rerun_runner = create_simulation_runner(seed)
+                rerun_runner.run_simulation()
+                self.assertEqual(rerun_runner.num_finished_episodes, 4)
+        run_episodes.assert_not_called()
+
+    def test_key_depends_on_model_checkpoint_contents(self):
+        Agent.reset_player_ids()
+        rl_agent = RLAgent(self.mini_map, 2, inference_only=True)
+        rl_agent.model_path = shutil.copy(rl_agent.model_path, self.cache_dir.name) # a copy, so that the saved model is never modified
+        agents = [rl_agent, RandomAgent()]
+        get_key = lambda: ResultsCache.get_key(SimulationRunner("test", self.mini_map, agents, num_episodes=4, seed=5, retain_game_observations=False, results_cache=self.results_cache).get_results_description())
+        key = get_key()
+
+        self.assertEqual(key, get_key())
+        with open(rl_agent.model_path, "ab") as model_file:
+            model_file.write(b"retrained") # as overwriting the same model version with a retrained one
+        self.assertNotEqual(key, get_key())
+
+    def test_wall_clock_budgeted_agents_are_not_cached(self):
+        Agent.reset_player_ids()
+        SimulationRunner("test", self.mini_map, [MCTSAgent(iterations=10), RandomAgent()], num_episodes=4, seed=5, retain_game_observations=False, results_cache=self.results_cache)
+        with self.assertRaises(AssertionError):
+            SimulationRunner("test", self.mini_map, [MCTSAgent(iterations=None, time_limit=0.01), RandomAgent()], num_episodes=4, seed=5, retain_game_observations=False, results_cache=self.results_cache)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from src.agents.agent import Agent, RandomAgent, CommunistAgent
+
+from src.environment.map import RiskMap
+
+from src.observers.outcome_observer import OutcomeObserver
+
+from src.runners.runner_metrics import RunnerMetrics
+from src.runners.simulation_runner import SimulationRunner
+
+from src.train.rl_agent import RLAgent
+
+class TestRunnerMetrics(unittest.TestCase):
+    def run_simulation(self, **kwargs) -> SimulationRunner:
+        Agent.reset_player_ids()
+        simulation_runner = SimulationRunner("test", RiskMap.from_json("maps/mini.json"), [CommunistAgent(), RandomAgent()], num_episodes=6, observers=[OutcomeObserver()], max_episode_length=300, seed=3, **kwargs)
+        simulation_runner.run_simulation()
+
+        return simulation_runner
+
+    def test_sampling_every_step_times_every_phase(self):
+        simulation_runner = self.run_simulation(metrics_sample_interval=1)
+        metrics = simulation_runner.metrics
+        phase_samples = {row["phase"]: row["samples"] for row in metrics.get_phase_rows()}
+
+        self.assertEqual(metrics.episode_count, 6)
+        self.assertEqual(metrics.action_count, sum(observer_manager.observers[0].action_count for observer_manager in simulation_runner.game_observations))
+        self.assertEqual(phase_samples["action_list_generation"], metrics.action_count)
+        self.assertEqual(phase_samples["observer_dispatch"], metrics.action_count)
+        self.assertEqual(phase_samples["select_action.CommunistAgent"] + phase_samples["select_action.RandomAgent"], metrics.action_count)
+        self.assertEqual(sum(samples for phase, samples in phase_samples.items() if phase.startswith("apply.")), metrics.action_count)
+        self.assertIn("apply.DeployAction", phase_samples)
+        self.assertAlmostEqual(sum(row["share"] for row in metrics.get_phase_rows()), 1.0)
+        self.assertGreater(metrics.get_actions_per_second(), 0)
+
+    def test_sampling_does_not_change_results(self):
+        unsampled_runner, sampled_runner = self.run_simulation(), self.run_simulation(metrics_sample_interval=7)
+
+        self.assertEqual(unsampled_runner.metrics.phase_times, {})
+        self.assertEqual(unsampled_runner.metrics.action_count, sampled_runner.metrics.action_count)
+        self.assertEqual(sum(samples for samples, _ in sampled_runner.metrics.phase_times.values()), 4 * -(-sampled_runner.metrics.action_count // 7))
+        self.assertEqual(
+            OutcomeObserver.get_winner_distributions(unsampled_runner.get_observer_reducer(OutcomeObserver)),
+            OutcomeObserver.get_winner_distributions(sampled_runner.get_observer_reducer(OutcomeObserver))
+        )
+
+    def test_parallel_metrics_merge_worker_counts(self):
+        sequential_runner, parallel_runner = self.run_simulation(metrics_sample_interval=1), self.run_simulation(metrics_sample_interval=1, num_workers=2)
+
+        self.assertEqual(parallel_runner.metrics.episode_count, 6)
+        self.assertEqual(parallel_runner.metrics.action_count, sequential_runner.metrics.action_count)
+        self.assertEqual(
+            {phase: samples for phase, (samples, _) in parallel_runner.metrics.phase_times.items()},
+            {phase: samples for phase, (samples, _) in sequential_runner.metrics.phase_times.items()}
+        )
+
+    def test_interleaved_games_do_not_count_suspended_time(self):
+        mini_map = RiskMap.from_json("maps/mini.json")
+        phase_mean_ns = []
+        for num_concurrent_games in [1, 6]:
+            Agent.reset_player_ids()
+            simulation_runner = SimulationRunner("test", mini_map, [RLAgent(mini_map, 2, deterministic=True)], num_episodes=6, observers=[OutcomeObserver()], max_episode_length=300, seed=3, enable_rl_agent_performance_test=True, num_concurrent_games=num_concurrent_games, metrics_sample_interval=1)
+            simulation_runner.run_simulation()
+            phase_mean_ns.append({row["phase"]: row["mean_ns"] for row in simulation_runner.metrics.get_phase_rows()})
+
+        sequential_phase_mean_ns, interleaved_phase_mean_ns = phase_mean_ns
+        self.assertTrue(any(phase.startswith("batched_inference.RLAgent") for phase in interleaved_phase_mean_ns))
+        # A suspended game waits on the other games' steps and the batched inference, which would inflate these by orders of magnitude
+        for phase in ["observer_dispatch", "action_list_generation"]:
+            self.assertLess(interleaved_phase_mean_ns[phase], 10 * sequential_phase_mean_ns[phase])
+        rl_select_action_phase = next(phase for phase in interleaved_phase_mean_ns if phase.startswith("select_action.RLAgent"))
+        self.assertLess(interleaved_phase_mean_ns[rl_select_action_phase], sequential_phase_mean_ns[rl_select_action_phase])
+
+    def test_export(self):
+        simulation_runner = self.run_simulation(metrics_sample_interval=2)
+        with tempfile.TemporaryDirectory() as export_dir:
+            simulation_runner.export_metrics(os.path.join(export_dir, "metrics.json"))
+            simulation_runner.export_metrics(os.path.join(export_dir, "metrics.csv"))
+            with open(os.path.join(export_dir, "metrics.json")) as json_file:
+                json_metrics = json.load(json_file)
+            with open(os.path.join(export_dir, "metrics.csv"), newline="") as csv_file:
+                csv_metrics = {row["metric"]: row["value"] for row in csv.DictReader(csv_file)}
+
+        self.assertEqual(json_metrics["action_count"], simulation_runner.metrics.action_count)
+        self.assertEqual(int(csv_metrics["action_count"]), simulation_runner.metrics.action_count)
+        self.assertEqual(int(csv_metrics["action_list_generation.samples"]), simulation_runner.metrics.phase_times["action_list_generation"][0])
+        self.assertEqual([row["phase"] for row in json_metrics["phases"]], [row["phase"] for row in simulation_runner.metrics.get_phase_rows()])
+
+    def test_merge_keeps_own_elapsed_time(self):
+        metrics, worker_metrics = RunnerMetrics(1), RunnerMetrics(1)
+        metrics.elapsed_ns, worker_metrics.elapsed_ns = 100, 80
+        worker_metrics.add_episode(10)
+        worker_metrics.add_phase_time("apply.SkipAction", 5)
+        metrics.add_phase_time("apply.SkipAction", 3)
+
+        metrics.merge(worker_metrics)
+        self.assertEqual((metrics.episode_count, metrics.action_count, metrics.elapsed_ns), (1, 10, 100))
+        self.assertEqual(metrics.phase_times["apply.SkipAction"], [2, 8])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import random
+import tempfile
+import unittest
+
+from unittest import mock
+
+from src.agents.agent import Agent, RandomAgent, CommunistAgent, CapitalistAgent
+
+from src.environment.map import RiskMap
+
+from src.observers.battle_observer import BattleObserver
+from src.observers.outcome_observer import OutcomeObserver
+
+from src.runners.simulation_runner import SimulationRunner
+
+from src.train.rl_agent import RLAgent
+
+class TestSimulationModes(unittest.TestCase):
+    def setUp(self):
+        self.mini_map = RiskMap.from_json("maps/mini.json")
+
+    def run_simulations(self, make_agents, variants: list[dict], **kwargs) -> list[SimulationRunner]:
+        simulation_runners = []
+        for variant in variants:
+            Agent.reset_player_ids()
+            simulation_runner = SimulationRunner("test", self.mini_map, make_agents(), num_episodes=12, observers=[OutcomeObserver(), BattleObserver()], max_episode_length=300, seed=7, **variant, **kwargs)
+            simulation_runner.run_simulation()
+            simulation_runners.append(simulation_runner)
+
+        return simulation_runners
+
+    def assert_same_episodes(self, sequential_runner: SimulationRunner, interleaved_runner: SimulationRunner):
+        self.assertEqual(len(sequential_runner.game_observations), len(interleaved_runner.game_observations))
+        for sequential_observations, interleaved_observations in zip(sequential_runner.game_observations, interleaved_runner.game_observations):
+            sequential_core_observer, sequential_outcome_observer, _ = sequential_observations.observers
+            interleaved_core_observer, interleaved_outcome_observer, _ = interleaved_observations.observers
+            self.assertIs(interleaved_core_observer.risk_map, self.mini_map)
+            self.assertEqual([telemetry.player_name for telemetry in sequential_core_observer.player_telemetries], [telemetry.player_name for telemetry in interleaved_core_observer.player_telemetries])
+            self.assertEqual(sequential_core_observer.action_count, interleaved_core_observer.action_count)
+            self.assertEqual(str(sequential_outcome_observer.terminal_state), str(interleaved_outcome_observer.terminal_state))
+
+    def test_rule_based_agents_match_sequential_simulation(self):
+        sequential_runner, interleaved_runner = self.run_simulations(lambda: [RandomAgent(), CommunistAgent(), CapitalistAgent()], [{}, {"num_concurrent_games": 4}], shuffle_turn_order=True)
+
+        self.assert_same_episodes(sequential_runner, interleaved_runner)
+
+    def test_parallel_workers_match_sequential_simulation(self):
+        sequential_runner, parallel_runner, parallel_interleaved_runner = self.run_simulations(lambda: [RandomAgent(), CommunistAgent(), CapitalistAgent()], [{}, {"num_workers": 3}, {"num_workers": 2, "num_concurrent_games": 3}], shuffle_turn_order=True)
+
+        self.assert_same_episodes(sequential_runner, parallel_runner)
+        self.assert_same_episodes(sequential_runner, parallel_interleaved_runner)
+        sequential_battle_logs = BattleObserver.get_battle_logs([observers.observers[2] for observers in sequential_runner.game_observations], player_name="RandomAgent")
+        parallel_battle_logs = BattleObserver.get_battle_logs([observers.observers[2] for observers in parallel_runner.game_observations], player_name="RandomAgent")
+        self.assertEqual({field: column.tolist() for field, column in sequential_battle_logs.items()}, {field: column.tolist() for field, column in parallel_battle_logs.items()})
+
+        for deterministic in [True, False]:
+            rl_agent = RLAgent(self.mini_map, 2, deterministic=deterministic)
+            sequential_rl_runner, parallel_rl_runner = self.run_simulations(lambda: [rl_agent], [{}, {"num_workers": 2}], enable_rl_agent_performance_test=True, rl_agent_performance_test_num_players=2)
+
+            self.assert_same_episodes(sequential_rl_runner, parallel_rl_runner)
+
+    def test_streaming_reducers_match_retained_observations(self):
+        retained_runner, *streaming_runners = self.run_simulations(lambda: [RandomAgent(), CommunistAgent(), CapitalistAgent()], [{}, {"retain_game_observations": False}, {"retain_game_observations": False, "num_concurrent_games": 4}, {"retain_game_observations": False, "num_workers": 2}], shuffle_turn_order=True)
+
+        retained_outcome_reducer, retained_battle_reducer = retained_runner.get_observer_reducer(OutcomeObserver), retained_runner.get_observer_reducer(BattleObserver)
+        for streaming_runner in streaming_runners:
+            self.assertEqual(streaming_runner.game_observations, [])
+            outcome_reducer, battle_reducer = streaming_runner.get_observer_reducer(OutcomeObserver), streaming_runner.get_observer_reducer(BattleObserver)
+            self.assertEqual(outcome_reducer.episode_count, 12)
+            self.assertEqual(OutcomeObserver.get_winner_distributions(retained_outcome_reducer), OutcomeObserver.get_winner_distributions(outcome_reducer))
+            self.assertEqual(OutcomeObserver.get_game_length_statistics(retained_outcome_reducer)[:2], OutcomeObserver.get_game_length_statistics(outcome_reducer)[:2]) # running times differ between runs
+            self.assertEqual(BattleObserver.get_player_battle_statistics(retained_battle_reducer), BattleObserver.get_player_battle_statistics(battle_reducer))
+            self.assertEqual(retained_battle_reducer.defender_territory_counts, battle_reducer.defender_territory_counts)
+            self.assertEqual(retained_battle_reducer.turn_battle_totals, battle_reducer.turn_battle_totals)
+
+    def test_resumed_checkpoint_matches_uninterrupted_simulation(self):
+        for variant in [{}, {"num_concurrent_games": 3}, {"num_workers": 2}]:
+            with tempfile.TemporaryDirectory() as checkpoint_dir:
+                checkpoint_path = os.path.join(checkpoint_dir, "simulation.pkl")
+                (uninterrupted_runner,) = self.run_simulations(lambda: [RandomAgent(), CommunistAgent(), CapitalistAgent()], [variant], shuffle_turn_order=True, retain_game_observations=False)
+                uninterrupted_random_state = random.getstate()
+
+                # Interrupt the first run right after its first checkpoint, as a crash or Ctrl-C would
+                save_checkpoint = SimulationRunner.save_checkpoint
+                def interrupt_after_checkpoint(simulation_runner: SimulationRunner, next_episode: int, seed: int):
+                    save_checkpoint(simulation_runner, next_episode, seed)
+                    raise KeyboardInterrupt
+                with mock.patch.object(SimulationRunner, "save_checkpoint", interrupt_after_checkpoint), self.assertRaises(KeyboardInterrupt):
+                    self.run_simulations(lambda: [RandomAgent(), CommunistAgent(), CapitalistAgent()], [variant], shuffle_turn_order=True, retain_game_observations=False, checkpoint_path=checkpoint_path, checkpoint_interval=5)
+
+                random.seed() # a fresh process would not share the interrupted run's random state
+                (resumed_runner,) = self.run_simulations(lambda: [RandomAgent(), CommunistAgent(), CapitalistAgent()], [variant], shuffle_turn_order=True, retain_game_observations=False, checkpoint_path=checkpoint_path, checkpoint_interval=5)
+
+                self.assertEqual(resumed_runner.observer_reducers[0].episode_count, 12)
+                self.assertEqual(OutcomeObserver.get_winner_distributions(uninterrupted_runner.get_observer_reducer(OutcomeObserver)), OutcomeObserver.get_winner_distributions(resumed_runner.get_observer_reducer(OutcomeObserver)))
+                self.assertEqual(uninterrupted_runner.observer_reducers[0].action_counts.counts, resumed_runner.observer_reducers[0].action_counts.counts)
+                self.assertEqual(uninterrupted_runner.get_observer_reducer(BattleObserver).turn_battle_totals, resumed_runner.get_observer_reducer(BattleObserver).turn_battle_totals)
+                if not variant:
+                    self.assertEqual(uninterrupted_random_state, random.getstate())
+
+    def test_batched_rl_decisions_match_sequential_simulation(self):
+        for deterministic in [True, False]:
+            rl_agent = RLAgent(self.mini_map, 2, deterministic=deterministic)
+            batch_sizes = []
+            get_action_probabilities = rl_agent.get_action_probabilities
+            def record_batch_size(valid_action_lists, game_states, risk_map):
+                batch_sizes.append(len(game_states))
+                return get_action_probabilities(valid_action_lists, game_states, risk_map)
+            rl_agent.get_action_probabilities = record_batch_size
+
+            sequential_runner, interleaved_runner = self.run_simulations(lambda: [rl_agent], [{}, {"num_concurrent_games": 6}], enable_rl_agent_performance_test=True, rl_agent_performance_test_num_players=2)
+
+            self.assert_same_episodes(sequential_runner, interleaved_runner)
+            self.assertGreater(max(batch_sizes), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import random
+import unittest
+
+from unittest import mock
+
+from src.agents.agent import Agent, RandomAgent, CommunistAgent
+
+from src.environment.map import RiskMap
+
+from src.observers.outcome_observer import OutcomeObserver
+
+from src.runners.simulation_runner import SimulationRunner
+from src.runners.sweep_runner import SweepRunner
+
+from src.utils.k_clique_generator import KCliqueGenerator
+
+class TestSweepRunner(unittest.TestCase):
+    def create_simulation_runner(self, map_size: int) -> SimulationRunner:
+        Agent.reset_player_ids()
+        risk_map = RiskMap.from_json(json_data=KCliqueGenerator.generate(k=map_size, density=0.5))
+        return SimulationRunner(f"map size {map_size}", risk_map, [CommunistAgent(), RandomAgent()], num_episodes=4, observers=[OutcomeObserver()], max_episode_length=1000, seed=map_size, retain_game_observations=False)
+
+    def test_runs_longest_jobs_first_and_returns_grid_order(self):
+        run_order = []
+        run_sweep_point = SweepRunner.run_sweep_point
+        def record_run_sweep_point(_, scheduled_point: tuple[int, SimulationRunner]):
+            run_order.append(scheduled_point[0])
+            return run_sweep_point(scheduled_point)
+
+        with mock.patch.object(SweepRunner, "run_sweep_point", classmethod(record_run_sweep_point)):
+            simulations = SweepRunner("test", [4, 8, 6], self.create_simulation_runner).run_sweep()
+
+        self.assertEqual(run_order, [8, 6, 4])
+        self.assertEqual(list(simulations), [4, 8, 6])
+        self.assertTrue(all(simulation_runner.num_finished_episodes == 4 for simulation_runner in simulations.values()))
+
+    def test_parallel_sweep_matches_sequential_sweep(self):
+        random.seed(0) # maps are generated from the global random module, in grid order however the points are scheduled
+        sequential_simulations = SweepRunner("test", [4, 8, 6], self.create_simulation_runner).run_sweep()
+        random.seed(0)
+        parallel_simulations = SweepRunner("test", [4, 8, 6], self.create_simulation_runner, num_workers=2).run_sweep()
+
+        self.assertEqual(list(parallel_simulations), [4, 8, 6])
+        for map_size in [4, 8, 6]:
+            self.assertEqual(len(parallel_simulations[map_size].risk_map.territories), map_size)
+            self.assertEqual(
+                OutcomeObserver.get_winner_distributions(sequential_simulations[map_size].get_observer_reducer(OutcomeObserver)),
+                OutcomeObserver.get_winner_distributions(parallel_simulations[map_size].get_observer_reducer(OutcomeObserver))
+            )
+
+if __name__ == "__main__":
+    unittest.main()
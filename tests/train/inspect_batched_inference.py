@@ -0,0 +1,30 @@
+import time
+
+from src.agents.agent import Agent
+
+from src.environment.map import RiskMap
+
+from src.observers.outcome_observer import OutcomeObserver
+
+from src.runners.simulation_runner import SimulationRunner
+
+from src.train.rl_agent import RLAgent
+
+def measure_episodes_per_second(risk_map: RiskMap, num_players: int, num_concurrent_games: int, num_episodes: int = 200) -> float:
+    Agent.reset_player_ids()
+    rl_agent = RLAgent(risk_map, num_players)
+    simulation_runner = SimulationRunner(
+        "inspect", risk_map, [rl_agent], num_episodes=num_episodes, observers=[OutcomeObserver()], max_episode_length=1000,
+        enable_rl_agent_performance_test=True, rl_agent_performance_test_num_players=num_players, num_concurrent_games=num_concurrent_games, seed=0
+    )
+
+    start_time = time.perf_counter()
+    simulation_runner.run_simulation()
+
+    return num_episodes / (time.perf_counter() - start_time)
+
+# No assertions here, just want to eyeball how batching the RL agent's decisions across concurrent games (Experiment3 setup) affects simulation throughput
+risk_map = RiskMap.from_json("maps/mini.json")
+for num_players in [2, 4]:
+    for num_concurrent_games in [1, 8, 64]:
+        print(f"\nmini map, {num_players} players, {num_concurrent_games} concurrent games: {measure_episodes_per_second(risk_map, num_players, num_concurrent_games):.1f} episodes per second")
@@ -0,0 +1,34 @@
+import random
+import subprocess
+import sys
+import time
+
+from src.environment.environment import RiskEnvironment
+from src.environment.map import RiskMap
+
+from src.train.rl_agent import RLAgent
+
+def measure_import_time(inference_only: bool) -> float:
+    script = f"import time; start_time = time.perf_counter(); from src.environment.map import RiskMap; from src.train.rl_agent import RLAgent; RLAgent(RiskMap.from_json('maps/mini.json'), 2, inference_only={inference_only}); print(time.perf_counter() - start_time)"
+    return float(subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1])
+
+def measure_decision_latency(rl_agent: RLAgent, risk_map: RiskMap, num_decisions: int = 5000) -> float:
+    random.seed(0)
+    environment = RiskEnvironment(risk_map, 2)
+    total_time = 0.0
+    for _ in range(num_decisions):
+        action_list = environment.get_action_list()
+        start_time = time.perf_counter()
+        selected_action = rl_agent.select_action(action_list, environment.current_state, risk_map)
+        total_time += time.perf_counter() - start_time
+        _, is_terminal_state = environment.step(selected_action)
+        if is_terminal_state:
+            environment.reset()
+
+    return total_time / num_decisions
+
+# No assertions here, just want to eyeball the import time (blitz probability matrix included) and per-decision latency of the torch and NumPy (inference_only) RLAgent modes
+risk_map = RiskMap.from_json("maps/mini.json")
+for inference_only in [False, True]:
+    rl_agent = RLAgent(risk_map, 2, inference_only=inference_only)
+    print(f"inference_only={inference_only}: import + load {measure_import_time(inference_only):.2f}s, {measure_decision_latency(rl_agent, risk_map) * 1e6:.0f}µs per decision")
@@ -0,0 +1,29 @@
+import random
+import time
+
+import numpy as np
+
+from src.environment.map import RiskMap
+
+from src.train.gym_environment import RiskGymEnvironment
+
+def measure_steps_per_second(risk_map: RiskMap, num_players: int, num_steps: int = 5000) -> float:
+    random.seed(0)
+    gym_environment = RiskGymEnvironment(risk_map, num_players)
+    gym_environment.reset(seed=0)
+    action_rng = np.random.default_rng(0)
+
+    start_time = time.perf_counter()
+    for _ in range(num_steps):
+        action = action_rng.choice(np.flatnonzero(gym_environment.action_masks()))
+        _, _, terminated, truncated, _ = gym_environment.step(action)
+        if terminated or truncated:
+            gym_environment.reset()
+
+    return num_steps / (time.perf_counter() - start_time)
+
+# No assertions here, just want to eyeball env throughput (random RL actions, sampled rule-based opponents fast-forwarded between RL decisions)
+for map_name in ["mini", "classic"]:
+    risk_map = RiskMap.from_json(f"maps/{map_name}.json")
+    for num_players in [2, 4, 6]:
+        print(f"{map_name} map, {num_players} players: {measure_steps_per_second(risk_map, num_players):.0f} env steps per second")
@@ -0,0 +1,15 @@
+import time
+
+from src.environment.map import RiskMap
+
+from src.train.ppo import RiskPPO
+
+# No assertions here, just want to eyeball how long loading a saved model for prediction takes, with and without building a gym environment and untrained MaskablePPO first
+risk_map = RiskMap.from_json("maps/mini.json")
+RiskPPO.load(risk_map, 2, inference_only=True) # warm up lazily initialised torch internals
+
+for inference_only in [False, True]:
+    start_time = time.perf_counter()
+    for _ in range(10):
+        RiskPPO.load(risk_map, 2, inference_only=inference_only)
+    print(f"inference_only={inference_only}: {(time.perf_counter() - start_time) / 10 * 1e3:.1f}ms per load")
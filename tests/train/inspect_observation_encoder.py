@@ -0,0 +1,58 @@
+import random
+import time
+
+import numpy as np
+
+from src.environment.environment import RiskEnvironment
+from src.environment.game_state import GameState
+from src.environment.map import RiskMap
+
+from src.train.observation_encoder import ObservationEncoder
+
+from src.utils.k_clique_generator import KCliqueGenerator
+
+def encode_list_observation(game_state: GameState, player_i: int) -> dict[str, np.ndarray]:
+    """The previous per-step list-comprehension encoder, for comparison."""
+    total_troops = sum(game_state.territory_troops)
+
+    return {
+        "current_phase": np.arange(3) == game_state.current_phase.value,
+        "territories": np.array([
+            [int(territory_owner == player_i), troop_count / total_troops]
+            for territory_owner, troop_count in zip(game_state.territory_owners, game_state.territory_troops)
+        ], dtype=np.float32),
+        "territory_card_count": np.array([min(game_state.territory_card_counts[player_i] / 3.0, 1.0)], dtype=np.float32),
+        "deployment_troops": np.array([game_state.deployment_troops / (game_state.deployment_troops + total_troops)], dtype=np.float32)
+    }
+
+def benchmark_encoding(risk_map: RiskMap, num_states: int = 2000, repeats: int = 5):
+    environment = RiskEnvironment(risk_map, 4)
+    game_states = []
+    while len(game_states) < num_states:
+        game_states.append(environment.current_state)
+        _, is_terminal = environment.step(environment.get_action_list().get_random_action())
+        if is_terminal:
+            environment.reset()
+
+    observation_encoder = ObservationEncoder(len(risk_map.territories))
+    encoders = {
+        "list comprehension": lambda game_state: encode_list_observation(game_state, 0),
+        "preallocated dict": lambda game_state: observation_encoder.encode(game_state, 0),
+        "preallocated flat": lambda game_state: observation_encoder.encode_flat(game_state, 0)
+    }
+
+    print(f"{risk_map.name} map ({len(risk_map.territories)} territories):")
+    for encoder_name, encode in encoders.items():
+        best_time = float("inf")
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            for game_state in game_states:
+                encode(game_state)
+            best_time = min(best_time, time.perf_counter() - start_time)
+        print(f"  {encoder_name}: {best_time / num_states * 1e6:.2f} microseconds per step")
+
+# No assertions here, just want to eyeball the per-step encoding cost
+random.seed(0)
+benchmark_encoding(RiskMap.from_json("maps/classic.json"))
+benchmark_encoding(RiskMap.from_json(json_data=KCliqueGenerator.generate(k=100, density=0.05)))
+benchmark_encoding(RiskMap.from_json(json_data=KCliqueGenerator.generate(k=100, density=1.0)))
@@ -0,0 +1,53 @@
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.environment.map import RiskMap
+
+from src.train.policy_server import PolicyServer, PolicyClient, get_model_key
+from src.train.model_paths import get_model_name
+
+def serve(socket_path: str, risk_map: RiskMap, num_players: int):
+    policy_server = PolicyServer(socket_path)
+    policy_server.load_model(risk_map, num_players)
+    policy_server.serve_forever()
+
+def measure_latencies(socket_path: str, model_key: str, observation_size: int, action_space_size: int, num_requests: int, seed: int) -> list[float]:
+    rng = np.random.default_rng(seed)
+    observations = rng.random((num_requests, observation_size), dtype=np.float32)
+    action_masks = rng.random((num_requests, action_space_size)) < 0.2
+    action_masks[:, -1] = True
+
+    policy_client = PolicyClient(socket_path)
+    latencies = []
+    for observation, action_mask in zip(observations, action_masks):
+        start_time = time.perf_counter()
+        policy_client.request_action_index(model_key, observation, action_mask, 0.5)
+        latencies.append(time.perf_counter() - start_time)
+    policy_client.close()
+
+    return latencies
+
+# No assertions here, just want to eyeball the throughput and tail latency of the policy server as the number of client processes grows
+if __name__ == "__main__":
+    risk_map, num_players, num_requests = RiskMap.from_json("maps/mini.json"), 2, 2000
+    socket_path = os.path.join(tempfile.mkdtemp(), "policy_server.sock")
+    server_process = multiprocessing.Process(target=serve, args=(socket_path, risk_map, num_players), daemon=True)
+    server_process.start()
+    while not os.path.exists(socket_path):
+        time.sleep(0.1)
+
+    model_key = get_model_key(risk_map, num_players, get_model_name(risk_map, num_players))
+    observation_size, action_space_size = 3 + 2 * len(risk_map.territories) + 2, 5 * len(risk_map.territories) + 9
+    for num_clients in [1, 2, 4, 8, 16, 32]:
+        with multiprocessing.Pool(num_clients) as pool:
+            start_time = time.perf_counter()
+            client_latencies = pool.starmap(measure_latencies, [(socket_path, model_key, observation_size, action_space_size, num_requests, seed) for seed in range(num_clients)])
+            elapsed_time = time.perf_counter() - start_time
+        latencies = np.concatenate(client_latencies)
+        print(f"{num_clients} clients: {len(latencies) / elapsed_time:.0f} requests per second, p50 latency {np.percentile(latencies, 50) * 1e3:.2f}ms, p99 latency {np.percentile(latencies, 99) * 1e3:.2f}ms")
+
+    server_process.terminate()
@@ -0,0 +1,81 @@
+import random
+import unittest
+
+from src.environment.actions import Action, DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction
+from src.environment.environment import RiskEnvironment
+from src.environment.map import RiskMap
+
+from src.train.action_codec import ActionCodec
+from src.train.gym_environment import RiskGymEnvironment
+
+from src.utils.k_clique_generator import KCliqueGenerator
+
+ACTION_CLASSES = [DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction]
+
+def encode_reference_action(action: Action, risk_map: RiskMap) -> int:
+    """Original offset-scanning encoder of RiskGymEnvironment, used as the ground truth."""
+    offset = 0
+    for action_class in ACTION_CLASSES:
+        if isinstance(action, action_class):
+            return offset + action.encode_action(risk_map)
+
+        offset += action_class.get_max_actions(risk_map)
+
+def decode_reference_action(action_index: int, risk_map: RiskMap) -> Action:
+    """Original offset-scanning decoder of RiskGymEnvironment, used as the ground truth."""
+    offset = 0
+    for action_class in ACTION_CLASSES:
+        max_actions = action_class.get_max_actions(risk_map)
+        if offset <= action_index < offset + max_actions:
+            return action_class.decode_action(int(action_index - offset), risk_map)
+
+        offset += max_actions
+
+class TestActionCodec(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.risk_maps = [
+            RiskMap.from_json("maps/mini.json"),
+            RiskMap.from_json("maps/classic.json"),
+            RiskMap.from_json(json_data=KCliqueGenerator.generate(k=100, density=0.05))
+        ]
+
+    def test_every_index_matches_reference(self):
+        for risk_map in self.risk_maps:
+            action_codec = ActionCodec(risk_map)
+            self.assertEqual(action_codec.size, 5 * len(risk_map.territories) + 9)
+
+            for action_index in range(action_codec.size):
+                decoded_action = action_codec.decode(action_index)
+                reference_action = decode_reference_action(action_index, risk_map)
+
+                self.assertIs(type(decoded_action), type(reference_action))
+                self.assertEqual(repr(decoded_action), repr(reference_action))
+                self.assertEqual(action_codec.encode(decoded_action), action_index)
+                self.assertEqual(action_codec.encode(reference_action), encode_reference_action(reference_action, risk_map))
+
+                action_class_i = int(action_codec.index_action_classes[action_index])
+                self.assertIs(ACTION_CLASSES[action_class_i], type(reference_action))
+                self.assertEqual(action_codec.offsets[action_class_i] + action_codec.index_local_indices[action_index], action_index)
+
+    def test_valid_actions_match_reference(self):
+        risk_map = self.risk_maps[1]
+        action_codec = ActionCodec(risk_map)
+        environment = RiskEnvironment(risk_map, 4)
+        for _ in range(2000):
+            action_list = environment.get_action_list()
+            for action in action_list.flatten():
+                self.assertEqual(action_codec.encode(action), encode_reference_action(action, risk_map))
+
+            _, is_terminal = environment.step(action_list.get_random_action())
+            if is_terminal:
+                environment.reset()
+
+    def test_rl_agent_turn_number_is_cached_on_reset(self):
+        gym_environment = RiskGymEnvironment(self.risk_maps[0], 4)
+        for seed in range(10):
+            gym_environment.reset(seed=seed)
+            self.assertIs(gym_environment.agents[gym_environment.get_rl_agent_turn_number()], gym_environment.rl_agent)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,9 @@
+import random
 import unittest
 
 import numpy as np
 
-from src.environment.actions import TransferMethod, DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction
+from src.environment.actions import TransferMethod, ActionList, DeployAction, BattleFromAction, BattleToAction, TransferAction, FortifyFromAction, FortifyToAction, FortifyAmountAction, SkipAction
 from src.environment.map import RiskMap
 
 from src.train.gym_environment import RiskGymEnvironment
@@ -42,6 +43,32 @@ class TestGymEnvSimulation(TestClassicGymEnv):
             if terminated or truncated:
                 self.runner.reset()
 
+    def test_fast_forward_matches_full_action_lists(self):
+        def advance_to_rl_turn_with_full_action_lists(runner: RiskGymEnvironment):
+            while runner.game_state.current_player != runner.get_rl_agent_turn_number() and not runner.game_state.is_terminal_state() and runner.game_state.active_players[runner.get_rl_agent_turn_number()]:
+                action_list = ActionList.get_action_list(runner.game_state, runner.risk_map)
+                selected_action = runner.agents[runner.game_state.current_player].select_action(action_list, runner.game_state, runner.risk_map)
+                runner.game_state = selected_action.apply(runner.game_state, runner.risk_map)
+
+        def get_trajectory(advance_to_rl_turn) -> list[str]:
+            random.seed(0)
+            runner = RiskGymEnvironment(self.classic_map, self.num_players)
+            runner.advance_to_rl_turn = lambda: advance_to_rl_turn(runner)
+            runner.reset(seed=0)
+            action_rng = np.random.default_rng(0)
+
+            trajectory = []
+            for _ in range(1000):
+                action = action_rng.choice(np.flatnonzero(runner.action_masks()))
+                _, reward, terminated, truncated, _ = runner.step(action)
+                trajectory.append(f"{runner.game_state} {reward}")
+                if terminated or truncated:
+                    runner.reset()
+
+            return trajectory
+
+        self.assertEqual(get_trajectory(RiskGymEnvironment.advance_to_rl_turn), get_trajectory(advance_to_rl_turn_with_full_action_lists))
+
 class TestGymEnvInitialisation(TestClassicGymEnv):    
     def test_max_actions(self):
         self.assertEqual(DeployAction.get_max_actions(self.classic_map), 42)
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.agents.agent import Agent
+
+from src.environment.map import RiskMap
+
+from src.observers.outcome_observer import OutcomeObserver
+
+from src.runners.simulation_runner import SimulationRunner
+
+from src.train.fast_policy import FastPolicy
+from src.train.gym_environment import RiskGymEnvironment
+from src.train.ppo import RiskPPO
+from src.train.rl_agent import RLAgent
+
+class TestFastPolicy(unittest.TestCase):
+    def setUp(self):
+        self.mini_map = RiskMap.from_json("maps/mini.json")
+        self.risk_ppo = RiskPPO.load(self.mini_map, 2)
+        self.fast_policy = FastPolicy.load(FastPolicy.export(f"models/mini_map_2_player/{self.risk_ppo.model_name}", os.path.join(tempfile.mkdtemp(), "policy.npz")))
+
+        # Collect observations and masks from random play
+        gym_environment = RiskGymEnvironment(self.mini_map, 2)
+        gym_environment.reset(seed=0)
+        action_rng = np.random.default_rng(0)
+        flat_observations, action_masks = [], []
+        for _ in range(2000):
+            flat_observations.append(gym_environment.encode_flat_observation().copy())
+            action_masks.append(gym_environment.action_masks())
+            _, _, terminated, truncated, _ = gym_environment.step(action_rng.choice(np.flatnonzero(action_masks[-1])))
+            if terminated or truncated:
+                gym_environment.reset()
+        self.flat_observations, self.action_masks = np.array(flat_observations), np.array(action_masks)
+
+    def test_matches_torch_policy(self):
+        observations = self.risk_ppo.observation_encoder.unflatten(self.flat_observations)
+        torch_action_probabilities = self.risk_ppo.evaluate_policy(observations, self.action_masks)
+
+        np.testing.assert_array_equal(self.fast_policy.get_action_indices(self.flat_observations, self.action_masks), torch_action_probabilities.argmax(axis=1))
+        np.testing.assert_allclose(self.fast_policy.get_action_probabilities(self.flat_observations, self.action_masks), torch_action_probabilities, atol=1e-5)
+
+    def test_inference_only_agent_matches_full_agent(self):
+        simulation_runners = []
+        for inference_only in [False, True]:
+            Agent.reset_player_ids()
+            rl_agent = RLAgent(self.mini_map, 2, deterministic=True, inference_only=inference_only)
+            simulation_runner = SimulationRunner("test", self.mini_map, [rl_agent], num_episodes=4, observers=[OutcomeObserver()], max_episode_length=300, enable_rl_agent_performance_test=True, rl_agent_performance_test_num_players=2, seed=5)
+            simulation_runner.run_simulation()
+            simulation_runners.append(simulation_runner)
+
+        for full_observations, fast_observations in zip(simulation_runners[0].game_observations, simulation_runners[1].game_observations):
+            self.assertEqual(full_observations.observers[0].action_count, fast_observations.observers[0].action_count)
+            self.assertEqual(str(full_observations.observers[1].terminal_state), str(fast_observations.observers[1].terminal_state))
+
+    def test_inference_only_agent_does_not_import_torch(self):
+        script = "import sys; from src.environment.map import RiskMap; from src.train.rl_agent import RLAgent; RLAgent(RiskMap.from_json('maps/mini.json'), 2, inference_only=True); print('torch' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+
+        self.assertEqual(output.strip().splitlines()[-1], "False")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.environment.map import RiskMap
+
+from src.train.model_registry import ModelRegistry
+from src.train.rl_agent import RLAgent
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.mini_map = RiskMap.from_json("maps/mini.json")
+
+        # Work on a copy of the mini map models, so that new versions can be saved without touching the repository
+        self.original_working_directory = os.getcwd()
+        self.working_directory = tempfile.mkdtemp()
+        shutil.copytree("models/mini_map_2_player", os.path.join(self.working_directory, "models/mini_map_2_player"), ignore=shutil.ignore_patterns("logs"))
+        os.chdir(self.working_directory)
+
+        self.model_registry = ModelRegistry(max_models=2)
+
+    def tearDown(self):
+        os.chdir(self.original_working_directory)
+        shutil.rmtree(self.working_directory)
+
+    def test_latest_version_is_resolved_once(self):
+        self.assertEqual(self.model_registry.get_model_name(self.mini_map, 2), "v4")
+
+        for extension in [".zip", ".npz"]:
+            shutil.copy(f"models/mini_map_2_player/v4{extension}", f"models/mini_map_2_player/v5{extension}")
+        self.assertEqual(self.model_registry.get_model_name(self.mini_map, 2), "v4")
+
+        self.model_registry.clear()
+        self.assertEqual(self.model_registry.get_model_name(self.mini_map, 2), "v5")
+
+    def test_policies_are_shared_and_evicted_least_recently_used(self):
+        v1_policy = self.model_registry.get_fast_policy(self.mini_map, 2, "v1")
+        v2_policy = self.model_registry.get_fast_policy(self.mini_map, 2, "v2")
+        self.assertIs(self.model_registry.get_fast_policy(self.mini_map, 2, "v1"), v1_policy)
+
+        self.model_registry.get_fast_policy(self.mini_map, 2, "v3") # evicts v2, as v1 was used more recently
+        self.assertEqual([key[2] for key in self.model_registry.models], ["v1", "v3"])
+        self.assertIs(self.model_registry.get_fast_policy(self.mini_map, 2, "v1"), v1_policy)
+        self.assertIsNot(self.model_registry.get_fast_policy(self.mini_map, 2, "v2"), v2_policy)
+
+    def test_rl_agents_share_their_policy(self):
+        first_agent, second_agent = RLAgent(self.mini_map, 2, inference_only=True), RLAgent(self.mini_map, 2, inference_only=True)
+
+        self.assertEqual(first_agent.model_name, "v4")
+        self.assertIs(first_agent.fast_policy, second_agent.fast_policy)
+
+    def test_preload(self):
+        self.model_registry.max_models = 4
+        self.model_registry.preload([(self.mini_map, 2, f"v{version}") for version in range(1, 5)], max_workers=4)
+
+        self.assertEqual(sorted(key[2] for key in self.model_registry.models), ["v1", "v2", "v3", "v4"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import pickle
+import random
+import unittest
+
+import numpy as np
+
+from src.environment.environment import RiskEnvironment
+from src.environment.game_state import GameState
+from src.environment.map import RiskMap
+
+from src.train.observation_encoder import ObservationEncoder
+
+from src.utils.k_clique_generator import KCliqueGenerator
+
+def encode_reference_observation(game_state: GameState, player_i: int) -> dict[str, np.ndarray]:
+    """Original list-comprehension encoder of RiskGymEnvironment, used as the ground truth."""
+    total_troops = sum(game_state.territory_troops)
+
+    return {
+        "current_phase": np.arange(3) == game_state.current_phase.value,
+        "territories": np.array([
+            [int(territory_owner == player_i), troop_count / total_troops]
+            for territory_owner, troop_count in zip(game_state.territory_owners, game_state.territory_troops)
+        ], dtype=np.float32),
+        "territory_card_count": np.array([min(game_state.territory_card_counts[player_i] / 3.0, 1.0)], dtype=np.float32),
+        "deployment_troops": np.array([game_state.deployment_troops / (game_state.deployment_troops + total_troops)], dtype=np.float32)
+    }
+
+class TestObservationEncoder(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.risk_maps = [
+            RiskMap.from_json("maps/classic.json"),
+            RiskMap.from_json(json_data=KCliqueGenerator.generate(k=100, density=0.05))
+        ]
+
+    def test_encoding_matches_reference(self):
+        for risk_map in self.risk_maps:
+            environment = RiskEnvironment(risk_map, 4)
+            observation_encoder = ObservationEncoder(len(risk_map.territories))
+            for _ in range(1000):
+                game_state = environment.current_state
+                player_i = random.randrange(len(game_state.active_players))
+                observation = observation_encoder.encode(game_state, player_i)
+
+                for key, reference_value in encode_reference_observation(game_state, player_i).items():
+                    np.testing.assert_array_equal(observation[key], reference_value.astype(np.float32))
+
+                _, is_terminal = environment.step(environment.get_action_list().get_random_action())
+                if is_terminal:
+                    environment.reset()
+
+    def test_flat_observation_shares_buffers(self):
+        risk_map = self.risk_maps[0]
+        game_state = GameState(4, len(risk_map.territories), True)
+        observation_encoder = ObservationEncoder(len(risk_map.territories))
+
+        flat_observation = observation_encoder.encode_flat(game_state, 0)
+        observation = observation_encoder.observation
+
+        self.assertEqual(flat_observation.shape, (3 + 2 * len(risk_map.territories) + 2,))
+        for value in observation.values():
+            self.assertTrue(np.shares_memory(value, flat_observation))
+        np.testing.assert_array_equal(flat_observation, np.concatenate([observation["current_phase"], observation["territories"].ravel(), observation["territory_card_count"], observation["deployment_troops"]]))
+
+    def test_buffers_are_reused_between_calls(self):
+        risk_map = self.risk_maps[0]
+        observation_encoder = ObservationEncoder(len(risk_map.territories))
+
+        first_observation = observation_encoder.encode(GameState(4, len(risk_map.territories), True), 0)
+        second_observation = observation_encoder.encode(GameState(4, len(risk_map.territories), True), 1)
+
+        for key in first_observation:
+            self.assertIs(first_observation[key], second_observation[key])
+
+    def test_unpickled_encoder_shares_buffers(self):
+        risk_map = self.risk_maps[0]
+        game_state = GameState(4, len(risk_map.territories), True)
+        observation_encoder = pickle.loads(pickle.dumps(ObservationEncoder(len(risk_map.territories))))
+
+        flat_observation = observation_encoder.encode_flat(game_state, 0)
+        self.assertEqual(flat_observation[game_state.current_phase.value], 1.0)
+        for key, reference_value in encode_reference_observation(game_state, 0).items():
+            np.testing.assert_array_equal(observation_encoder.observation[key], reference_value.astype(np.float32))
+            self.assertTrue(np.shares_memory(observation_encoder.observation[key], flat_observation))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from src.agents.agent import Agent
+
+from src.environment.map import RiskMap
+
+from src.observers.outcome_observer import OutcomeObserver
+
+from src.runners.simulation_runner import SimulationRunner
+
+from src.train.policy_server import REQUEST_HEADER, PolicyServer, PolicyClient, RemoteRLAgent
+from src.train.rl_agent import RLAgent
+
+class TestPolicyServer(unittest.TestCase):
+    def setUp(self):
+        self.mini_map = RiskMap.from_json("maps/mini.json")
+        self.socket_path = os.path.join(tempfile.mkdtemp(), "policy_server.sock")
+        self.policy_server = PolicyServer(self.socket_path, max_batch_size=8, max_latency=0.01)
+        self.model_key = self.policy_server.load_model(self.mini_map, 2)
+
+        self.server_thread = threading.Thread(target=self.policy_server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+        self.server_thread.start()
+        while not os.path.exists(self.socket_path):
+            time.sleep(0.01)
+
+    def tearDown(self):
+        self.policy_server.shutdown()
+        self.server_thread.join()
+
+    def run_simulation(self, rl_agent: Agent, num_workers: int = 1) -> SimulationRunner:
+        Agent.reset_player_ids()
+        simulation_runner = SimulationRunner("test", self.mini_map, [rl_agent], num_episodes=4, observers=[OutcomeObserver()], max_episode_length=300, enable_rl_agent_performance_test=True, rl_agent_performance_test_num_players=2, seed=3, num_workers=num_workers)
+        simulation_runner.run_simulation()
+
+        return simulation_runner
+
+    def test_remote_agent_matches_local_agent(self):
+        for deterministic, num_workers in [(True, 1), (False, 1), (True, 2)]:
+            local_runner = self.run_simulation(RLAgent(self.mini_map, 2, deterministic=deterministic))
+            remote_runner = self.run_simulation(RemoteRLAgent(self.mini_map, 2, self.socket_path, deterministic=deterministic), num_workers)
+
+            self.assertEqual(len(local_runner.game_observations), len(remote_runner.game_observations))
+            for local_observations, remote_observations in zip(local_runner.game_observations, remote_runner.game_observations):
+                self.assertEqual([telemetry.player_name for telemetry in local_observations.observers[0].player_telemetries], [telemetry.player_name for telemetry in remote_observations.observers[0].player_telemetries])
+                self.assertEqual(local_observations.observers[0].action_count, remote_observations.observers[0].action_count)
+                self.assertEqual(str(local_observations.observers[1].terminal_state), str(remote_observations.observers[1].terminal_state))
+
+    def test_unknown_model_only_closes_its_connection(self):
+        observation_size = self.policy_server.risk_ppos[self.model_key].observation_encoder.flat_observation.size
+        action_mask = np.ones(self.policy_server.risk_ppos[self.model_key].action_codec.size, dtype=bool)
+
+        unknown_model_client = PolicyClient(self.socket_path)
+        with self.assertRaises(AssertionError):
+            unknown_model_client.request_action_index("unknown_map_2_player/model", np.zeros(observation_size, dtype=np.float32), action_mask)
+        unknown_model_client.close()
+
+        policy_client = PolicyClient(self.socket_path)
+        self.assertLess(policy_client.request_action_index(self.model_key, np.zeros(observation_size, dtype=np.float32), action_mask), len(action_mask))
+        policy_client.close()
+        self.assertTrue(self.server_thread.is_alive())
+
+    def test_client_closing_before_its_response_only_closes_its_connection(self):
+        observation_size = self.policy_server.risk_ppos[self.model_key].observation_encoder.flat_observation.size
+        action_mask = np.ones(self.policy_server.risk_ppos[self.model_key].action_codec.size, dtype=bool)
+
+        # A worker killed mid-request sends its request, then closes without reading the response
+        payload = self.model_key.encode() + np.zeros(observation_size, dtype=np.float32).tobytes() + action_mask.tobytes()
+        closing_client = PolicyClient(self.socket_path)
+        closing_client.connection.sendall(REQUEST_HEADER.pack(REQUEST_HEADER.size + len(payload), len(self.model_key.encode()), float("nan")) + payload)
+        closing_client.close()
+        time.sleep(0.05)
+
+        policy_client = PolicyClient(self.socket_path)
+        self.assertLess(policy_client.request_action_index(self.model_key, np.zeros(observation_size, dtype=np.float32), action_mask), len(action_mask))
+        policy_client.close()
+        self.assertTrue(self.server_thread.is_alive())
+
+    def test_remote_agent_connects_per_process_without_torch(self):
+        remote_rl_agent = RemoteRLAgent(self.mini_map, 2, self.socket_path)
+        remote_rl_agent.get_policy_client()
+        unpickled_remote_rl_agent = pickle.loads(pickle.dumps(remote_rl_agent))
+        self.assertIsNone(unpickled_remote_rl_agent.policy_client)
+        self.assertIsNot(unpickled_remote_rl_agent.get_policy_client(), remote_rl_agent.policy_client)
+        remote_rl_agent.policy_client.close()
+        unpickled_remote_rl_agent.policy_client.close()
+
+        imported_modules = subprocess.run([sys.executable, "-c", "import sys, src.train.policy_server; print(' '.join(sys.modules))"], capture_output=True, text=True, check=True).stdout.split()
+        self.assertNotIn("torch", imported_modules)
+
+    def test_concurrent_requests_are_batched(self):
+        risk_ppo = self.policy_server.risk_ppos[self.model_key]
+        observation_size = risk_ppo.observation_encoder.flat_observation.size
+        rng = np.random.default_rng(0)
+        observations = rng.random((16, observation_size), dtype=np.float32)
+        action_masks = rng.random((16, risk_ppo.action_codec.size)) < 0.2
+        action_masks[:, -1] = True # SkipAction, so that no mask is empty
+
+        action_indices = [None] * len(observations)
+        policy_clients = [PolicyClient(self.socket_path) for _ in range(len(observations))]
+        barrier = threading.Barrier(len(observations))
+        def request(client_i: int):
+            barrier.wait()
+            action_indices[client_i] = policy_clients[client_i].request_action_index(self.model_key, observations[client_i], action_masks[client_i])
+            policy_clients[client_i].close()
+
+        client_threads = [threading.Thread(target=request, args=(client_i,)) for client_i in range(len(observations))]
+        for client_thread in client_threads:
+            client_thread.start()
+        for client_thread in client_threads:
+            client_thread.join()
+
+        expected_action_probabilities = risk_ppo.evaluate_policy(risk_ppo.observation_encoder.unflatten(observations), action_masks)
+        self.assertEqual(action_indices, [int(np.argmax(row)) for row in expected_action_probabilities])
+        self.assertTrue(all(action_masks[client_i, action_index] for client_i, action_index in enumerate(action_indices)))
+        self.assertEqual(self.policy_server.total_requests, len(observations))
+        self.assertLess(self.policy_server.total_batches, len(observations))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import random
+import unittest
+
+import numpy as np
+
+from sb3_contrib.common.maskable.utils import get_action_masks
+from stable_baselines3.common.logger import configure
+
+from src.environment.environment import RiskEnvironment
+from src.environment.map import RiskMap
+
+from src.train.model_paths import get_model_dir
+from src.train.ppo import RiskPPO, RiskMetricsCallback
+
+class TestVectorisedRiskPPO(unittest.TestCase):
+    def setUp(self):
+        self.mini_map = RiskMap.from_json("maps/mini.json")
+        self.num_envs = 3
+        self.risk_ppo = RiskPPO(self.mini_map, 2, model_name="test", num_envs=self.num_envs, seed=0)
+
+    def tearDown(self):
+        self.risk_ppo.close()
+
+    def test_workers_have_their_own_seed_streams(self):
+        observations = self.risk_ppo.train_env.reset()
+        territories = observations["territories"]
+
+        self.assertEqual(territories.shape[0], self.num_envs)
+        self.assertFalse(np.array_equal(territories[0], territories[1]) and np.array_equal(territories[1], territories[2]))
+
+        # The same base seed reproduces the same worker games
+        other_risk_ppo = RiskPPO(self.mini_map, 2, model_name="test", num_envs=self.num_envs, seed=0)
+        try:
+            np.testing.assert_array_equal(other_risk_ppo.train_env.reset()["territories"], territories)
+        finally:
+            other_risk_ppo.close()
+
+    def test_action_masks_and_episode_info_reach_callback(self):
+        train_env = self.risk_ppo.train_env
+        train_env.reset()
+        self.risk_ppo.model.set_logger(configure(None, []))
+        callback = RiskMetricsCallback()
+        callback.init_callback(self.risk_ppo.model)
+
+        for _ in range(2000):
+            action_masks = get_action_masks(train_env)
+            self.assertEqual(action_masks.shape, (self.num_envs, self.risk_ppo.env.get_max_actions()))
+            actions = [np.random.choice(np.flatnonzero(action_mask)) for action_mask in action_masks]
+            _, _, _, infos = train_env.step(np.array(actions))
+
+            callback.update_locals({"infos": infos})
+            callback.on_step()
+            if callback.total_episodes >= self.num_envs:
+                break
+
+        self.assertGreaterEqual(callback.total_episodes, self.num_envs)
+        self.assertGreater(callback.total_episode_length, 0)
+
+class TestInferenceOnlyLoad(unittest.TestCase):
+    def setUp(self):
+        self.mini_map = RiskMap.from_json("maps/mini.json")
+
+    def test_matches_full_load(self):
+        model_dir_contents = sorted(os.listdir(get_model_dir(self.mini_map, 2)))
+        inference_risk_ppo = RiskPPO.load(self.mini_map, 2, inference_only=True)
+        self.assertIsNone(inference_risk_ppo.env)
+        self.assertIsNone(inference_risk_ppo.model)
+        self.assertEqual(sorted(os.listdir(get_model_dir(self.mini_map, 2))), model_dir_contents)
+
+        full_risk_ppo = RiskPPO.load(self.mini_map, 2)
+        self.assertEqual(inference_risk_ppo.model_name, full_risk_ppo.model_name)
+
+        random.seed(0)
+        environment = RiskEnvironment(self.mini_map, 2)
+        valid_action_lists, game_states = [], []
+        for _ in range(500):
+            valid_action_lists.append(environment.get_action_list())
+            game_states.append(environment.current_state)
+            _, is_terminal_state = environment.step(valid_action_lists[-1].get_random_action())
+            if is_terminal_state:
+                environment.reset()
+
+        np.testing.assert_array_equal(inference_risk_ppo.get_action_probabilities(valid_action_lists, game_states), full_risk_ppo.get_action_probabilities(valid_action_lists, game_states))
+
+if __name__ == "__main__":
+    unittest.main()
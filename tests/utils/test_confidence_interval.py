@@ -0,0 +1,35 @@
+import math
+import unittest
+
+from src.utils.confidence_interval import ConfidenceInterval
+
+class TestConfidenceInterval(unittest.TestCase):
+    def test_wilson_interval(self):
+        lower, upper = ConfidenceInterval.wilson(8, 10, 0.95)
+        self.assertAlmostEqual(lower, 0.4902, places=4)
+        self.assertAlmostEqual(upper, 0.9433, places=4)
+        self.assertEqual(ConfidenceInterval.wilson(0, 0), (0.0, 1.0))
+
+    def test_bayesian_interval(self):
+        lower, upper = ConfidenceInterval.bayesian(8, 10, 0.95)
+        self.assertAlmostEqual(lower, 0.4972, places=4)
+        self.assertAlmostEqual(upper, 0.9559, places=4)
+        self.assertEqual(ConfidenceInterval.bayesian(0, 10)[0], 0.0)
+        self.assertEqual(ConfidenceInterval.bayesian(10, 10)[1], 1.0)
+
+    def test_beta_distribution(self):
+        self.assertAlmostEqual(ConfidenceInterval.get_beta_cdf(0.5, 2, 3), 11 / 16)
+        for quantile in [0.025, 0.5, 0.975]:
+            self.assertAlmostEqual(ConfidenceInterval.get_beta_cdf(ConfidenceInterval.get_beta_quantile(quantile, 500.5, 480.5), 500.5, 480.5), quantile)
+
+    def test_mean_interval(self):
+        samples = [1, 2, 2, 3, 1, 1, 2, 4]
+        lower, upper = ConfidenceInterval.mean(len(samples), sum(samples), sum(sample ** 2 for sample in samples), 0.95)
+        mean = sum(samples) / len(samples)
+        standard_deviation = math.sqrt(sum((sample - mean) ** 2 for sample in samples) / (len(samples) - 1))
+        self.assertAlmostEqual((lower + upper) / 2, mean)
+        self.assertAlmostEqual((upper - lower) / 2, 1.959964 * standard_deviation / math.sqrt(len(samples)), places=5)
+        self.assertEqual(ConfidenceInterval.mean(1, 2, 4), (-math.inf, math.inf))
+
+if __name__ == "__main__":
+    unittest.main()